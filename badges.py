@@ -1,114 +1,44 @@
 import logging
-import re
 import time
-from html import unescape
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 
 import requests
 
-from config import STEAM_API_KEY
+import http_client
+import ratelimit
+import store
+from config import (
+    BADGE_HEDGE_WIDTH,
+    NAME_LOOKUP_WORKERS,
+    NAME_NEGATIVE_TTL_SECONDS,
+    PROFILE_PAGE_WORKERS,
+    STEAM_API_KEY,
+)
+from market import SEARCH_PAGE_SIZE, search_trading_cards
+from parsers import (
+    parse_badge_names_from_badges_page,
+    parse_badge_names_from_badges_xml,
+    parse_badge_names_from_script,
+    parse_badge_page_count,
+    parse_badge_title,
+    parse_badge_title_from_xml,
+    parse_card_names_from_gamecards,
+)
 
 _APP_NAME_CACHE = {}
 _BADGE_NAME_CACHE = {}
 
-def _strip_html(text):
-    text = re.sub(r"<[^>]+>", "", text)
-    text = unescape(text)
-    return " ".join(text.split()).strip()
-
-def _extract_text_by_class(html, class_name):
-    pattern = rf'class=["\'][^"\']*\b{re.escape(class_name)}\b[^"\']*["\'][^>]*>(.*?)</[^>]+>'
-    match = re.search(pattern, html, re.S)
-    if not match:
-        return None
-    text = _strip_html(match.group(1))
-    return text or None
-
 def _append_query_param(url, query):
     sep = "&" if "?" in url else "?"
     return f"{url}{sep}{query}"
 
 def _fetch_text(url, headers, session=None):
-    requester = session or requests
+    requester = session or http_client
+    ratelimit.acquire("community")
     r = requester.get(url, headers=headers)
     r.raise_for_status()
     return r.text
 
-def _parse_badge_names_from_badges_xml(xml_text):
-    badge_names = {}
-    for block in re.findall(r"<badge>.*?</badge>", xml_text, re.S):
-        id_match = re.search(r"<badgeid>(\d+)</badgeid>", block)
-        if not id_match:
-            id_match = re.search(r"<id>(\d+)</id>", block)
-        if not id_match:
-            continue
-        badge_id = int(id_match.group(1))
-
-        name_match = re.search(r"<name>(.*?)</name>", block, re.S)
-        if not name_match:
-            name_match = re.search(r"<badge_name>(.*?)</badge_name>", block, re.S)
-        if not name_match:
-            name_match = re.search(r"<title>(.*?)</title>", block, re.S)
-        if not name_match:
-            continue
-        title = _strip_html(name_match.group(1))
-        if title:
-            badge_names[badge_id] = title
-    return badge_names
-
-def _parse_badge_title_from_xml(xml_text):
-    for pattern in (
-        r"<badge_name>(.*?)</badge_name>",
-        r"<name>(.*?)</name>",
-        r"<title>(.*?)</title>",
-    ):
-        match = re.search(pattern, xml_text, re.S)
-        if match:
-            title = _strip_html(match.group(1))
-            if title:
-                return title
-    return None
-
-def _parse_badge_names_from_script(html):
-    badge_names = {}
-    for match in re.finditer(
-        r'"badgeid"\s*:\s*(\d+).*?"name"\s*:\s*"([^"]+)"',
-        html,
-        re.S,
-    ):
-        title = _strip_html(match.group(2))
-        if title:
-            badge_names[int(match.group(1))] = title
-    return badge_names
-
-
-def _parse_badge_names_from_badges_page(html):
-    badge_names = {}
-    rows = re.split(r'<div[^>]+class=["\'][^"\']*\bbadge_row\b[^"\']*["\'][^>]*>', html)
-    for row in rows[1:]:
-        block = row
-        badge_id = None
-        for pattern in (r'/badges/(\d+)', r'badgeid=(\d+)', r'data-badgeid=["\'](\d+)["\']'):
-            m = re.search(pattern, block)
-            if m:
-                badge_id = int(m.group(1))
-                break
-        if badge_id is None:
-            continue
-
-        title = (
-            _extract_text_by_class(block, "badge_row_title")
-            or _extract_text_by_class(block, "badge_title")
-            or _extract_text_by_class(block, "badge_title_row")
-            or _extract_text_by_class(block, "badge_info_title")
-            or _extract_text_by_class(block, "profile_badge_title")
-        )
-        if not title:
-            continue
-        if title:
-            badge_names[badge_id] = title
-
-    return badge_names
-
 
 def get_profile_badge_names(session=None, steam_id=None):
     headers = {
@@ -118,28 +48,57 @@ def get_profile_badge_names(session=None, steam_id=None):
         "Referer": "https://steamcommunity.com/my/badges",
     }
 
+    def parse_page(url, text, page, session_to_use):
+        parsed = parse_badge_names_from_badges_page(text)
+        if not parsed:
+            parsed = parse_badge_names_from_badges_xml(text)
+        if not parsed:
+            parsed = parse_badge_names_from_script(text)
+        if not parsed and page == 1:
+            xml_url = _append_query_param(url, "xml=1")
+            xml_text = _fetch_text(xml_url, headers, session=session_to_use)
+            parsed = parse_badge_names_from_badges_xml(xml_text)
+        return parsed
+
+    def fetch_page(base_url, page, session_to_use):
+        url = f"{base_url}?l=english&p={page}"
+        text = _fetch_text(url, headers, session=session_to_use)
+        return text, parse_page(url, text, page, session_to_use)
+
     try:
         def fetch_all(base_url, session_to_use):
-            badge_names = {}
-            page = 1
-            while True:
-                url = f"{base_url}?l=english&p={page}"
-                text = _fetch_text(url, headers, session=session_to_use)
-                parsed = _parse_badge_names_from_badges_page(text)
-                if not parsed:
-                    parsed = _parse_badge_names_from_badges_xml(text)
-                if not parsed:
-                    parsed = _parse_badge_names_from_script(text)
-                if not parsed and page == 1:
-                    xml_url = _append_query_param(url, "xml=1")
-                    xml_text = _fetch_text(xml_url, headers, session=session_to_use)
-                    parsed = _parse_badge_names_from_badges_xml(xml_text)
-                if not parsed:
-                    break
-                badge_names.update(parsed)
-                if "pagebtn_next" not in text:
+            text, parsed = fetch_page(base_url, 1, session_to_use)
+            if not parsed:
+                return {}
+            badge_names = dict(parsed)
+
+            page_count = parse_badge_page_count(text)
+            if page_count is None:
+                # Pas de liens de pagination lisibles: on suit pagebtn_next page par page
+                page = 1
+                while "pagebtn_next" in text:
+                    page += 1
+                    text, parsed = fetch_page(base_url, page, session_to_use)
+                    if not parsed:
+                        break
+                    badge_names.update(parsed)
+                return badge_names
+
+            # Pages 2..N en parallèle (sous le rate limit "community"), parsées dès
+            # leur arrivée, puis fusionnées dans l'ordre des pages.
+            pages = {}
+            with ThreadPoolExecutor(max_workers=max(1, PROFILE_PAGE_WORKERS)) as pool:
+                futures = {
+                    pool.submit(fetch_page, base_url, page, session_to_use): page
+                    for page in range(2, page_count + 1)
+                }
+                for future in as_completed(futures):
+                    pages[futures[future]] = future.result()[1]
+
+            for page in sorted(pages):
+                if not pages[page]:
                     break
-                page += 1
+                badge_names.update(pages[page])
             return badge_names
 
         candidates = []
@@ -167,24 +126,69 @@ def get_profile_badge_names(session=None, steam_id=None):
         return {}
 
 
-def _parse_badge_title(html):
-    for pattern in (
-        "badge_info_title",
-        "profile_badge_title",
-        "badge_title",
-        "badge_detail_title",
-        "badge_title_row",
-    ):
-        title = _extract_text_by_class(html, pattern)
-        if title:
-            return title
-    return None
+def _badge_name_variants(badge_id, session=None, steam_id=None):
+    """
+    Toutes les façons d'obtenir le titre d'un badge, dans l'ordre historique:
+    chaque URL, avec puis sans session, en HTML puis en xml=1.
+    Retourne une liste de (variant_key, url, session_to_use, is_xml).
+    """
+    urls = []
+    if session:
+        urls.append(("my", f"https://steamcommunity.com/my/badges/{badge_id}?l=english"))
+    if steam_id:
+        urls.append(("profile", f"https://steamcommunity.com/profiles/{steam_id}/badges/{badge_id}?l=english"))
+    urls.append(("public", f"https://steamcommunity.com/badges/{badge_id}?l=english"))
+
+    variants = []
+    for base, url in urls:
+        for session_to_use in ((session, None) if session else (None,)):
+            auth = "session" if session_to_use else "anon"
+            variants.append((f"{base}:{auth}:html", url, session_to_use, False))
+            variants.append((f"{base}:{auth}:xml", _append_query_param(url, "xml=1"), session_to_use, True))
+    return variants
+
+
+def _order_badge_name_variants(badge_id, variants):
+    """
+    La variante qui a déjà marché pour ce badge d'abord, puis celles qui marchent
+    le plus souvent pour les autres badges, puis l'ordre historique.
+    """
+    preferred = store.get_badge_name_variant(badge_id)
+    wins = store.badge_name_variant_wins()
+    order = {key: i for i, (key, *_rest) in enumerate(variants)}
+    return sorted(
+        variants,
+        key=lambda v: (v[0] != preferred, -wins.get(v[0], 0), order[v[0]]),
+    )
+
+
+def _try_badge_name_variant(badge_id, variant, headers):
+    """
+    Retourne (titre ou None, page obtenue): page obtenue est False sur une
+    erreur réseau / HTTP, pour ne pas confondre échec et badge sans titre.
+    """
+    key, url, session_to_use, is_xml = variant
+    try:
+        text = _fetch_text(url, headers, session=session_to_use)
+    except requests.exceptions.RequestException as e:
+        logging.debug(f"Badge name request failed for {badge_id} at {url}: {e}")
+        return None, False
+    if is_xml:
+        return parse_badge_title_from_xml(text) or parse_badge_title(text), True
+    return parse_badge_title(text) or parse_badge_title_from_xml(text), True
 
 
 def get_badge_name(badge_id, session=None, steam_id=None):
     if badge_id in _BADGE_NAME_CACHE:
         return _BADGE_NAME_CACHE[badge_id]
 
+    stored = store.get_name("badge", badge_id)
+    if stored is not None:
+        name, fetched_at = stored
+        if name is not None or time.time() - fetched_at < NAME_NEGATIVE_TTL_SECONDS:
+            _BADGE_NAME_CACHE[badge_id] = name
+            return name
+
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
@@ -192,68 +196,74 @@ def get_badge_name(badge_id, session=None, steam_id=None):
         "Referer": "https://steamcommunity.com/my/badges",
     }
 
-    urls = []
-    if session:
-        urls.append(f"https://steamcommunity.com/my/badges/{badge_id}?l=english")
-    if steam_id:
-        urls.append(f"https://steamcommunity.com/profiles/{steam_id}/badges/{badge_id}?l=english")
-    urls.append(f"https://steamcommunity.com/badges/{badge_id}?l=english")
-
-    for url in urls:
-        for session_to_use in ((session, None) if session else (None,)):
-            try:
-                text = _fetch_text(url, headers, session=session_to_use)
-            except requests.exceptions.RequestException as e:
-                logging.debug(f"Badge name request failed for {badge_id} at {url}: {e}")
-                continue
-
-            title = _parse_badge_title(text) or _parse_badge_title_from_xml(text)
-            if title:
-                _BADGE_NAME_CACHE[badge_id] = title
-                return title
+    variants = _order_badge_name_variants(badge_id, _badge_name_variants(badge_id, session, steam_id))
 
-            xml_url = _append_query_param(url, "xml=1")
-            try:
-                xml_text = _fetch_text(xml_url, headers, session=session_to_use)
-            except requests.exceptions.RequestException as e:
-                logging.debug(f"Badge name XML request failed for {badge_id} at {xml_url}: {e}")
-                continue
-            title = _parse_badge_title_from_xml(xml_text) or _parse_badge_title(xml_text)
-            if title:
-                _BADGE_NAME_CACHE[badge_id] = title
-                return title
-
-    _BADGE_NAME_CACHE[badge_id] = None
-    return None
+    # Requêtes "hedgées": BADGE_HEDGE_WIDTH variantes en vol, la première qui
+    # donne un titre gagne et les variantes pas encore parties sont annulées.
+    title = None
+    answered = False  # au moins une variante a renvoyé une page (avec ou sans titre)
+    pool = ThreadPoolExecutor(max_workers=max(1, BADGE_HEDGE_WIDTH))
+    try:
+        pending = {}
+        queue = iter(variants)
+        for variant in queue:
+            pending[pool.submit(_try_badge_name_variant, badge_id, variant, headers)] = variant
+            if len(pending) >= BADGE_HEDGE_WIDTH:
+                break
 
-def _fetch_badges(steam_id):
+        while pending and not title:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                variant = pending.pop(future)
+                if title:
+                    continue
+                title, reached = future.result()
+                answered = answered or reached
+                if title:
+                    store.put_badge_name_variant(badge_id, variant[0])
+                    continue
+                next_variant = next(queue, None)
+                if next_variant is not None:
+                    pending[pool.submit(_try_badge_name_variant, badge_id, next_variant, headers)] = next_variant
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    _BADGE_NAME_CACHE[badge_id] = title
+    if title or answered:
+        store.put_name("badge", badge_id, title)
+    else:
+        # Aucune page obtenue: échec transitoire, non persisté (retenté au prochain run)
+        logging.warning(f"Failed to fetch badge name for {badge_id}, using fallback.")
+    return title
+
+def fetch_badges_list(steam_id):
+    """
+    Liste GetBadges. Lève http_client.RetryError si l'API reste inaccessible.
+    """
     url = "https://api.steampowered.com/IPlayerService/GetBadges/v1/"
     params = {"key": STEAM_API_KEY, "steamid": steam_id}
 
-    for attempt in range(3):
-        try:
-            r = requests.get(url, params=params)
-            r.raise_for_status()
-            return r.json()["response"]["badges"]
-        except requests.exceptions.HTTPError as e:
-            if 500 <= e.response.status_code < 600:
-                logging.warning(
-                    f"{e.response.status_code} Server Error for badges API, retrying in {2**attempt} seconds... (attempt {attempt+1}/3)"
-                )
-                time.sleep(2**attempt)
-            else:
-                raise
-        except requests.exceptions.RequestException as e:
-            logging.warning(
-                f"Request error fetching badges: {e}, retrying in {2**attempt} seconds... (attempt {attempt+1}/3)"
-            )
-            time.sleep(2**attempt)
+    def fetch():
+        ratelimit.acquire("webapi")
+        r = http_client.get(url, params=params)
+        r.raise_for_status()
+        return r.json()["response"]["badges"]
 
-    logging.error("Failed to fetch badges after 3 attempts, returning empty list.")
-    return []
+    return http_client.with_retries(fetch, "badges API", bucket="webapi")
 
 
-def get_owned_games_map(steam_id):
+def _fetch_badges(steam_id):
+    try:
+        return fetch_badges_list(steam_id)
+    except http_client.RetryError:
+        logging.error("Failed to fetch badges after 3 attempts, returning empty list.")
+        return []
+
+
+def fetch_owned_games_map(steam_id):
+    """
+    appid -> nom des jeux possédés. Lève http_client.RetryError si l'API reste inaccessible.
+    """
     url = "https://api.steampowered.com/IPlayerService/GetOwnedGames/v1/"
     params = {
         "key": STEAM_API_KEY,
@@ -262,66 +272,114 @@ def get_owned_games_map(steam_id):
         "include_played_free_games": 1,
     }
 
-    for attempt in range(3):
-        try:
-            r = requests.get(url, params=params)
-            r.raise_for_status()
-            games = r.json().get("response", {}).get("games", [])
-            return {game["appid"]: game["name"] for game in games if "name" in game}
-        except requests.exceptions.HTTPError as e:
-            if 500 <= e.response.status_code < 600:
-                logging.warning(
-                    f"{e.response.status_code} Server Error for owned games, retrying in {2**attempt} seconds... (attempt {attempt+1}/3)"
-                )
-                time.sleep(2**attempt)
-            else:
-                raise
-        except requests.exceptions.RequestException as e:
-            logging.warning(
-                f"Request error fetching owned games: {e}, retrying in {2**attempt} seconds... (attempt {attempt+1}/3)"
-            )
-            time.sleep(2**attempt)
+    def fetch():
+        ratelimit.acquire("webapi")
+        r = http_client.get(url, params=params)
+        r.raise_for_status()
+        games = r.json().get("response", {}).get("games", [])
+        return {game["appid"]: game["name"] for game in games if "name" in game}
+
+    return http_client.with_retries(fetch, "owned games", bucket="webapi")
 
-    logging.warning("Failed to fetch owned games after 3 attempts, returning empty map.")
-    return {}
+
+def get_owned_games_map(steam_id):
+    try:
+        return fetch_owned_games_map(steam_id)
+    except http_client.RetryError:
+        logging.warning("Failed to fetch owned games after 3 attempts, returning empty map.")
+        return {}
 
 
 def get_app_name(appid):
     if appid in _APP_NAME_CACHE:
         return _APP_NAME_CACHE[appid]
 
+    stored = store.get_name("app", appid)
+    if stored is not None:
+        name, fetched_at = stored
+        if name is not None or time.time() - fetched_at < NAME_NEGATIVE_TTL_SECONDS:
+            _APP_NAME_CACHE[appid] = name
+            return name
+
     url = "https://store.steampowered.com/api/appdetails/"
     params = {"appids": appid}
 
-    for attempt in range(3):
-        try:
-            time.sleep(0.4)
-            r = requests.get(url, params=params)
-            if r.status_code == 429:
-                time.sleep(2**attempt)
-                continue
-            r.raise_for_status()
-            payload = r.json().get(str(appid), {})
-            name = payload.get("data", {}).get("name") if payload.get("success") else None
-            _APP_NAME_CACHE[appid] = name
-            return name
-        except requests.exceptions.HTTPError as e:
-            if 500 <= e.response.status_code < 600:
-                logging.warning(
-                    f"{e.response.status_code} Server Error for appdetails, retrying in {2**attempt} seconds... (attempt {attempt+1}/3)"
-                )
-                time.sleep(2**attempt)
+    def fetch():
+        ratelimit.acquire("store")
+        r = http_client.get(url, params=params)
+        r.raise_for_status()
+        payload = r.json().get(str(appid), {})
+        return payload.get("data", {}).get("name") if payload.get("success") else None
+
+    try:
+        name = http_client.with_retries(fetch, f"app name for {appid}", bucket="store")
+    except http_client.RetryError:
+        logging.warning(f"Failed to fetch app name for {appid}, using fallback.")
+        _APP_NAME_CACHE[appid] = None
+        return None
+
+    _APP_NAME_CACHE[appid] = name
+    store.put_name("app", appid, name)
+    return name
+
+
+def resolve_names(app_ids=(), badge_ids=(), session=None, steam_id=None, workers=NAME_LOOKUP_WORKERS):
+    """
+    Résout en parallèle (pool borné) les noms d'apps et de badges manquants.
+    Retourne (app_names, badge_names): dicts id -> nom ou None.
+    Les noms déjà présents dans le store persistant ne coûtent aucune requête.
+    """
+    app_ids = list(dict.fromkeys(app_ids))
+    badge_ids = list(dict.fromkeys(badge_ids))
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        app_futures = {appid: pool.submit(get_app_name, appid) for appid in app_ids}
+        badge_futures = {
+            badge_id: pool.submit(get_badge_name, badge_id, session=session, steam_id=steam_id)
+            for badge_id in badge_ids
+        }
+        app_names = {appid: f.result() for appid, f in app_futures.items()}
+        badge_names = {badge_id: f.result() for badge_id, f in badge_futures.items()}
+    return app_names, badge_names
+
+
+def export_badges(badges, app_names, profile_badge_names, session=None, steam_id=None, path="badges.txt"):
+    """
+    Écrit la liste des badges (GetBadges) dans `path`, après résolution en
+    parallèle des noms manquants dans app_names / profile_badge_names.
+    """
+    # Collecte de tous les ids sans nom, puis résolution en parallèle
+    missing_apps = [
+        badge["appid"] for badge in badges
+        if badge.get("appid") is not None and not app_names.get(badge["appid"])
+    ]
+    missing_badges = [
+        badge.get("badgeid") for badge in badges
+        if badge.get("appid") is None and not profile_badge_names.get(badge.get("badgeid"))
+    ]
+    resolved_apps, resolved_badges = resolve_names(
+        missing_apps, missing_badges, session=session, steam_id=steam_id
+    )
+    logging.info(f"Resolved {len(resolved_apps)} app names and {len(resolved_badges)} badge names")
+
+    with open(path, "w", encoding="utf-8") as f:
+        for badge in badges:
+            level = badge.get("level", 0)
+            appid = badge.get("appid")
+            badgeid = badge.get("badgeid")
+            if appid is not None:
+                title = app_names.get(appid) or resolved_apps.get(appid) or f"App {appid}"
+                badge_id = appid
             else:
-                raise
-        except requests.exceptions.RequestException as e:
-            logging.warning(
-                f"Request error fetching app name for {appid}: {e}, retrying in {2**attempt} seconds... (attempt {attempt+1}/3)"
-            )
-            time.sleep(2**attempt)
+                title = profile_badge_names.get(badgeid) or resolved_badges.get(badgeid) or f"Badge {badgeid}"
+                badge_id = badgeid
+
+            title = title.replace('"', '\\"')
 
-    logging.warning(f"Failed to fetch app name for {appid}, using fallback.")
-    _APP_NAME_CACHE[appid] = None
-    return None
+            f.write(f"\"{title}\"\n")
+            f.write(f"    Level = {level}\n")
+            f.write(f"    ID = {badge_id}\n\n")
+
+    return len(badges)
 
 
 def get_badges(steam_id):
@@ -335,32 +393,9 @@ def get_badges(steam_id):
 def get_badges_list(steam_id):
     return _fetch_badges(steam_id)
 
-def _parse_card_names_from_gamecards(html):
-    names = set()
-    blocks = re.findall(r'<div class="badge_card_set_title[^>]*>(.*?)</div>', html, re.S)
-    for block in blocks:
-        text = re.sub(r"<[^>]+>", "", block)
-        text = unescape(text).strip()
-        if not text:
-            continue
-        first_line = next((line.strip() for line in text.splitlines() if line.strip()), "")
-        if first_line:
-            names.add(first_line)
-    return names
-
-
 def get_card_names(appid, session=None, steam_id=None):
-    count = 100
-    json_headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-        "Accept": "application/json, text/plain, */*",
-        "Accept-Language": "en-US,en;q=0.9",
-        "Referer": "https://steamcommunity.com/market/search?appid=753",
-        "Origin": "https://steamcommunity.com",
-        "X-Requested-With": "XMLHttpRequest",
-    }
     html_headers = {
-        "User-Agent": json_headers["User-Agent"],
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
         "Accept-Language": "en-US,en;q=0.9",
         "Referer": "https://steamcommunity.com/my/badges",
@@ -369,61 +404,33 @@ def get_card_names(appid, session=None, steam_id=None):
     def fetch_with_filters(filter_params):
         card_names = set()
         start = 0
-        retry_count = 0
-        max_429_retries = 6
-        session_to_use = session or requests
+        session_to_use = session or http_client
         while True:
-            time.sleep(1)  # Rate limit delay
-            url = "https://steamcommunity.com/market/search/render/"
-            params = {
-                "query": "",
-                "start": start,
-                "count": count,
-                "search_descriptions": 0,
-                "sort_column": "name",
-                "sort_dir": "asc",
-                "appid": 753,
-                "category_753_ContextId[]": 6,
-                "category_753_ItemClass[]": "tag_item_class_2",  # Trading Card
-                "norender": 1,
-            }
-            params.update(filter_params)
-
-            r = session_to_use.get(url, params=params, headers=json_headers)
-            if r.status_code == 429:
-                retry_after = r.headers.get("Retry-After")
-                delay = int(retry_after) if retry_after and retry_after.isdigit() else 5
-                retry_count += 1
-                if retry_count > max_429_retries:
-                    logging.warning(
-                        f"Rate limit persists for appid {appid}, skipping market lookup after {max_429_retries} retries."
-                    )
-                    return set()
-                logging.warning(f"Rate limited fetching card names for appid {appid}, retrying in {delay} seconds...")
-                time.sleep(delay)
-                continue
-            r.raise_for_status()
-            data = r.json()
+            data = search_trading_cards(session_to_use, start=start, filters=filter_params)
+            if data is None:
+                logging.warning(f"Rate limit persists for appid {appid}, skipping market lookup.")
+                return set()
             results = data.get("results") or []
             for item in results:
                 name = item.get("hash_name") or item.get("market_hash_name")
                 if name:
                     card_names.add(name)
-            if len(results) < count:
+            if len(results) < SEARCH_PAGE_SIZE:
                 break
-            start += count
+            start += SEARCH_PAGE_SIZE
         return card_names
 
     try:
         if session or steam_id:
+            ratelimit.acquire("community")
             if session:
                 url = f"https://steamcommunity.com/my/gamecards/{appid}"
                 r = session.get(url, headers=html_headers)
             else:
                 url = f"https://steamcommunity.com/profiles/{steam_id}/gamecards/{appid}"
-                r = requests.get(url, headers=html_headers)
+                r = http_client.get(url, headers=html_headers)
             r.raise_for_status()
-            card_names = _parse_card_names_from_gamecards(r.text)
+            card_names = parse_card_names_from_gamecards(r.text)
             if card_names:
                 return card_names
 
@@ -0,0 +1,124 @@
+"""
+Micro-benchmark InventoryIndex sur un inventaire synthétique (100k items par défaut).
+
+Compare l'ancien calcul des game_name (boucle apps x descriptions, re-parcours des tags)
+à InventoryIndex (une passe à l'ingestion, puis requêtes O(1)), et vérifie que les
+deux donnent les mêmes noms de jeu et les mêmes quantités.
+
+    python bench/bench_inventory_index.py [--assets 100000] [--apps 1000] [--cards 8]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inventory import InventoryIndex, _project_card_description, is_trading_card  # noqa: E402
+
+
+def make_inventory(n_assets, n_apps, cards_per_app):
+    descriptions = {}
+    for a in range(n_apps):
+        appid = 200000 + a
+        for c in range(cards_per_app):
+            classid = f"{appid}{c:02d}"
+            descriptions[classid] = {
+                "classid": classid,
+                "market_hash_name": f"{appid}-Card {c}",
+                "market_fee_app": appid,
+                "tags": [
+                    {"category": "Game", "localized_tag_name": f"Game {appid}"},
+                    {"category": "item_class", "localized_tag_name": "Trading Card"},
+                ],
+            }
+    classids = list(descriptions)
+    assets = [
+        {"assetid": str(10**9 + i), "classid": classids[(i * 7919) % len(classids)], "amount": 1}
+        for i in range(n_assets)
+    ]
+    return descriptions, assets
+
+
+def legacy(descriptions, assets, appids):
+    """
+    Ancien get_trading_cards: agrégation par asset, puis scan apps x descriptions pour game_name.
+    """
+    cards_by_app = {appid: {"game_name": "", "cards": {}} for appid in appids}
+    for asset in assets:
+        desc = descriptions[asset["classid"]]
+        app = cards_by_app.get(desc["market_fee_app"])
+        if app is not None:
+            card = app["cards"].setdefault(desc["market_hash_name"], {"quantity": 0})
+            card["quantity"] += asset["amount"]
+
+    for appid in cards_by_app:
+        for desc in descriptions.values():
+            if desc.get("market_fee_app") == appid:
+                game_name = None
+                for tag in desc.get("tags", []):
+                    if tag.get("category") == "Game":
+                        game_name = tag.get("localized_tag_name")
+                        break
+                cards_by_app[appid]["game_name"] = game_name or str(appid)
+                break
+    return cards_by_app
+
+
+def indexed(descriptions, assets, appids):
+    index = InventoryIndex()
+    for desc in descriptions.values():
+        if is_trading_card(desc):
+            index.add_description(_project_card_description(desc))
+    for asset in assets:
+        index.add_asset(asset)
+
+    cards_by_app = {}
+    for appid in appids:
+        cards_by_app[appid] = {
+            "game_name": index.game_name(appid) or str(appid),
+            "cards": {name: {"quantity": index.quantity(name)} for name in index.cards_for_app(appid)},
+        }
+    return cards_by_app
+
+
+def timed(fn, *args, repeat=3):
+    """
+    Meilleur temps sur `repeat` exécutions.
+    """
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--assets", type=int, default=100_000)
+    parser.add_argument("--apps", type=int, default=1000)
+    parser.add_argument("--cards", type=int, default=8)
+    args = parser.parse_args()
+
+    descriptions, assets = make_inventory(args.assets, args.apps, args.cards)
+    appids = sorted({d["market_fee_app"] for d in descriptions.values()})
+
+    old, old_time = timed(legacy, descriptions, assets, appids)
+    new, new_time = timed(indexed, descriptions, assets, appids)
+
+    for appid in appids:
+        assert old[appid]["game_name"] == new[appid]["game_name"], appid
+        old_cards = {name: card["quantity"] for name, card in old[appid]["cards"].items()}
+        new_cards = {name: card["quantity"] for name, card in new[appid]["cards"].items() if card["quantity"]}
+        assert old_cards == new_cards, appid
+
+    print(f"{args.assets} assets, {len(descriptions)} descriptions, {len(appids)} apps")
+    print(f"legacy scan:     {old_time * 1000:8.1f} ms")
+    print(f"InventoryIndex:  {new_time * 1000:8.1f} ms  (x{old_time / new_time:.1f})")
+    print("identical output")
+
+
+if __name__ == "__main__":
+    main()
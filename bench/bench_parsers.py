@@ -0,0 +1,64 @@
+"""
+Benchmark parsers.py contre les anciens parsers de badges.py (legacy_parsers.py)
+sur un corpus synthétique de pages (page_corpus.py).
+
+Vérifie que chaque parser donne exactement le même résultat que l'ancien sur
+toutes les pages, puis compare les temps (meilleur de 3).
+
+    python bench/bench_parsers.py [--pages 200] [--seed 17]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parsers  # noqa: E402
+from bench import legacy_parsers  # noqa: E402
+from bench.page_corpus import make_corpus  # noqa: E402
+
+# (nom, type de page du corpus, ancien parser, nouveau parser)
+PAIRS = (
+    ("badges page rows", "badges_page", legacy_parsers._parse_badge_names_from_badges_page, parsers.parse_badge_names_from_badges_page),
+    ("badges page count", "badges_page", legacy_parsers._parse_badge_page_count, parsers.parse_badge_page_count),
+    ("badge page title", "badge_page", legacy_parsers._parse_badge_title, parsers.parse_badge_title),
+    ("badges xml", "badges_xml", legacy_parsers._parse_badge_names_from_badges_xml, parsers.parse_badge_names_from_badges_xml),
+    ("badge xml title", "badges_xml", legacy_parsers._parse_badge_title_from_xml, parsers.parse_badge_title_from_xml),
+    ("badges script", "badges_script", legacy_parsers._parse_badge_names_from_script, parsers.parse_badge_names_from_script),
+    ("gamecards", "gamecards", legacy_parsers._parse_card_names_from_gamecards, parsers.parse_card_names_from_gamecards),
+)
+
+
+def timed(fn, pages, repeat=3):
+    """
+    Meilleur temps sur `repeat` passes sur toutes les pages.
+    """
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results = [fn(page) for page in pages]
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return results, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=17)
+    args = parser.parse_args()
+
+    corpus = make_corpus(seed=args.seed, pages=args.pages)
+    print(f"{args.pages} pages per kind, seed {args.seed}")
+    for name, kind, old_fn, new_fn in PAIRS:
+        old, old_time = timed(old_fn, corpus[kind])
+        new, new_time = timed(new_fn, corpus[kind])
+        for i, (expected, actual) in enumerate(zip(old, new)):
+            assert expected == actual, f"{name}: page {i} differs"
+        print(f"{name:<18} legacy {old_time * 1000:8.1f} ms   parsers {new_time * 1000:8.1f} ms  (x{old_time / new_time:.2f})")
+    print("identical output")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Parsers de badges.py tels qu'avant parsers.py (commit 688cf79), copiés tels quels:
+référence pour bench_parsers.py et tests/test_parsers_equivalence.py.
+"""
+import re
+from html import unescape
+
+
+def _strip_html(text):
+    text = re.sub(r"<[^>]+>", "", text)
+    text = unescape(text)
+    return " ".join(text.split()).strip()
+
+def _extract_text_by_class(html, class_name):
+    pattern = rf'class=["\'][^"\']*\b{re.escape(class_name)}\b[^"\']*["\'][^>]*>(.*?)</[^>]+>'
+    match = re.search(pattern, html, re.S)
+    if not match:
+        return None
+    text = _strip_html(match.group(1))
+    return text or None
+
+
+def _parse_badge_names_from_badges_xml(xml_text):
+    badge_names = {}
+    for block in re.findall(r"<badge>.*?</badge>", xml_text, re.S):
+        id_match = re.search(r"<badgeid>(\d+)</badgeid>", block)
+        if not id_match:
+            id_match = re.search(r"<id>(\d+)</id>", block)
+        if not id_match:
+            continue
+        badge_id = int(id_match.group(1))
+
+        name_match = re.search(r"<name>(.*?)</name>", block, re.S)
+        if not name_match:
+            name_match = re.search(r"<badge_name>(.*?)</badge_name>", block, re.S)
+        if not name_match:
+            name_match = re.search(r"<title>(.*?)</title>", block, re.S)
+        if not name_match:
+            continue
+        title = _strip_html(name_match.group(1))
+        if title:
+            badge_names[badge_id] = title
+    return badge_names
+
+def _parse_badge_title_from_xml(xml_text):
+    for pattern in (
+        r"<badge_name>(.*?)</badge_name>",
+        r"<name>(.*?)</name>",
+        r"<title>(.*?)</title>",
+    ):
+        match = re.search(pattern, xml_text, re.S)
+        if match:
+            title = _strip_html(match.group(1))
+            if title:
+                return title
+    return None
+
+def _parse_badge_names_from_script(html):
+    badge_names = {}
+    for match in re.finditer(
+        r'"badgeid"\s*:\s*(\d+).*?"name"\s*:\s*"([^"]+)"',
+        html,
+        re.S,
+    ):
+        title = _strip_html(match.group(2))
+        if title:
+            badge_names[int(match.group(1))] = title
+    return badge_names
+
+
+def _parse_badge_names_from_badges_page(html):
+    badge_names = {}
+    rows = re.split(r'<div[^>]+class=["\'][^"\']*\bbadge_row\b[^"\']*["\'][^>]*>', html)
+    for row in rows[1:]:
+        block = row
+        badge_id = None
+        for pattern in (r'/badges/(\d+)', r'badgeid=(\d+)', r'data-badgeid=["\'](\d+)["\']'):
+            m = re.search(pattern, block)
+            if m:
+                badge_id = int(m.group(1))
+                break
+        if badge_id is None:
+            continue
+
+        title = (
+            _extract_text_by_class(block, "badge_row_title")
+            or _extract_text_by_class(block, "badge_title")
+            or _extract_text_by_class(block, "badge_title_row")
+            or _extract_text_by_class(block, "badge_info_title")
+            or _extract_text_by_class(block, "profile_badge_title")
+        )
+        if not title:
+            continue
+        if title:
+            badge_names[badge_id] = title
+
+    return badge_names
+
+
+def _parse_badge_page_count(html):
+    """
+    Nombre total de pages d'après les liens de pagination (?p=N), ou None s'il n'y en a pas.
+    """
+    pages = []
+    for tag in re.findall(r"<a\b[^>]*\bpagelink\b[^>]*>", html):
+        m = re.search(r"[?&]p=(\d+)", tag)
+        if m:
+            pages.append(int(m.group(1)))
+    return max(pages) if pages else None
+
+
+def _parse_badge_title(html):
+    for pattern in (
+        "badge_info_title",
+        "profile_badge_title",
+        "badge_title",
+        "badge_detail_title",
+        "badge_title_row",
+    ):
+        title = _extract_text_by_class(html, pattern)
+        if title:
+            return title
+    return None
+
+
+def _parse_card_names_from_gamecards(html):
+    names = set()
+    blocks = re.findall(r'<div class="badge_card_set_title[^>]*>(.*?)</div>', html, re.S)
+    for block in blocks:
+        text = re.sub(r"<[^>]+>", "", block)
+        text = unescape(text).strip()
+        if not text:
+            continue
+        first_line = next((line.strip() for line in text.splitlines() if line.strip()), "")
+        if first_line:
+            names.add(first_line)
+    return names
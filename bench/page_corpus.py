@@ -0,0 +1,125 @@
+"""
+Corpus synthétique de pages communautaires pour bench_parsers.py et
+tests/test_parsers_equivalence.py.
+
+Pas de pages Steam enregistrées dans le dépôt: les pages sont générées avec
+les variations qui comptent pour les parsers (classes candidates multiples ou
+vides, classes à tiret, guillemets simples, entités, balises imbriquées,
+lignes sans id, pagination, XML, JSON dans un script).
+"""
+import random
+
+_ROW_TITLE_CLASSES = (
+    "badge_row_title",
+    "badge_title",
+    "badge_title_row",
+    "badge_info_title",
+    "profile_badge_title",
+    "badge_title-small",
+    "badge_detail_title",
+)
+_NOISE_CLASSES = ("badge_progress_info", "badge_row_overlay", "badge_empty_right", "badge_title_stats", "badge_info")
+_WORDS = ("Steam", "Summer", "Sale", "Level", "Foil", "Trading", "Card", "Hero", "Quest", "Night", "Ruins", "Echo")
+
+
+def _title(rng):
+    words = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(1, 4)))
+    style = rng.random()
+    if style < 0.15:
+        return f"{words} &amp; {rng.choice(_WORDS)}"
+    if style < 0.25:
+        return f"<span>{words}</span>\n  <br> {rng.randint(1, 5)}"
+    if style < 0.30:
+        return "   "
+    return words
+
+
+def _element(rng, class_name, text):
+    quote = rng.choice(('"', "'"))
+    classes = [class_name] + rng.sample(_NOISE_CLASSES, rng.randint(0, 2))
+    rng.shuffle(classes)
+    return f"<div class={quote}{' '.join(classes)}{quote}>{text}</div>"
+
+
+def badges_page(rng, rows=150, page=1, pages=1):
+    parts = ['<html><body><div class="badges_sheet">']
+    for _ in range(rows):
+        badge_id = rng.randint(1, 2_000_000)
+        id_style = rng.random()
+        if id_style < 0.7:
+            link = f'<a class="badge_row_overlay" href="https://steamcommunity.com/id/x/badges/{badge_id}"></a>'
+        elif id_style < 0.85:
+            link = f'<a href="/my/gamecards/?badgeid={badge_id}"></a>'
+        elif id_style < 0.95:
+            link = f'<div data-badgeid="{badge_id}"></div>'
+        else:
+            link = ""
+        parts.append(f'<div class="badge_row is_link">{link}')
+        parts.append(_element(rng, rng.choice(_NOISE_CLASSES), f"{rng.randint(1, 9)} of 9 tasks"))
+        for class_name in rng.sample(_ROW_TITLE_CLASSES, rng.randint(0, 3)):
+            parts.append(_element(rng, class_name, _title(rng)))
+        parts.append("<div class=\"badge_row_stats\">XP</div></div>")
+    if pages > 1:
+        for p in range(1, pages + 1):
+            parts.append(f'<a class="pagelink" href="?l=english&p={p}">{p}</a>')
+        if page < pages:
+            parts.append('<a class="pagebtn pagebtn_next" href="?p=2">&gt;</a>')
+    parts.append("</div></body></html>")
+    return "\n".join(parts)
+
+
+def badge_page(rng):
+    parts = ["<html><body>"]
+    for class_name in rng.sample(_ROW_TITLE_CLASSES, rng.randint(0, 4)):
+        parts.append(_element(rng, class_name, _title(rng)))
+    parts.append("<p>" + " ".join(rng.choice(_WORDS) for _ in range(200)) + "</p></body></html>")
+    return "\n".join(parts)
+
+
+def badges_xml(rng, badges=150):
+    parts = ["<?xml version=\"1.0\"?><profile><badges>"]
+    for _ in range(badges):
+        parts.append("<badge>")
+        id_tag = rng.choice(("badgeid", "id", None))
+        if id_tag:
+            parts.append(f"<{id_tag}>{rng.randint(1, 2_000_000)}</{id_tag}>")
+        name_tag = rng.choice(("name", "badge_name", "title", None))
+        if name_tag:
+            parts.append(f"<{name_tag}><![CDATA[{_title(rng)}]]></{name_tag}>")
+        parts.append(f"<level>{rng.randint(1, 5)}</level></badge>")
+    parts.append("</badges></profile>")
+    return "".join(parts)
+
+
+def badges_script(rng, badges=150):
+    entries = ", ".join(
+        f'{{"badgeid": {rng.randint(1, 2_000_000)}, "level": {rng.randint(1, 5)}, "name": "{rng.choice(_WORDS)} {i}"}}'
+        for i in range(badges)
+    )
+    return f"<html><script>var g_rgBadges = [{entries}];</script></html>"
+
+
+def gamecards_page(rng, cards=10):
+    parts = ['<html><body><div class="badge_card_set_cards">']
+    for _ in range(cards):
+        count = f'<div class="badge_card_set_text_qty">({rng.randint(1, 3)})</div>' if rng.random() < 0.5 else ""
+        parts.append(
+            f'<div class="badge_card_set_card owned"><div class="badge_card_set_title ellipsis">\n'
+            f"  {count}\n  {_title(rng)}\n  <br>{rng.choice(_WORDS)}</div></div>"
+        )
+    parts.append("</div></body></html>")
+    return "\n".join(parts)
+
+
+def make_corpus(seed=17, pages=200):
+    """
+    Retourne un dict type de page -> liste de pages (HTML ou XML).
+    """
+    rng = random.Random(seed)
+    return {
+        "badges_page": [badges_page(rng, page=1, pages=rng.choice((1, 3, 12))) for _ in range(pages)],
+        "badge_page": [badge_page(rng) for _ in range(pages)],
+        "badges_xml": [badges_xml(rng) for _ in range(pages)],
+        "badges_script": [badges_script(rng) for _ in range(pages)],
+        "gamecards": [gamecards_page(rng) for _ in range(pages)],
+    }
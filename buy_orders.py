@@ -0,0 +1,71 @@
+import logging
+
+import requests
+
+import ratelimit
+from config import MAX_CARD_PRICE
+from journal import ActionOutcomeUnknown, RunJournal
+from market import create_buy_order
+from pricing import price_cards
+
+# -------------------------------------------------------------------
+# Ordres d'achat des cartes manquantes, journalisés
+# -------------------------------------------------------------------
+#
+# Cotations et ordres d'achat d'une passe partagent un même RunJournal:
+# après un crash, les prix déjà obtenus sont rejoués sans requête, et un
+# ordre déjà envoyé (ou dont l'envoi a pu aboutir) n'est jamais renvoyé.
+# Le run n'est clos que si aucun ordre n'a une issue inconnue: tant qu'il
+# reste ouvert, ces ordres restent bloqués en attendant une vérification.
+
+_RUN_NAME = "buy_orders"
+
+
+def buy_missing_cards(session, missing, scores=None, existing_orders=None, max_price=MAX_CARD_PRICE):
+    """
+    missing: market_hash_name -> exemplaires manquants.
+    existing_orders: market.get_buy_orders(); les cartes qui ont déjà un ordre sont ignorées.
+    Crée au plus un ordre par carte, au prix vendeur le plus bas s'il ne dépasse pas max_price.
+    Retourne market_hash_name -> "placed", "skipped", "failed" ou "unknown".
+    """
+    existing_orders = existing_orders or {}
+    names = [name for name, quantity in missing.items() if quantity > 0 and name not in existing_orders]
+
+    journal = RunJournal(_RUN_NAME)
+    prices = price_cards(session, names, journal=journal, scores=scores)
+
+    results = {}
+    rate_limited = False
+    for name in names:
+        price = prices.get(name)
+        if price is None or price[0] > max_price:
+            results[name] = "skipped"
+            continue
+
+        price_eur, quantity = price[0], missing[name]
+        try:
+            journal.action(
+                "buy_order",
+                name,
+                lambda: create_buy_order(session, name, price_eur, quantity=quantity),
+                inputs={"price_eur": price_eur, "quantity": quantity},
+            )
+        except ActionOutcomeUnknown as e:
+            logging.warning(f"Buy order for {name} not re-sent: {e}")
+            results[name] = "unknown"
+        except ratelimit.RateLimited as e:
+            logging.warning(f"Rate limited creating buy orders, stopping the pass ({e.retry_after} seconds penalty)")
+            results[name] = "failed"
+            rate_limited = True
+            break
+        except (requests.exceptions.RequestException, RuntimeError) as e:
+            results[name] = journal.status("buy_order", name)
+            logging.error(f"Buy order for {name} {results[name]}: {e}")
+        else:
+            results[name] = "placed"
+
+    if rate_limited or "unknown" in results.values():
+        logging.warning(f"Buy order run #{journal.run_id} left open, resumed by the next pass: {journal.counts()}")
+    else:
+        journal.finish()
+    return results
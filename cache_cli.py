@@ -0,0 +1,67 @@
+import argparse
+import logging
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+
+def cmd_export_nameids(args):
+    from market import export_item_nameids
+
+    count = export_item_nameids(args.path)
+    logging.info(f"Exported {count} item_nameids to {args.path}")
+
+
+def cmd_import_nameids(args):
+    from market import import_item_nameids
+
+    count = import_item_nameids(args.path)
+    logging.info(f"Imported {count} item_nameids from {args.path}")
+
+
+def cmd_refresh_catalog(args):
+    from catalog import refresh_catalog
+    from config import STEAM_ID
+    from steam_auth import login_with_cookies
+
+    session = login_with_cookies()
+    count = refresh_catalog(args.appids or None, session=session, steam_id=STEAM_ID)
+    logging.info(f"Refreshed card catalog for {count} apps")
+
+
+def cmd_crawl_catalog(args):
+    from catalog import crawl_trading_cards
+    from steam_auth import login_with_cookies
+
+    session = login_with_cookies()
+    if crawl_trading_cards(session, restart=args.restart):
+        logging.info("Card catalog crawl complete")
+    else:
+        logging.info("Card catalog crawl paused, run again to resume")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gestion des caches persistants")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("export-nameids", help="Exporte l'index item_nameid en JSON")
+    p.add_argument("path")
+    p.set_defaults(func=cmd_export_nameids)
+
+    p = sub.add_parser("import-nameids", help="Importe un index item_nameid JSON")
+    p.add_argument("path")
+    p.set_defaults(func=cmd_import_nameids)
+
+    p = sub.add_parser("refresh-catalog", help="Re-télécharge le catalogue de cartes (toutes les apps par défaut)")
+    p.add_argument("appids", nargs="*", type=int)
+    p.set_defaults(func=cmd_refresh_catalog)
+
+    p = sub.add_parser("crawl-catalog", help="Crawl global (reprenable) de toutes les cartes du market")
+    p.add_argument("--restart", action="store_true", help="Ignore le checkpoint et repart de zéro")
+    p.set_defaults(func=cmd_crawl_catalog)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
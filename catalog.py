@@ -0,0 +1,117 @@
+import logging
+import time
+
+import store
+from badges import get_card_names as fetch_card_names
+from config import CATALOG_TTL_SECONDS
+from market import SEARCH_PAGE_SIZE, parse_search_result, search_trading_cards
+
+# -------------------------------------------------------------------
+# Catalogue persistant appid -> market_hash_names des cartes
+# -------------------------------------------------------------------
+
+# À incrémenter si le format des noms stockés change: les entrées d'une
+# autre version sont ignorées et re-téléchargées.
+CATALOG_VERSION = 1
+
+
+def get_card_names(appid, session=None, steam_id=None, refresh=False):
+    """
+    Comme badges.get_card_names, mais lit d'abord le catalogue persistant.
+    Steam n'est interrogé que pour les apps absentes, expirées ou si refresh=True.
+    """
+    if not refresh:
+        entry = store.get_catalog_entry(appid)
+        if entry is not None:
+            names, fetched_at, version = entry
+            if version == CATALOG_VERSION and names and time.time() - fetched_at < CATALOG_TTL_SECONDS:
+                return set(names)
+
+    names = fetch_card_names(appid, session=session, steam_id=steam_id)
+    if names:
+        store.put_catalog_entries({appid: names}, time.time(), CATALOG_VERSION)
+    return names
+
+
+def refresh_catalog(appids=None, session=None, steam_id=None):
+    """
+    Re-télécharge le set de cartes des apps données (par défaut: tout le catalogue).
+    Retourne le nombre d'apps mises à jour.
+    """
+    if appids is None:
+        appids = store.catalog_appids()
+
+    updated = 0
+    for appid in appids:
+        if get_card_names(appid, session=session, steam_id=steam_id, refresh=True):
+            updated += 1
+        else:
+            logging.warning(f"Catalog refresh found no cards for appid {appid}, keeping previous entry")
+    return updated
+
+
+# -------------------------------------------------------------------
+# Crawl global des cartes (une recherche non filtrée au lieu d'une par app)
+# -------------------------------------------------------------------
+
+_CRAWL_NAME = "trading_cards"
+
+
+def crawl_trading_cards(session, restart=False, max_pages=None):
+    """
+    Parcourt toutes les cartes à collectionner du market (search/render, 100 par page)
+    et remplit le catalogue appid -> cartes, ainsi que les cotations sell_price/sell_listings.
+    Le crawl est checkpointé après chaque page: s'il est interrompu, le prochain appel
+    reprend à l'offset `start` enregistré (sauf restart=True).
+    Les pages sont triées par nom, pas par app: les noms restent en staging et ne sont
+    publiés dans le catalogue qu'une fois le crawl terminé, pour ne jamais servir
+    un set de cartes partiel.
+    Retourne True si le crawl est terminé, False s'il s'est arrêté avant la fin.
+    """
+    state = store.get_crawl_state(_CRAWL_NAME)
+    if restart or state is None or state["finished"]:
+        state = {"start": 0, "total": None, "started_at": time.time(), "finished": False}
+        store.clear_catalog_staging(_CRAWL_NAME)
+        store.put_crawl_state(_CRAWL_NAME, 0, None, state["started_at"], False)
+    else:
+        logging.info(f"Resuming trading card crawl at start={state['start']} (total={state['total']})")
+
+    start = state["start"]
+    total = state["total"]
+    pages = 0
+    while max_pages is None or pages < max_pages:
+        data = search_trading_cards(session, start=start)
+        if data is None:
+            logging.warning(f"Rate limit persists, crawl paused at start={start}")
+            return False
+        pages += 1
+
+        results = data.get("results") or []
+        total = data.get("total_count", total)
+        now = time.time()
+
+        entries = {}
+        quotes = []
+        for item in results:
+            parsed = parse_search_result(item)
+            if parsed is None or parsed[0] is None:
+                continue
+            entries.setdefault(parsed[0], set()).add(parsed[1])
+            quotes.append(parsed)
+
+        store.stage_catalog_names(_CRAWL_NAME, entries)
+        store.put_search_quotes(quotes, now)
+
+        start += len(results)
+        finished = len(results) < SEARCH_PAGE_SIZE or (total is not None and start >= total)
+        if finished:
+            # Publication avant le checkpoint "finished": un crash entre les deux
+            # fait seulement re-demander la dernière page à la reprise.
+            apps = store.publish_catalog_staging(_CRAWL_NAME, state["started_at"], CATALOG_VERSION)
+        store.put_crawl_state(_CRAWL_NAME, start, total, state["started_at"], finished)
+        logging.debug(f"Crawl page done: start={start}, total={total}, apps on page={len(entries)}")
+        if finished:
+            logging.info(f"Trading card crawl finished: {start} cards, {apps} apps published")
+            return True
+
+    return False
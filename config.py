@@ -12,4 +12,77 @@ SKIP_SELLING = True
 
 MAX_CARD_PRICE = 0.04  # Maximum price to buy a card
 MAX_BOOSTER_PRICE = 0.11  # Maximum price to buy a booster pack
-MANUAL_BUY = True  # If True, display buy URLs instead of creating orders
\ No newline at end of file
+MANUAL_BUY = True  # If True, display buy URLs instead of creating orders
+
+CACHE_DB_PATH = "steam_cache.sqlite3"  # Persistent caches (item_nameid, ...)
+
+# Rate limits par famille d'endpoints: nom -> (secondes par requête, burst)
+MARKET_DELAY_SECONDS = 2.5  # augmente à 3.0 si tu vois encore des 429
+RATE_LIMITS = {
+    "priceoverview": (MARKET_DELAY_SECONDS, 1),
+    "histogram": (MARKET_DELAY_SECONDS, 1),
+    "listing": (MARKET_DELAY_SECONDS, 1),      # pages /market/listings/ (item_nameid)
+    "search": (1.0, 1),                        # /market/search/render/
+    "sellitem": (MARKET_DELAY_SECONDS, 1),
+    "buyorder": (MARKET_DELAY_SECONDS, 1),
+    "mylistings": (MARKET_DELAY_SECONDS, 1),
+    "inventory": (1.0, 2),
+    "community": (0.5, 4),                     # pages badges / gamecards / profil
+    "store": (0.4, 1),                         # store.steampowered.com/api/appdetails
+    "webapi": (0.0, 1),                        # api.steampowered.com (clé API)
+    "default": (1.0, 1),
+}
+
+PRICING_WORKERS = 4  # Threads de la file de priorité des lookups market (market.LOOKUPS)
+
+# Fraîcheur des caches de prix (secondes)
+HISTOGRAM_TTL_SECONDS = 15 * 60
+HISTOGRAM_STALE_SECONDS = 60 * 60      # servi (et rafraîchi en tâche de fond) jusqu'à TTL + STALE
+PRICEOVERVIEW_TTL_SECONDS = 15 * 60
+PRICEOVERVIEW_STALE_SECONDS = 60 * 60
+UNKNOWN_TTL_SECONDS = 120              # un 429 n'est pas retenté avant ce délai
+TTL_REFRESH_WORKERS = 2                # threads des rafraîchissements stale-while-revalidate
+
+INVENTORY_FULL_SYNC_SECONDS = 24 * 3600  # Resync complète de l'inventaire au-delà de ce délai
+
+CATALOG_TTL_SECONDS = 30 * 24 * 3600  # Les sets de cartes ne changent quasiment jamais
+
+# Cotation en masse (market/search): repli sur l'histogramme près des seuils de décision
+BULK_QUOTE_TTL_SECONDS = 30 * 60
+BULK_QUOTE_MARGIN_EUR = 0.01
+
+NAME_LOOKUP_WORKERS = 4  # Résolution parallèle des noms d'apps / badges (export main.py)
+BADGE_HEDGE_WIDTH = 3  # Variantes d'URL interrogées en parallèle par get_badge_name
+NAME_NEGATIVE_TTL_SECONDS = 7 * 24 * 3600  # Une app / un badge sans nom est retenté après ce délai
+PROFILE_PAGE_WORKERS = 4  # Pages /my/badges?p=N téléchargées en parallèle
+
+# Client HTTP partagé: taille des pools de connexions keep-alive par hôte
+HTTP_POOL_SIZES = {
+    "api.steampowered.com": 4,
+    "store.steampowered.com": 4,
+    "steamcommunity.com": 8,
+}
+HTTP_RETRY_ATTEMPTS = 3
+
+# Session: warmups et probe de validité sautés si le dernier a réussi il y a moins de ce délai
+SESSION_FRESH_SECONDS = 2 * 3600
+
+# Requêtes marché à effet de bord (vente, ordre d'achat): au-delà, l'issue est inconnue
+HTTP_ACTION_TIMEOUT_SECONDS = 30
+
+# Journal de run: un prix journalisé plus vieux que ce délai est re-demandé à la reprise
+JOURNAL_FETCH_MAX_AGE_SECONDS = HISTOGRAM_TTL_SECONDS + HISTOGRAM_STALE_SECONDS
+
+SELL_MAX_ATTEMPTS = 5  # File de vente: connexions impossibles tolérées par asset (les 429 ne comptent pas)
+
+# Mode démon (daemon.py): interface de commande locale et période de rafraîchissement par source
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = 8765
+DAEMON_EXPORT_DIR = "exports"  # la commande export n'écrit que dans ce dossier
+DAEMON_REFRESH_SECONDS = {
+    "session": SESSION_FRESH_SECONDS,
+    "badges": 3600,
+    "inventory": 300,  # sync delta: une seule page si rien n'a changé
+    "prices": HISTOGRAM_TTL_SECONDS,
+    "buy_orders": 600,
+}
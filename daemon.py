@@ -0,0 +1,262 @@
+import argparse
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+import time
+
+import steam_auth
+from badges import export_badges, fetch_badges_list, fetch_owned_games_map, get_profile_badge_names
+from config import BADGE_MAX_LEVEL, DAEMON_EXPORT_DIR, DAEMON_HOST, DAEMON_PORT, DAEMON_REFRESH_SECONDS, STEAM_ID
+from inventory import fetch_trading_cards
+from logic import build_account_columns, plan_account
+from market import fetch_buy_orders
+from pricing import lookup_scores, quote_cards
+from startup import start
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# -------------------------------------------------------------------
+# Mode démon: état chaud + rafraîchissement planifié + commandes locales
+# -------------------------------------------------------------------
+#
+# La session, les badges, l'inventaire, les prix et les ordres d'achat sont
+# chargés une fois, puis chaque source est rechargée à sa propre période
+# (DAEMON_REFRESH_SECONDS). Les sources s'appuient sur les caches existants:
+# sync delta de l'inventaire, TTL des histogrammes et cotations, etc.
+# Une source en échec lève une exception au lieu de retourner un résultat
+# vide: l'état chaud garde alors sa valeur précédente.
+# Les commandes (une ligne de texte, réponse JSON sur une ligne) sont
+# servies sur DAEMON_HOST:DAEMON_PORT à partir de l'état courant.
+
+
+class WarmState:
+    def __init__(self, steam_id, cookie_file="steam_cookies.json"):
+        self.steam_id = steam_id
+        self.cookie_file = cookie_file
+        self.session = None
+        self.badges = []
+        self.app_names = {}
+        self.profile_badge_names = {}
+        self.cards_by_app = {}
+        self.prices = {}
+        self.buy_orders = {}
+        self.refreshed_at = {}              # source -> timestamp du dernier chargement réussi
+        self._lock = threading.Lock()       # lecture / remplacement de l'état
+        self._refresh_lock = threading.Lock()  # un seul rafraîchissement à la fois
+
+    def load(self):
+        state = start(self.steam_id, inventory=True, buy_orders=True, cookie_file=self.cookie_file)
+        now = time.time()
+        with self._lock:
+            self.session = state["session"]
+            self.badges = state["badges"]
+            self.app_names = state["app_names"]
+            self.profile_badge_names = state["profile_badge_names"]
+            self.cards_by_app = state["inventory"]
+            self.buy_orders = state["buy_orders"]
+            for source in ("session", "badges", "inventory", "buy_orders"):
+                self.refreshed_at[source] = now
+        self.refresh("prices")
+
+    def badge_levels(self):
+        return {badge["appid"]: badge["level"] for badge in self.badges if "appid" in badge}
+
+    def card_names(self):
+        return [name for app in self.cards_by_app.values() for name in app["cards"]]
+
+    # --- Sources ---
+
+    def _load_session(self):
+        steam_auth.revalidate(self.session, self.cookie_file)
+        return {}
+
+    def _load_badges(self):
+        values = {
+            "badges": fetch_badges_list(self.steam_id),
+            "app_names": fetch_owned_games_map(self.steam_id),
+        }
+        # get_profile_badge_names retourne {} en cas d'échec: on garde alors les noms connus
+        profile_badge_names = get_profile_badge_names(session=self.session, steam_id=self.steam_id)
+        if profile_badge_names or not self.profile_badge_names:
+            values["profile_badge_names"] = profile_badge_names
+        return values
+
+    def _load_inventory(self):
+        return {"cards_by_app": fetch_trading_cards(self.session, self.steam_id, self.badge_levels())}
+
+    def _load_prices(self):
+        scores = lookup_scores(self.badge_levels(), self.cards_by_app)
+        prices = quote_cards(self.session, self.card_names(), scores=scores)
+        # Une cotation en échec (None) garde le prix précédent
+        return {"prices": {name: price if price is not None else self.prices.get(name) for name, price in prices.items()}}
+
+    def _load_buy_orders(self):
+        orders = fetch_buy_orders(self.session)
+        return {"buy_orders": {order.market_hash_name: (order.price_eur, order.quantity) for order in orders}}
+
+    def refresh(self, source):
+        if source not in DAEMON_REFRESH_SECONDS:
+            raise ValueError(f"unknown source {source!r}")
+        with self._refresh_lock:
+            started = time.time()
+            values = getattr(self, f"_load_{source}")()
+            with self._lock:
+                for name, value in values.items():
+                    setattr(self, name, value)
+                self.refreshed_at[source] = time.time()
+        logging.info(f"Refreshed {source} in {time.time() - started:.1f}s")
+
+    def next_refresh(self):
+        """
+        (source, délai en secondes) de la prochaine source à rafraîchir.
+        """
+        now = time.time()
+        return min(
+            ((source, self.refreshed_at.get(source, 0) + interval - now) for source, interval in DAEMON_REFRESH_SECONDS.items()),
+            key=lambda item: item[1],
+        )
+
+    # --- Commandes ---
+
+    def status(self):
+        now = time.time()
+        with self._lock:
+            return {
+                "age_seconds": {source: round(now - at) for source, at in self.refreshed_at.items()},
+                "badges": len(self.badges),
+                "apps_with_cards": len(self.cards_by_app),
+                "priced_cards": sum(1 for price in self.prices.values() if price is not None),
+                "buy_orders": len(self.buy_orders),
+            }
+
+    def plan(self):
+        with self._lock:
+            levels = self.badge_levels()
+            cards_by_app = self.cards_by_app
+            prices = {name: price[0] for name, price in self.prices.items() if price is not None}
+        columns = build_account_columns(levels, cards_by_app, prices)
+        plan = plan_account(
+            columns["app_ids"],
+            columns["badge_levels"],
+            columns["card_app_index"],
+            columns["card_quantities"],
+            columns["card_prices"],
+            BADGE_MAX_LEVEL,
+        )
+        for entry in plan:
+            entry["game_name"] = cards_by_app[entry["appid"]]["game_name"]
+        return plan
+
+    def export(self, filename="badges.txt"):
+        """
+        Écrit l'export dans DAEMON_EXPORT_DIR: un client ne choisit que le nom du fichier.
+        """
+        if not filename or os.path.basename(filename) != filename or filename.startswith("."):
+            raise ValueError(f"export takes a plain file name, not a path: {filename!r}")
+        os.makedirs(DAEMON_EXPORT_DIR, exist_ok=True)
+        path = os.path.join(DAEMON_EXPORT_DIR, filename)
+        with self._lock:
+            badges, app_names, profile_badge_names = self.badges, self.app_names, self.profile_badge_names
+        count = export_badges(
+            badges, app_names, profile_badge_names, session=self.session, steam_id=self.steam_id, path=path
+        )
+        return {"written": count, "path": path}
+
+
+def _schedule(state, stop):
+    while not stop.is_set():
+        source, delay = state.next_refresh()
+        if delay > 0:
+            stop.wait(min(delay, 60))
+            continue
+        try:
+            state.refresh(source)
+        except Exception as e:
+            # Nouvel essai à la période suivante
+            logging.error(f"Scheduled refresh of {source} failed: {e}")
+            state.refreshed_at[source] = time.time()
+
+
+class _CommandHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        words = self.rfile.readline().decode("utf-8").split()
+        state = self.server.state
+        try:
+            if not words:
+                raise ValueError("empty command")
+            command, args = words[0], words[1:]
+            if command == "status":
+                result = state.status()
+            elif command == "plan":
+                result = state.plan()
+            elif command == "export":
+                result = state.export(*args[:1])
+            elif command == "buy_orders":
+                result = state.buy_orders
+            elif command == "refresh":
+                sources = list(DAEMON_REFRESH_SECONDS) if args in ([], ["all"]) else args
+                for source in sources:
+                    state.refresh(source)
+                result = state.status()
+            elif command == "stop":
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                result = "stopping"
+            else:
+                raise ValueError(f"unknown command {command!r}")
+            response = {"ok": True, "result": result}
+        except Exception as e:
+            logging.warning(f"Command {' '.join(words)!r} failed: {e}")
+            response = {"ok": False, "error": str(e)}
+        self.wfile.write((json.dumps(response, ensure_ascii=False) + "\n").encode("utf-8"))
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def serve(steam_id=STEAM_ID, host=DAEMON_HOST, port=DAEMON_PORT):
+    state = WarmState(steam_id)
+    state.load()
+
+    stop = threading.Event()
+    threading.Thread(target=_schedule, args=(state, stop), daemon=True).start()
+
+    with _Server((host, port), _CommandHandler) as server:
+        server.state = state
+        logging.info(f"Daemon ready on {host}:{port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stop.set()
+            steam_auth.save_session_if_changed(state.session, state.cookie_file)
+
+
+def send_command(command, host=DAEMON_HOST, port=DAEMON_PORT):
+    with socket.create_connection((host, port)) as sock:
+        sock.sendall((command + "\n").encode("utf-8"))
+        with sock.makefile("r", encoding="utf-8") as f:
+            return json.loads(f.readline())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Démon: état chaud et commandes locales")
+    parser.add_argument("command", nargs="*", help="status | plan | export [filename] | buy_orders | refresh [source|all] | stop")
+    parser.add_argument("--host", default=DAEMON_HOST)
+    parser.add_argument("--port", type=int, default=DAEMON_PORT)
+    args = parser.parse_args()
+
+    if not args.command:
+        serve(host=args.host, port=args.port)
+        return
+    response = send_command(" ".join(args.command), host=args.host, port=args.port)
+    print(json.dumps(response, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+import ratelimit
+from config import HTTP_POOL_SIZES, HTTP_RETRY_ATTEMPTS
+
+# -------------------------------------------------------------------
+# Client HTTP partagé (connexions keep-alive par hôte + politique de retry)
+# -------------------------------------------------------------------
+#
+# Les appels sans session Steam (Web API, store, pages publiques) passent
+# par une requests.Session par hôte au lieu de requests.get, qui ouvrirait
+# une nouvelle connexion TCP+TLS à chaque appel. La session authentifiée
+# reçoit les mêmes pools via configure_session().
+
+_DEFAULT_HEADERS = {
+    "Accept-Encoding": "gzip, deflate",
+}
+
+_SESSIONS = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+class RetryError(requests.exceptions.RequestException):
+    """Toutes les tentatives de with_retries ont échoué."""
+
+
+def request_not_sent(exc):
+    """
+    True si l'erreur requests garantit que la requête n'a jamais atteint le serveur
+    (connect timeout, connexion refusée, DNS): la renvoyer ne peut rien doubler.
+    Timeout de lecture, connexion coupée après l'envoi, 5xx...: False.
+    """
+    if isinstance(exc, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(exc, requests.exceptions.ConnectionError) and exc.args:
+        return isinstance(getattr(exc.args[0], "reason", exc.args[0]), NewConnectionError)
+    return False
+
+
+def _adapter(host):
+    size = HTTP_POOL_SIZES.get(host, 2)
+    return HTTPAdapter(pool_connections=1, pool_maxsize=size)
+
+
+def configure_session(session):
+    """
+    Monte les pools de connexions par hôte sur une session existante (ex: session Steam authentifiée).
+    """
+    for host in HTTP_POOL_SIZES:
+        session.mount(f"https://{host}/", _adapter(host))
+    session.headers.update(_DEFAULT_HEADERS)
+    return session
+
+
+def get_session(host):
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(host)
+        if session is None:
+            session = requests.Session()
+            session.mount(f"https://{host}/", _adapter(host))
+            session.headers.update(_DEFAULT_HEADERS)
+            _SESSIONS[host] = session
+        return session
+
+
+def get(url, **kwargs):
+    """
+    Équivalent de requests.get, sur la session partagée de l'hôte de `url`.
+    """
+    return get_session(urlsplit(url).hostname).get(url, **kwargs)
+
+
+def with_retries(fn, what, bucket=None, attempts=HTTP_RETRY_ATTEMPTS):
+    """
+    Appelle fn() avec la politique de retry commune:
+    - 5xx et erreurs réseau: nouvel essai après 2**attempt secondes,
+    - 429: pénalité sur le bucket de rate limit (Retry-After respecté), puis nouvel essai,
+    - autres erreurs HTTP: propagées.
+    fn doit appeler raise_for_status(). Lève RetryError après `attempts` échecs.
+    """
+    for attempt in range(attempts):
+        try:
+            return fn()
+        except requests.exceptions.HTTPError as e:
+            status = e.response.status_code
+            if status == 429 and bucket:
+                delay = ratelimit.backoff(bucket, e.response, default=2**attempt, wait=False)
+                logging.warning(f"Rate limited on {what}, retrying in {delay} seconds... (attempt {attempt+1}/{attempts})")
+            elif 500 <= status < 600 or status == 429:
+                logging.warning(
+                    f"{status} Server Error for {what}, retrying in {2**attempt} seconds... (attempt {attempt+1}/{attempts})"
+                )
+                time.sleep(2**attempt)
+            else:
+                raise
+        except requests.exceptions.RequestException as e:
+            logging.warning(
+                f"Request error fetching {what}: {e}, retrying in {2**attempt} seconds... (attempt {attempt+1}/{attempts})"
+            )
+            time.sleep(2**attempt)
+
+    raise RetryError(f"{what}: failed after {attempts} attempts")
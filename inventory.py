@@ -1,6 +1,14 @@
 import logging
+import time
+
 import requests
 
+import ratelimit
+import steam_auth
+import store
+from config import INVENTORY_FULL_SYNC_SECONDS
+from logic import CardHoldings
+
 def is_trading_card(desc):
     for tag in desc.get("tags", []):
         if (
@@ -11,24 +19,58 @@ def is_trading_card(desc):
     return False
 
 
-def get_trading_cards(session, steam_id, badges):
-    logging.debug("start fetching inventory")
+def _project_card_description(desc):
+    """
+    Réduit une description d'inventaire aux champs utiles (persistés dans le snapshot).
+    """
+    game_name = None
+    for tag in desc.get("tags", []):
+        if tag.get("category") == "Game":
+            game_name = tag.get("localized_tag_name")
+            break
+    return {
+        "classid": desc["classid"],
+        "market_hash_name": desc["market_hash_name"],
+        "market_fee_app": desc.get("market_fee_app"),
+        "game_name": game_name,
+    }
 
-    base_url = f"https://steamcommunity.com/inventory/{steam_id}/753/6"
 
-    # Warm up by visiting the inventory page
+def _warmup_inventory_page(session, steam_id):
     inventory_page_url = f"https://steamcommunity.com/profiles/{steam_id}/inventory/"
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
         "Accept-Language": "en-US,en;q=0.5",
     }
+    ratelimit.acquire("community")
     warmup_resp = session.get(inventory_page_url, headers=headers)
     logging.debug(f"Inventory page warmup status: {warmup_resp.status_code}")
 
+
+def iter_inventory_pages(session, steam_id, stop_at_known=False):
+    """
+    Générateur: pagine l'inventaire communautaire (le plus récent d'abord) et
+    produit, pour chaque page, (assets, card_descriptions):
+    - assets: dicts compacts {"assetid", "classid", "amount"}
+    - card_descriptions: classid -> description projetée, cartes à collectionner uniquement
+    Le JSON brut de la page est abandonné avant la page suivante.
+    Avec stop_at_known (sync delta), s'arrête après la première page contenant
+    un asset déjà présent dans le snapshot.
+    Lève requests.exceptions.HTTPError si Steam refuse la requête.
+    """
+    base_url = f"https://steamcommunity.com/inventory/{steam_id}/753/6"
+
+    # Le warmup de la page inventaire n'est refait que si la session n'est plus fraîche,
+    # ou si Steam refuse la première page sans lui.
+    warmup_key = f"inventory:{steam_id}"
+    fresh = steam_auth.is_fresh(warmup_key)
+    if fresh:
+        logging.debug("Inventory session is fresh, skipping warmup")
+    else:
+        _warmup_inventory_page(session, steam_id)
+
     start_assetid = 0
-    all_assets = []
-    all_descriptions = {}
 
     # --- Pagination ---
     while True:
@@ -47,43 +89,166 @@ def get_trading_cards(session, steam_id, badges):
             "Origin": "https://steamcommunity.com",
         }
 
+        ratelimit.acquire("inventory")
         r = session.get(base_url, params=params, headers=headers)
         logging.debug(f"Request URL: {r.url}")
         logging.debug(f"Response status: {r.status_code}")
         logging.debug(f"Response reason: {r.reason}")
+        if r.status_code in (401, 403) and fresh and start_assetid == 0:
+            logging.debug("Inventory refused without warmup, warming up and retrying")
+            steam_auth.invalidate(warmup_key)
+            _warmup_inventory_page(session, steam_id)
+            fresh = False
+            continue
         if r.status_code != 200:
             logging.debug(f"Response headers: {dict(r.headers)}")
             logging.debug(f"Response text (first 500 chars): {r.text[:500]}")
-        try:
-            r.raise_for_status()
-        except requests.exceptions.HTTPError:
-            logging.error("Failed to fetch inventory. Proceeding with empty inventory.")
-            return {}
+        r.raise_for_status()
+        if not fresh:
+            steam_auth.mark_fresh(warmup_key)
+            fresh = True
         data = r.json()
 
-        assets = data.get("assets", [])
-        descriptions = data.get("descriptions", [])
+        raw_assets = data.get("assets", [])
+        raw_descriptions = data.get("descriptions", [])
+        more_items = data.get("more_items")
+        start_assetid = data.get("last_assetid")
+        del data
 
         logging.debug(
-            f"page: assets={len(assets)}, "
-            f"descriptions={len(descriptions)}, "
-            f"more_items={data.get('more_items')}"
+            f"page: assets={len(raw_assets)}, "
+            f"descriptions={len(raw_descriptions)}, "
+            f"more_items={more_items}"
         )
 
-        all_assets.extend(assets)
+        assets = [
+            {"assetid": a["assetid"], "classid": a["classid"], "amount": int(a.get("amount", 1))}
+            for a in raw_assets
+        ]
+        card_descriptions = {
+            d["classid"]: _project_card_description(d)
+            for d in raw_descriptions
+            if is_trading_card(d)
+        }
+        del raw_assets, raw_descriptions
+
+        reached_known = stop_at_known and bool(
+            store.known_assetids(steam_id, (a["assetid"] for a in assets))
+        )
 
-        for d in descriptions:
-            all_descriptions[d["classid"]] = d
+        yield assets, card_descriptions
 
-        if not data.get("more_items"):
+        if reached_known:
+            logging.debug("Reached assets known from the previous snapshot, stopping pagination")
             break
 
-        start_assetid = data.get("last_assetid")
-        if not start_assetid:
+        if not more_items or not start_assetid:
             break
 
+
+class InventoryIndex:
+    """
+    Index des cartes de l'inventaire, construit en une passe pendant l'ingestion:
+    - market_fee_app -> nom du jeu et classids des cartes
+    - market_hash_name -> assets [(assetid, amount), ...]
+    Toutes les requêtes sont en O(1).
+    """
+
+    def __init__(self):
+        self._descriptions = {}         # classid -> description projetée
+        self._game_names = {}           # appid -> game name
+        self._classids_by_app = {}      # appid -> {classid}
+        self._assets_by_name = {}       # market_hash_name -> [(assetid, amount)]
+
+    def add_description(self, desc):
+        classid = desc["classid"]
+        if classid in self._descriptions:
+            return
+        self._descriptions[classid] = desc
+        appid = desc.get("market_fee_app")
+        if not appid:
+            return
+        self._classids_by_app.setdefault(appid, set()).add(classid)
+        if self._game_names.get(appid) is None:
+            self._game_names[appid] = desc.get("game_name")
+
+    def add_asset(self, asset):
+        desc = self._descriptions.get(asset["classid"])
+        if desc is None:
+            return
+        self._assets_by_name.setdefault(desc["market_hash_name"], []).append(
+            (asset["assetid"], asset["amount"])
+        )
+
+    def description(self, classid):
+        return self._descriptions.get(classid)
+
+    def knows_app(self, appid):
+        return appid in self._game_names
+
+    def game_name(self, appid):
+        return self._game_names.get(appid)
+
+    def cards_for_app(self, appid):
+        """
+        market_hash_names des cartes connues pour cette app.
+        """
+        return [self._descriptions[c]["market_hash_name"] for c in self._classids_by_app.get(appid, ())]
+
+    def assets_for_card(self, market_hash_name):
+        return self._assets_by_name.get(market_hash_name, [])
+
+    def quantity(self, market_hash_name):
+        return sum(amount for _, amount in self.assets_for_card(market_hash_name))
+
+
+def sync_inventory(session, steam_id):
+    """
+    Synchronise le snapshot d'inventaire et retourne l'InventoryIndex des cartes possédées.
+    Lève requests.exceptions.HTTPError si Steam refuse la requête.
+    """
+    # --- Sync incrémentale à partir du snapshot précédent ---
+    # Resync complète: les assets sont indexés page par page, pendant la pagination.
+    # Delta: seuls les nouveaux assets sont téléchargés, puis on indexe depuis le snapshot.
+    # Un delta ne voit pas les ventes ni les changements de pile: ils ne sont
+    # réconciliés qu'à la resync complète périodique.
+    last_full_sync = store.get_inventory_last_full_sync(steam_id)
+    now = time.time()
+    full_sync = last_full_sync is None or now - last_full_sync >= INVENTORY_FULL_SYNC_SECONDS
+
+    index = InventoryIndex()
+    for desc in store.load_card_descriptions().values():
+        index.add_description(desc)
+
+    pages = 0
+    for assets, page_descriptions in iter_inventory_pages(session, steam_id, stop_at_known=not full_sync):
+        pages += 1
+        for desc in page_descriptions.values():
+            index.add_description(desc)
+        store.save_inventory_page(steam_id, assets, page_descriptions, now)
+        if full_sync:
+            for asset in assets:
+                index.add_asset(asset)
+
+    store.finish_inventory_sync(steam_id, full_sync, now)
+    logging.debug(f"Inventory {'full' if full_sync else 'delta'} sync: {pages} pages")
+
+    if not full_sync:
+        for asset in store.iter_inventory_assets(steam_id):
+            index.add_asset(asset)
+
+    return index
+
+
+def fetch_trading_cards(session, steam_id, badges):
+    """
+    Comme get_trading_cards, mais lève requests.exceptions.HTTPError si
+    l'inventaire est inaccessible au lieu de retourner un dict vide.
+    """
+    logging.debug("start fetching inventory")
+
     from config import BADGE_MAX_LEVEL
-    from badges import get_card_names
+    from catalog import get_card_names
 
     cards_by_app = {}
     for appid, level in badges.items():
@@ -93,37 +258,30 @@ def get_trading_cards(session, steam_id, badges):
         cards_by_app[appid] = {
             "game_name": "",  # will set later
             "cards": {
-                name: {"market_hash_name": name, "quantity": 0, "asset_ids": []}
+                name: {"market_hash_name": name, "quantity": 0, "asset_ids": CardHoldings()}
                 for name in card_names
             }
         }
 
-    # Update from assets
-    for asset in all_assets:
-        desc = all_descriptions.get(asset["classid"])
-        if not desc or not is_trading_card(desc):
-            continue
-        appid = desc.get("market_fee_app")
-        if not appid or appid not in cards_by_app:
-            continue
-        name = desc["market_hash_name"]
-        if name in cards_by_app[appid]["cards"]:
-            amount = int(asset.get("amount", 1))
-            cards_by_app[appid]["cards"][name]["quantity"] += amount
-            cards_by_app[appid]["cards"][name]["asset_ids"].extend([asset["assetid"]] * amount)
-
-    # Set game_name
-    for appid in cards_by_app:
-        for desc in all_descriptions.values():
-            if desc.get("market_fee_app") == appid:
-                game_name = None
-                for tag in desc.get("tags", []):
-                    if tag.get("category") == "Game":
-                        game_name = tag.get("localized_tag_name")
-                        break
-                cards_by_app[appid]["game_name"] = game_name or str(appid)
-                break
+    index = sync_inventory(session, steam_id)
+
+    for appid, app in cards_by_app.items():
+        for name, card in app["cards"].items():
+            for assetid, amount in index.assets_for_card(name):
+                card["quantity"] += amount
+                card["asset_ids"].add(assetid, amount)
+
+        if index.knows_app(appid):
+            app["game_name"] = index.game_name(appid) or str(appid)
 
     print(f"DEBUG inventory result: {len(cards_by_app)} games detected")
 
     return cards_by_app
+
+
+def get_trading_cards(session, steam_id, badges):
+    try:
+        return fetch_trading_cards(session, steam_id, badges)
+    except requests.exceptions.HTTPError:
+        logging.error("Failed to fetch inventory. Proceeding with empty inventory.")
+        return {}
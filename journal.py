@@ -0,0 +1,120 @@
+import json
+import logging
+import time
+
+import requests
+
+import http_client
+import store
+from config import JOURNAL_FETCH_MAX_AGE_SECONDS
+
+# -------------------------------------------------------------------
+# Journal write-ahead d'un run
+# -------------------------------------------------------------------
+#
+# Chaque étape d'un run est enregistrée dans la base SQLite partagée:
+# - fetch: résultat d'une lecture terminée (prix, item_nameid...), rejoué tel
+#   quel à la reprise au lieu de refaire la requête, tant qu'il a moins de
+#   JOURNAL_FETCH_MAX_AGE_SECONDS;
+# - action: requête marché à effet de bord (ordre d'achat...). L'entrée est
+#   écrite *avant* l'envoi ("started"), puis passée à "done". Une action
+#   trouvée en "started" à la reprise a pu atteindre Steam: elle n'est jamais
+#   renvoyée, seulement marquée "unknown" pour vérification. Idem pour une
+#   erreur réseau ou 5xx: la requête a pu être traitée par Steam.
+#
+# Un vieux run reste repris (ses actions ne doivent pas être renvoyées), seuls
+# ses fetch périmés sont refaits.
+#
+# Un run non terminé (crash, Ctrl-C) est repris par le prochain RunJournal du
+# même nom; finish() le clôt et le run suivant repart de zéro.
+
+
+class ActionOutcomeUnknown(RuntimeError):
+    """Action interrompue pendant l'envoi lors d'un run précédent: non renvoyée."""
+
+
+class RunJournal:
+    def __init__(self, name, resume=True):
+        self.name = name
+        run_id = store.get_unfinished_run(name) if resume else None
+        self.resumed = run_id is not None
+        self.run_id = run_id if run_id is not None else store.start_run(name)
+        if self.resumed:
+            logging.info(f"Resuming run '{name}' #{self.run_id}: {self.counts()}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Un run interrompu par une exception reste ouvert pour être repris
+        if exc_type is None:
+            self.finish()
+        return False
+
+    def fetch(self, kind, key, loader, encode=None, decode=None):
+        """
+        Retourne le résultat journalisé de (kind, key), sinon appelle loader() et
+        journalise son résultat. Un résultat None (échec) n'est pas journalisé:
+        il sera retenté à la reprise, comme un résultat trop ancien.
+        """
+        key = str(key)
+        entry = store.get_journal_entry(self.run_id, kind, key)
+        if entry is not None and entry[0] == "done" and time.time() - entry[3] < JOURNAL_FETCH_MAX_AGE_SECONDS:
+            value = json.loads(entry[2])
+            return decode(value) if decode else value
+
+        value = loader()
+        if value is not None:
+            store.put_journal_entry(
+                self.run_id, kind, key, "done", result_json=json.dumps(encode(value) if encode else value)
+            )
+        return value
+
+    def action(self, kind, key, fn, inputs=None):
+        """
+        Exécute une seule fois, sur toute la durée du run, l'action à effet de bord fn().
+        Déjà faite: retourne le résultat journalisé sans rien renvoyer.
+        Interrompue pendant l'envoi: lève ActionOutcomeUnknown.
+        Si fn() échoue sur un refus explicite (4xx, RuntimeError...) ou avant
+        l'envoi (http_client.request_not_sent), l'action est marquée failed et
+        pourra être relancée. Toute autre erreur requests (timeout de lecture,
+        connexion coupée, 5xx) la passe en unknown: la requête a pu aboutir.
+        """
+        key = str(key)
+        inputs_json = json.dumps(inputs)
+        entry = store.get_journal_entry(self.run_id, kind, key)
+        if entry is not None:
+            status, _, result_json, _ = entry
+            if status == "done":
+                logging.debug(f"Journal: {kind} {key} already done, not re-issued")
+                return json.loads(result_json)
+            if status in ("started", "unknown"):
+                store.put_journal_entry(self.run_id, kind, key, "unknown", entry[1])
+                raise ActionOutcomeUnknown(f"{kind} {key}: interrupted while sending, check it before retrying")
+
+        store.put_journal_entry(self.run_id, kind, key, "started", inputs_json)
+        try:
+            result = fn()
+        except requests.exceptions.RequestException as e:
+            refused = e.response is not None and 400 <= e.response.status_code < 500
+            failed = refused or http_client.request_not_sent(e)
+            store.put_journal_entry(self.run_id, kind, key, "failed" if failed else "unknown", inputs_json)
+            raise
+        except Exception:
+            store.put_journal_entry(self.run_id, kind, key, "failed", inputs_json)
+            raise
+        store.put_journal_entry(self.run_id, kind, key, "done", inputs_json, json.dumps(result))
+        return result
+
+    def status(self, kind, key):
+        """
+        Statut journalisé de (kind, key) dans ce run, ou None.
+        """
+        entry = store.get_journal_entry(self.run_id, kind, str(key))
+        return entry[0] if entry is not None else None
+
+    def counts(self):
+        return store.journal_counts(self.run_id)
+
+    def finish(self):
+        store.finish_run(self.run_id)
@@ -1,4 +1,96 @@
+import math
+from itertools import repeat
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est optionnel: plan_account retombe sur du Python pur
+    np = None
+
+
+class CardHoldings:
+    """
+    Exemplaires possédés d'une carte, stockés en piles (assetid, amount) au lieu
+    d'un assetid par exemplaire. len() est en O(1), et holdings[:n] retourne une
+    vue sur les n premiers exemplaires sans copier les piles.
+    """
+
+    __slots__ = ("_assetids", "_amounts", "_limit", "_total")
+
+    def __init__(self, runs=()):
+        self._assetids = []
+        self._amounts = []
+        self._limit = None
+        self._total = 0
+        for assetid, amount in runs:
+            self.add(assetid, amount)
+
+    @classmethod
+    def _view(cls, assetids, amounts, limit):
+        view = cls.__new__(cls)
+        view._assetids = assetids
+        view._amounts = amounts
+        view._limit = limit
+        view._total = limit
+        return view
+
+    def add(self, assetid, amount=1):
+        if self._limit is not None:
+            raise TypeError("CardHoldings view is read-only")
+        if amount <= 0:
+            return
+        if self._assetids and self._assetids[-1] == assetid:
+            self._amounts[-1] += amount
+        else:
+            self._assetids.append(assetid)
+            self._amounts.append(amount)
+        self._total += amount
+
+    def __len__(self):
+        return self._total
+
+    @property
+    def quantity(self):
+        return self._total
+
+    def runs(self):
+        """
+        Itère sur les piles (assetid, amount), tronquées à la taille de la vue.
+        """
+        remaining = self._total
+        for assetid, amount in zip(self._assetids, self._amounts):
+            if remaining <= 0:
+                return
+            take = min(amount, remaining)
+            yield assetid, take
+            remaining -= take
+
+    def __iter__(self):
+        for assetid, amount in self.runs():
+            yield from repeat(assetid, amount)
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice) or key.start not in (None, 0) or key.step not in (None, 1):
+            raise TypeError("CardHoldings only supports [:n] slicing")
+        n = self._total if key.stop is None else max(min(key.stop, self._total), 0)
+        return CardHoldings._view(self._assetids, self._amounts, n)
+
+    def copy(self):
+        return CardHoldings(self.runs())
+
+    def __eq__(self, other):
+        if isinstance(other, (CardHoldings, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"CardHoldings({list(self.runs())!r})"
+
+
 def compute_surplus_cards(badge_level, badge_max_level, cards_by_type):
+    """
+    data["asset_ids"] peut être une liste d'assetids ou un CardHoldings:
+    le surplus est alors une vue CardHoldings, sans copie des piles.
+    """
     surplus = {}
 
     if badge_level >= badge_max_level:
@@ -31,3 +123,111 @@ def compute_missing_cards(badge_level, badge_max_level, cards_by_type):
             }
 
     return missing
+
+
+
+# -------------------------------------------------------------------
+# Planification sur tout le compte (format colonnes)
+# -------------------------------------------------------------------
+
+def build_account_columns(badges, cards_by_app, prices):
+    """
+    Convertit badges (appid -> level), cards_by_app (voir inventory.get_trading_cards)
+    et prices (market_hash_name -> prix EUR) en colonnes:
+    - app_ids[i], badge_levels[i]: une ligne par app
+    - card_app_index[j], card_quantities[j], card_prices[j]: une ligne par carte
+    - card_names[j]
+    Une carte sans prix connu vaut NaN dans card_prices (voir plan_account).
+    """
+    app_ids, badge_levels = [], []
+    card_app_index, card_quantities, card_prices, card_names = [], [], [], []
+
+    for appid, app in cards_by_app.items():
+        i = len(app_ids)
+        app_ids.append(appid)
+        badge_levels.append(badges.get(appid, 0))
+        for name, data in app["cards"].items():
+            card_app_index.append(i)
+            card_quantities.append(data["quantity"])
+            price = prices.get(name)
+            card_prices.append(float("nan") if price is None else price)
+            card_names.append(name)
+
+    return {
+        "app_ids": app_ids,
+        "badge_levels": badge_levels,
+        "card_app_index": card_app_index,
+        "card_quantities": card_quantities,
+        "card_prices": card_prices,
+        "card_names": card_names,
+    }
+
+
+def _plan_account_python(app_ids, badge_levels, card_app_index, card_quantities, card_prices, badge_max_level):
+    surplus = [0] * len(app_ids)
+    missing = [0] * len(app_ids)
+    cost = [0.0] * len(app_ids)
+    unpriced = [0] * len(app_ids)
+    for i, quantity, price in zip(card_app_index, card_quantities, card_prices):
+        level = badge_levels[i]
+        if level >= badge_max_level:
+            surplus[i] += quantity
+            continue
+        surplus[i] += max(quantity - (badge_max_level - level), 0)
+        needed = max(badge_max_level - quantity, 0)
+        missing[i] += needed
+        if needed and math.isnan(price):
+            unpriced[i] += 1
+        elif needed:
+            cost[i] += needed * price
+    return surplus, missing, cost, unpriced
+
+
+def plan_account(app_ids, badge_levels, card_app_index, card_quantities, card_prices, badge_max_level):
+    """
+    Calcule en une passe, pour chaque badge: exemplaires en surplus, exemplaires
+    manquants et coût pour atteindre badge_max_level. Mêmes règles que
+    compute_surplus_cards / compute_missing_cards.
+    Retourne une liste de dicts {"appid", "level", "surplus_units", "missing_units", "cost",
+    "unpriced_cards"} triée par coût croissant (badges les moins chers à terminer d'abord).
+    Un prix NaN (inconnu) n'entre pas dans cost mais compte dans unpriced_cards s'il
+    manque des exemplaires de la carte: ces badges au coût incomplet sont classés en dernier.
+    """
+    if np is None:
+        surplus, missing, cost, unpriced = _plan_account_python(
+            app_ids, badge_levels, card_app_index, card_quantities, card_prices, badge_max_level
+        )
+    else:
+        levels = np.asarray(badge_levels, dtype=np.int64)
+        app_index = np.asarray(card_app_index, dtype=np.int64)
+        quantities = np.asarray(card_quantities, dtype=np.int64)
+        prices = np.asarray(card_prices, dtype=np.float64)
+
+        card_levels = levels[app_index]
+        finished = card_levels >= badge_max_level
+        remaining = badge_max_level - card_levels
+
+        card_surplus = np.where(finished, quantities, np.maximum(quantities - remaining, 0))
+        card_missing = np.where(finished, 0, np.maximum(badge_max_level - quantities, 0))
+        card_unpriced = (card_missing > 0) & np.isnan(prices)
+        known_prices = np.where(np.isnan(prices), 0.0, prices)
+
+        n_apps = len(app_ids)
+        surplus = np.bincount(app_index, weights=card_surplus, minlength=n_apps).astype(np.int64).tolist()
+        missing = np.bincount(app_index, weights=card_missing, minlength=n_apps).astype(np.int64).tolist()
+        cost = np.bincount(app_index, weights=card_missing * known_prices, minlength=n_apps).tolist()
+        unpriced = np.bincount(app_index, weights=card_unpriced, minlength=n_apps).astype(np.int64).tolist()
+
+    plan = [
+        {
+            "appid": appid,
+            "level": badge_levels[i],
+            "surplus_units": int(surplus[i]),
+            "missing_units": int(missing[i]),
+            "cost": round(float(cost[i]), 2),
+            "unpriced_cards": int(unpriced[i]),
+        }
+        for i, appid in enumerate(app_ids)
+    ]
+    plan.sort(key=lambda entry: (entry["unpriced_cards"] > 0, entry["cost"], entry["appid"]))
+    return plan
@@ -1,39 +1,60 @@
 import re
-import requests
+import threading
 import time
 import logging
+import json
+from collections import namedtuple
 from urllib.parse import quote
 
-from config import MIN_PRICE_EUR
+import http_client
+import ratelimit
+import store
+from config import (
+    HISTOGRAM_STALE_SECONDS,
+    HISTOGRAM_TTL_SECONDS,
+    HTTP_ACTION_TIMEOUT_SECONDS,
+    MIN_PRICE_EUR,
+    PRICEOVERVIEW_STALE_SECONDS,
+    PRICEOVERVIEW_TTL_SECONDS,
+    PRICING_WORKERS,
+)
+from parsers import parse_my_buy_orders, parse_my_listings
+from scheduler import PriorityScheduler
+from ttl_cache import UNKNOWN, TTLCache
 
 # -------------------------------------------------------------------
-# Throttling global du market Steam
+# File de priorité des lookups market
 # -------------------------------------------------------------------
+#
+# Partagée par pricing.price_cards et par les rafraîchissements des carnets
+# d'ordres périmés: un rafraîchissement stale-while-revalidate passe après
+# toutes les premières cotations, y compris celles soumises plus tard.
+# Priorités: (niveau, -valeur attendue), voir pricing.lookup_scores.
 
-_MARKET_LAST_CALL = 0.0
-MARKET_DELAY_SECONDS = 2.5  # augmente à 3.0 si tu vois encore des 429
-
-
-def _throttle_market(backoff=False):
-    global _MARKET_LAST_CALL
-
-    delay = MARKET_DELAY_SECONDS * (2 if backoff else 1)
-    now = time.time()
-    elapsed = now - _MARKET_LAST_CALL
-
-    if elapsed < delay:
-        time.sleep(delay - elapsed)
-
-    _MARKET_LAST_CALL = time.time()
-
+LOOKUP_FRESH, LOOKUP_FIRST, LOOKUP_STALE = 0, 1, 2
+# Après les cotations périmées elles-mêmes (servies sans requête) de tous les appelants
+STALE_REFRESH_PRIORITY = (LOOKUP_STALE, float("inf"))
+LOOKUPS = PriorityScheduler(PRICING_WORKERS, name="market-lookups")
 
 # -------------------------------------------------------------------
 # Caches
 # -------------------------------------------------------------------
 
-_PRICEOVERVIEW_CACHE = {}      # market_hash_name -> lowest_price (buyer) en EUR
-_ITEM_NAMEID_CACHE = {}        # market_hash_name -> item_nameid
-_HISTOGRAM_CACHE = {}          # market_hash_name -> (lowest_seller_price_eur, qty_at_lowest)
+# market_hash_name -> lowest_price (buyer) en EUR
+_PRICEOVERVIEW_CACHE = TTLCache(
+    "priceoverview", PRICEOVERVIEW_TTL_SECONDS, stale_ttl=PRICEOVERVIEW_STALE_SECONDS
+)
+_ITEM_NAMEID_CACHE = {}        # market_hash_name -> item_nameid (miroir de l'index SQLite)
+# str(item_nameid) -> OrderBookSnapshot
+_HISTOGRAM_CACHE = TTLCache(
+    "histogram",
+    HISTOGRAM_TTL_SECONDS,
+    stale_ttl=HISTOGRAM_STALE_SECONDS,
+    encode=lambda book: book.to_dict(),
+    decode=lambda data: OrderBookSnapshot.from_dict(data),
+    refresh_scheduler=LOOKUPS,
+    refresh_priority=STALE_REFRESH_PRIORITY,
+)
 
 
 # -------------------------------------------------------------------
@@ -55,20 +76,24 @@ def _parse_eur_price(price_str: str) -> float:
 def get_lowest_price_buyer(session, market_hash_name):
     """
     Prix le plus bas côté acheteur (priceoverview). Peut diverger du prix vendeur à cause des frais/arrondis.
-    Cache + throttling.
+    Cache TTL + throttling. Retourne None si le prix est inconnu (429).
     """
-    if market_hash_name in _PRICEOVERVIEW_CACHE:
-        return _PRICEOVERVIEW_CACHE[market_hash_name]
+    price = _PRICEOVERVIEW_CACHE.get_or_load(
+        market_hash_name, lambda: _fetch_lowest_price_buyer(session, market_hash_name)
+    )
+    return None if price is UNKNOWN else price
+
 
-    _throttle_market()
+def _fetch_lowest_price_buyer(session, market_hash_name):
+    ratelimit.acquire("priceoverview")
 
     url = "https://steamcommunity.com/market/priceoverview/"
     params = {"currency": 3, "appid": 753, "market_hash_name": market_hash_name}
     r = session.get(url, params=params)
 
     if r.status_code == 429:
-        _throttle_market(backoff=True)
-        return MIN_PRICE_EUR
+        ratelimit.backoff("priceoverview", r, wait=False)
+        return UNKNOWN
 
     r.raise_for_status()
     data = r.json()
@@ -79,10 +104,80 @@ def get_lowest_price_buyer(session, market_hash_name):
     else:
         price = max(_parse_eur_price(raw), MIN_PRICE_EUR)
 
-    _PRICEOVERVIEW_CACHE[market_hash_name] = price
     return price
 
 
+# -------------------------------------------------------------------
+# Recherche market (search/render, norender=1): jusqu'à 100 cartes par requête
+# -------------------------------------------------------------------
+
+SEARCH_PAGE_SIZE = 100
+
+_SEARCH_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Referer": "https://steamcommunity.com/market/search?appid=753",
+    "Origin": "https://steamcommunity.com",
+    "X-Requested-With": "XMLHttpRequest",
+}
+
+
+def search_trading_cards(session, start=0, count=SEARCH_PAGE_SIZE, filters=None, max_429_retries=6):
+    """
+    Une page de market/search/render filtrée sur les cartes à collectionner.
+    `session` peut être une requests.Session ou le module http_client (sans compte).
+    Retourne le JSON ({"results", "total_count", ...}) ou None si le 429 persiste.
+    """
+    url = "https://steamcommunity.com/market/search/render/"
+    params = {
+        "query": "",
+        "start": start,
+        "count": count,
+        "search_descriptions": 0,
+        "sort_column": "name",
+        "sort_dir": "asc",
+        "appid": 753,
+        "category_753_ContextId[]": 6,
+        "category_753_ItemClass[]": "tag_item_class_2",  # Trading Card
+        "norender": 1,
+    }
+    params.update(filters or {})
+
+    for attempt in range(max_429_retries + 1):
+        ratelimit.acquire("search")
+        r = session.get(url, params=params, headers=_SEARCH_HEADERS)
+        if r.status_code != 429:
+            r.raise_for_status()
+            return r.json()
+        if attempt < max_429_retries:
+            delay = ratelimit.backoff("search", r, default=5, wait=False)
+            logging.warning(f"Rate limited on market search (start={start}), retrying in {delay} seconds...")
+
+    return None
+
+
+def parse_search_result(item):
+    """
+    Extrait (appid, market_hash_name, sell_price_eur, sell_listings) d'un résultat de recherche.
+    Les market_hash_name des objets Steam (753) sont préfixés par l'appid: "440-Scout".
+    sell_price est en centimes, dans la devise du portefeuille de la session.
+    """
+    name = item.get("hash_name") or item.get("market_hash_name")
+    if not name:
+        return None
+
+    appid = (item.get("asset_description") or {}).get("market_fee_app")
+    if appid is None:
+        prefix = name.split("-", 1)[0]
+        appid = int(prefix) if prefix.isdigit() else None
+
+    sell_price = item.get("sell_price")
+    sell_price_eur = sell_price / 100 if isinstance(sell_price, (int, float)) and sell_price > 0 else None
+
+    return int(appid) if appid is not None else None, name, sell_price_eur, int(item.get("sell_listings") or 0)
+
+
 # -------------------------------------------------------------------
 # Récupération item_nameid (indispensable pour itemordershistogram)
 # -------------------------------------------------------------------
@@ -90,19 +185,25 @@ def get_lowest_price_buyer(session, market_hash_name):
 def get_item_nameid(session, market_hash_name):
     """
     Récupère l'item_nameid en scrappant la page listing (HTML).
-    Cache + throttling.
+    Cache mémoire + index persistant (store) + throttling.
+    L'item_nameid ne change jamais pour un market_hash_name donné.
     """
     if market_hash_name in _ITEM_NAMEID_CACHE:
         return _ITEM_NAMEID_CACHE[market_hash_name]
 
-    _throttle_market()
+    item_nameid = store.get_item_nameid(market_hash_name)
+    if item_nameid is not None:
+        _ITEM_NAMEID_CACHE[market_hash_name] = item_nameid
+        return item_nameid
+
+    ratelimit.acquire("listing")
 
     encoded = quote(market_hash_name, safe="")
     url = f"https://steamcommunity.com/market/listings/753/{encoded}"
 
     r = session.get(url)
     if r.status_code == 429:
-        _throttle_market(backoff=True)
+        ratelimit.backoff("listing", r)
         r = session.get(url)
 
     r.raise_for_status()
@@ -119,86 +220,116 @@ def get_item_nameid(session, market_hash_name):
 
     item_nameid = int(m.group(1))
     _ITEM_NAMEID_CACHE[market_hash_name] = item_nameid
+    store.put_item_nameids({market_hash_name: item_nameid})
     return item_nameid
 
 
-# -------------------------------------------------------------------
-# Lecture du carnet d'ordres vendeur (ce qui correspond à ton tableau Prix/Quantité)
-# -------------------------------------------------------------------
-
-def get_lowest_seller_and_qty(session, market_hash_name, country="FR", language="french"):
+def export_item_nameids(path):
     """
-    Retourne (lowest_seller_price_eur, qty_at_lowest) à partir de itemordershistogram.
-    Cache + throttling.
+    Exporte l'index item_nameid persistant vers un fichier JSON
+    (market_hash_name -> item_nameid). Retourne le nombre d'entrées.
     """
-    if market_hash_name in _HISTOGRAM_CACHE:
-        return _HISTOGRAM_CACHE[market_hash_name]
-
-    item_nameid = get_item_nameid(session, market_hash_name)
+    mapping = store.all_item_nameids()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(mapping, f, ensure_ascii=False, indent=2, sort_keys=True)
+    return len(mapping)
 
-    _throttle_market()
 
-    url = "https://steamcommunity.com/market/itemordershistogram"
-    params = {
-        "country": country,
-        "language": language,
-        "currency": 3,          # EUR
-        "item_nameid": item_nameid,
-        "two_step": 1
-    }
-
-    r = session.get(url, params=params)
-
-    if r.status_code == 429:
-        _throttle_market(backoff=True)
-        r = session.get(url, params=params)
-
-    if r.status_code == 429:
-        # On abandonne proprement: on ne veut pas crasher le run
-        result = (MIN_PRICE_EUR, 999999)
-        _HISTOGRAM_CACHE[market_hash_name] = result
-        return result
-
-    r.raise_for_status()
-    data = r.json()
+def import_item_nameids(path):
+    """
+    Importe un fichier JSON produit par export_item_nameids dans l'index persistant.
+    Retourne le nombre d'entrées importées.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        mapping = json.load(f)
+    store.put_item_nameids(mapping)
+    _ITEM_NAMEID_CACHE.update({name: int(nameid) for name, nameid in mapping.items()})
+    return len(mapping)
 
-    # sell_order_graph: liste de points [price, quantity, ...]
-    graph = data.get("sell_order_graph") or []
-    # print(
-    #     f"[DEBUG] HISTOGRAM {market_hash_name} "
-    #     f"(country={country}, currency=EUR)"
-    # )
 
-    # for price, qty, *_ in graph[:5]:
-    #     print(f"[DEBUG]   SELL {price:.2f} € -> qty {int(qty)}")
-    if not graph:
-        # Aucun ordre vendeur visible (rare), on retombe sur min
-        result = (MIN_PRICE_EUR, 0)
-        _HISTOGRAM_CACHE[market_hash_name] = result
-        return result
+# -------------------------------------------------------------------
+# Carnet d'ordres (itemordershistogram): un seul appel pour les deux côtés
+# -------------------------------------------------------------------
 
-    lowest_price = float(graph[0][0])
-    qty_at_lowest = int(graph[0][1])
+class OrderBookSnapshot:
+    """
+    Carnet d'ordres complet d'un item à un instant donné.
+    sell_order_graph / buy_order_graph: points [price, cumulative_quantity, label]
+    tels que renvoyés par itemordershistogram.
+    """
 
-    lowest_price = max(lowest_price, MIN_PRICE_EUR)
+    __slots__ = ("item_nameid", "sell_order_graph", "buy_order_graph", "fetched_at")
+
+    def __init__(self, item_nameid, sell_order_graph, buy_order_graph, fetched_at):
+        self.item_nameid = item_nameid
+        self.sell_order_graph = sell_order_graph
+        self.buy_order_graph = buy_order_graph
+        self.fetched_at = fetched_at
+
+    def lowest_seller_and_qty(self):
+        """
+        (lowest_seller_price_eur, qty_at_lowest), plancher MIN_PRICE_EUR.
+        Aucun ordre vendeur visible (rare): (MIN_PRICE_EUR, 0).
+        """
+        if not self.sell_order_graph:
+            return (MIN_PRICE_EUR, 0)
+        price, qty = self.sell_order_graph[0][:2]
+        return (max(float(price), MIN_PRICE_EUR), int(qty))
+
+    def highest_buy_price(self):
+        if not self.buy_order_graph:
+            return MIN_PRICE_EUR
+        return max(float(self.buy_order_graph[0][0]), MIN_PRICE_EUR)
+
+    def to_dict(self):
+        return {
+            "item_nameid": self.item_nameid,
+            "sell_order_graph": self.sell_order_graph,
+            "buy_order_graph": self.buy_order_graph,
+            "fetched_at": self.fetched_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data["item_nameid"],
+            data["sell_order_graph"],
+            data["buy_order_graph"],
+            data["fetched_at"],
+        )
+
+
+def get_order_book(session, market_hash_name, country="FR", language="french"):
+    """
+    Retourne l'OrderBookSnapshot de l'item, ou None s'il est inconnu (429 même après backoff).
+    Cache TTL par item_nameid (stale-while-revalidate) + throttling.
+    """
+    item_nameid = get_item_nameid(session, market_hash_name)
 
-    result = (lowest_price, qty_at_lowest)
-    _HISTOGRAM_CACHE[market_hash_name] = result
-    return result
+    book = _HISTOGRAM_CACHE.get_or_load(
+        str(item_nameid), lambda: _fetch_order_book(session, item_nameid, country, language)
+    )
+    return None if book is UNKNOWN else book
 
 
-def get_highest_buy_price(session, market_hash_name):
+def peek_order_book(market_hash_name):
     """
-    Retourne le prix d'achat le plus élevé depuis buy_order_graph.
+    Carnet d'ordres en cache, sans aucune requête: (OrderBookSnapshot, frais?)
+    ou None si l'item n'a jamais été coté (ou son item_nameid jamais résolu).
     """
-    item_nameid = get_item_nameid(session, market_hash_name)
+    item_nameid = _ITEM_NAMEID_CACHE.get(market_hash_name) or store.get_item_nameid(market_hash_name)
+    if item_nameid is None:
+        return None
+    return _HISTOGRAM_CACHE.peek(str(item_nameid))
+
 
-    _throttle_market()
+def _fetch_order_book(session, item_nameid, country, language):
+    ratelimit.acquire("histogram")
 
     url = "https://steamcommunity.com/market/itemordershistogram"
     params = {
-        "country": "FR",
-        "language": "french",
+        "country": country,
+        "language": language,
         "currency": 3,          # EUR
         "item_nameid": item_nameid,
         "two_step": 1
@@ -207,24 +338,43 @@ def get_highest_buy_price(session, market_hash_name):
     r = session.get(url, params=params)
 
     if r.status_code == 429:
-        _throttle_market(backoff=True)
+        ratelimit.backoff("histogram", r)
         r = session.get(url, params=params)
 
     if r.status_code == 429:
-        return MIN_PRICE_EUR
+        # On abandonne proprement: on ne veut pas crasher le run, ni mettre un faux prix en cache
+        return UNKNOWN
 
     r.raise_for_status()
     data = r.json()
 
-    buy_graph = data.get("buy_order_graph") or []
+    return OrderBookSnapshot(
+        item_nameid,
+        data.get("sell_order_graph") or [],
+        data.get("buy_order_graph") or [],
+        time.time(),
+    )
+
 
-    if not buy_graph:
-        return MIN_PRICE_EUR
+def get_lowest_seller_and_qty(session, market_hash_name, country="FR", language="french"):
+    """
+    Retourne (lowest_seller_price_eur, qty_at_lowest) à partir du carnet d'ordres,
+    ou None si le carnet est inconnu (429).
+    """
+    book = get_order_book(session, market_hash_name, country=country, language=language)
+    if book is None:
+        return None
+    return book.lowest_seller_and_qty()
 
-    highest_price = float(buy_graph[0][0])
-    highest_price = max(highest_price, MIN_PRICE_EUR)
 
-    return highest_price
+def get_highest_buy_price(session, market_hash_name):
+    """
+    Retourne le prix d'achat le plus élevé depuis buy_order_graph, ou None si inconnu (429).
+    """
+    book = get_order_book(session, market_hash_name)
+    if book is None:
+        return None
+    return book.highest_buy_price()
 
 
 # -------------------------------------------------------------------
@@ -242,12 +392,17 @@ def compute_sale_price_from_histogram(lowest_seller_price, qty_at_lowest):
 
     return max(lowest_seller_price - 0.01, MIN_PRICE_EUR)
 
-def sell_item(session, assetid, price_eur):
+
+def compute_sale_price_from_order_book(book):
+    return compute_sale_price_from_histogram(*book.lowest_seller_and_qty())
+
+def sell_item(session, assetid, price_eur, amount=1):
     """
-    Met en vente un item Steam (1 exemplaire).
+    Met en vente `amount` exemplaires d'une pile (même assetid), au même prix unitaire.
     price_eur = prix acheteur final (ex: 0.04)
+    Lève ratelimit.RateLimited (sous-classe de RuntimeError) sur un 429.
     """
-    _throttle_market()
+    ratelimit.acquire("sellitem")
 
     # Steam attend un prix en centimes (acheteur)
     price_cents = int(round(price_eur * 100))
@@ -259,7 +414,7 @@ def sell_item(session, assetid, price_eur):
         "appid": 753,
         "contextid": 6,
         "assetid": assetid,
-        "amount": 1,
+        "amount": amount,
         "price": price_cents,
     }
 
@@ -268,11 +423,11 @@ def sell_item(session, assetid, price_eur):
         "Origin": "https://steamcommunity.com",
     }
 
-    r = session.post(url, data=payload, headers=headers)
+    r = session.post(url, data=payload, headers=headers, timeout=HTTP_ACTION_TIMEOUT_SECONDS)
 
     if r.status_code == 429:
-        _throttle_market(backoff=True)
-        raise RuntimeError("Rate limit lors de la vente")
+        delay = ratelimit.backoff("sellitem", r, wait=False)
+        raise ratelimit.RateLimited("Rate limit lors de la vente", delay)
 
     r.raise_for_status()
     data = r.json()
@@ -283,74 +438,106 @@ def sell_item(session, assetid, price_eur):
     return True
 
 
-def get_buy_orders(session):
+# -------------------------------------------------------------------
+# Mes ordres d'achat et annonces (My Listings)
+# -------------------------------------------------------------------
+
+BuyOrder = namedtuple("BuyOrder", "order_id market_hash_name price_eur quantity")
+Listing = namedtuple("Listing", "listing_id market_hash_name price_eur assetid")
+
+MY_LISTINGS_PAGE_SIZE = 100
+
+# Dernier état connu des annonces, pour le refresh incrémental de get_my_listings
+_MY_LISTINGS = {}               # listing_id -> Listing
+_MY_LISTINGS_TOTAL = None
+_MY_LISTINGS_LOCK = threading.Lock()
+
+
+def fetch_buy_orders(session):
     """
-    Récupère les ordres d'achat actifs depuis la page My Listings.
-    Retourne un dict market_hash_name -> (price_eur, quantity)
+    Ordres d'achat actifs (liste de BuyOrder). Steam les affiche tous sur la page
+    My Listings: seules les annonces sont paginées (voir get_my_listings).
+    Lève http_client.RetryError si la page reste inaccessible.
     """
-    for attempt in range(3):
-        try:
-            _throttle_market()
+    def fetch():
+        ratelimit.acquire("mylistings")
+        r = session.get("https://steamcommunity.com/market/mylistings/")
+        r.raise_for_status()
+        return r.text
 
-            url = "https://steamcommunity.com/market/mylistings/"
-            r = session.get(url)
+    html = http_client.with_retries(fetch, "market listings", bucket="mylistings")
+    return [BuyOrder(*row) for row in parse_my_buy_orders(html)]
 
-            if r.status_code == 429:
-                _throttle_market(backoff=True)
-                r = session.get(url)
 
-            r.raise_for_status()
-            html = r.text
-
-            buy_orders = {}
-
-            # Chercher les lignes d'ordres d'achat
-            # Les ordres d'achat sont dans des div avec classe "market_listing_row"
-            # et contiennent "Buy Order" dans le texte
-
-            # Utiliser regex pour trouver les ordres d'achat
-            # Pattern approximatif pour extraire les infos
-            # C'est fragile, mais pour commencer
-
-            # Trouver tous les blocs d'ordres d'achat
-            buy_order_pattern = r'<div class="market_listing_row market_recent_listing_row"[^>]*>.*?Ordre d\'achat.*?</div>'
-            matches = re.findall(buy_order_pattern, html, re.DOTALL)
-
-            for match in matches:
-                # Extraire le nom de l'item
-                name_match = re.search(r'<span class="market_listing_item_name"[^>]*>([^<]+)</span>', match)
-                if not name_match:
-                    continue
-                market_hash_name = name_match.group(1).strip()
-
-                # Extraire le prix
-                price_match = re.search(r'<span class="market_listing_price[^"]*">([^<]+)</span>', match)
-                if not price_match:
-                    continue
-                price_str = price_match.group(1).strip()
-                price_eur = _parse_eur_price(price_str)
-
-                # Extraire la quantité
-                qty_match = re.search(r'<span class="market_listing_buyorder_qty">(\d+)</span>', match)
-                if not qty_match:
-                    continue
-                quantity = int(qty_match.group(1))
-
-                buy_orders[market_hash_name] = (price_eur, quantity)
-
-            return buy_orders
-        except requests.exceptions.HTTPError as e:
-            if 500 <= e.response.status_code < 600:
-                logging.warning(f"{e.response.status_code} Server Error for market listings, retrying in {2**attempt} seconds... (attempt {attempt+1}/3)")
-                time.sleep(2**attempt)
-            else:
-                raise
-        except requests.exceptions.RequestException as e:
-            logging.warning(f"Request error fetching market listings: {e}, retrying in {2**attempt} seconds... (attempt {attempt+1}/3)")
-            time.sleep(2**attempt)
-    
-    logging.error("Failed to fetch market listings after 3 attempts, returning empty dict.")
-    return {}
+def get_buy_orders(session):
+    """
+    Récupère les ordres d'achat actifs depuis la page My Listings.
+    Retourne un dict market_hash_name -> (price_eur, quantity)
+    """
+    try:
+        orders = fetch_buy_orders(session)
+    except http_client.RetryError:
+        logging.error("Failed to fetch market listings after 3 attempts, returning empty dict.")
+        return {}
+    return {order.market_hash_name: (order.price_eur, order.quantity) for order in orders}
+
+
+def _fetch_my_listings_page(session, start):
+    def fetch():
+        ratelimit.acquire("mylistings")
+        r = session.get(
+            "https://steamcommunity.com/market/mylistings/render/",
+            params={"query": "", "start": start, "count": MY_LISTINGS_PAGE_SIZE},
+        )
+        r.raise_for_status()
+        return r.json()
+
+    data = http_client.with_retries(fetch, f"market listings (start={start})", bucket="mylistings")
+    listings = [Listing(*row) for row in parse_my_listings(data.get("results_html") or "", data.get("hovers"))]
+    return listings, int(data.get("total_count") or 0)
+
+
+def get_my_listings(session, full=False):
+    """
+    Annonces actives: dict listing_id -> Listing, via l'endpoint JSON paginé mylistings/render.
+    Les pages vont des annonces les plus récentes aux plus anciennes: si le total
+    n'a bougé que des nouvelles annonces vues (aucune vente ni retrait depuis
+    l'appel précédent), la pagination s'arrête à la première page sans nouveauté
+    et le reste est repris de l'état précédent. full=True force une relecture complète.
+    Lève http_client.RetryError si une page reste inaccessible.
+    """
+    global _MY_LISTINGS, _MY_LISTINGS_TOTAL
+
+    with _MY_LISTINGS_LOCK:
+        known = {} if full else dict(_MY_LISTINGS)
+        known_total = None if full else _MY_LISTINGS_TOTAL
+
+        listings = {}
+        new_count = 0
+        start = 0
+        pages = 0
+        while True:
+            page, total = _fetch_my_listings_page(session, start)
+            pages += 1
+            page_new = 0
+            for listing in page:
+                if listing.listing_id not in listings and listing.listing_id not in known:
+                    page_new += 1
+                listings[listing.listing_id] = listing
+            new_count += page_new
+
+            start += MY_LISTINGS_PAGE_SIZE
+            if not page or start >= total:
+                break
+            if known_total is not None and page_new == 0 and total == known_total + new_count:
+                for listing_id, listing in known.items():
+                    listings.setdefault(listing_id, listing)
+                break
+
+        _MY_LISTINGS = listings
+        _MY_LISTINGS_TOTAL = total
+        logging.debug(f"Fetched {len(listings)} market listings ({pages} pages, {new_count} new)")
+        return dict(listings)
 
 
 def create_buy_order(session, market_hash_name, price_eur, quantity=1):
@@ -358,9 +545,10 @@ def create_buy_order(session, market_hash_name, price_eur, quantity=1):
     Crée un ordre d'achat pour un item.
     price_eur = prix par unité (acheteur)
     """
-    _throttle_market()
+    # Lu depuis l'index persistant: garantit que l'item existe avant de poster l'ordre
+    get_item_nameid(session, market_hash_name)
 
-    item_nameid = get_item_nameid(session, market_hash_name)
+    ratelimit.acquire("buyorder")
 
     # Prix en centimes
     price_cents = int(round(price_eur * 100))
@@ -383,11 +571,11 @@ def create_buy_order(session, market_hash_name, price_eur, quantity=1):
         "Origin": "https://steamcommunity.com",
     }
 
-    r = session.post(url, data=payload, headers=headers)
+    r = session.post(url, data=payload, headers=headers, timeout=HTTP_ACTION_TIMEOUT_SECONDS)
 
     if r.status_code == 429:
-        _throttle_market(backoff=True)
-        raise RuntimeError("Rate limit lors de la création d'ordre d'achat")
+        delay = ratelimit.backoff("buyorder", r, wait=False)
+        raise ratelimit.RateLimited("Rate limit lors de la création d'ordre d'achat", delay)
 
     r.raise_for_status()
     data = r.json()
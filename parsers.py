@@ -0,0 +1,289 @@
+import re
+from html import unescape
+from urllib.parse import unquote
+
+# -------------------------------------------------------------------
+# Parsers des pages communautaires (badges, gamecards)
+# -------------------------------------------------------------------
+#
+# Toutes les regex sont compilées une fois au chargement du module. Les
+# titres de badge sont extraits en un seul parcours des attributs class=
+# de chaque ligne, au lieu d'une recherche complète par classe candidate;
+# le résultat est identique à l'ancien enchaînement de re.search.
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_CLASS_ATTR_RES = {}            # tuple de classes -> regex des attributs class= qui en contiennent une
+_ELEMENT_TEXT_RE = re.compile(r"[^>]*>(.*?)</[^>]+>", re.S)
+_CLASS_TOKEN_RE = re.compile(r"[\w]+")
+
+_BADGE_ROW_RE = re.compile(r'<div[^>]+class=["\'][^"\']*\bbadge_row\b[^"\']*["\'][^>]*>')
+_BADGE_ROW_ID_RES = (
+    re.compile(r"/badges/(\d+)"),
+    re.compile(r"badgeid=(\d+)"),
+    re.compile(r'data-badgeid=["\'](\d+)["\']'),
+)
+_BADGE_ROW_TITLE_CLASSES = (
+    "badge_row_title",
+    "badge_title",
+    "badge_title_row",
+    "badge_info_title",
+    "profile_badge_title",
+)
+_BADGE_PAGE_TITLE_CLASSES = (
+    "badge_info_title",
+    "profile_badge_title",
+    "badge_title",
+    "badge_detail_title",
+    "badge_title_row",
+)
+
+_XML_BADGE_RE = re.compile(r"<badge>.*?</badge>", re.S)
+_XML_BADGE_ID_RES = (
+    re.compile(r"<badgeid>(\d+)</badgeid>"),
+    re.compile(r"<id>(\d+)</id>"),
+)
+_XML_BADGE_NAME_RES = (
+    re.compile(r"<name>(.*?)</name>", re.S),
+    re.compile(r"<badge_name>(.*?)</badge_name>", re.S),
+    re.compile(r"<title>(.*?)</title>", re.S),
+)
+_XML_TITLE_RES = (
+    re.compile(r"<badge_name>(.*?)</badge_name>", re.S),
+    re.compile(r"<name>(.*?)</name>", re.S),
+    re.compile(r"<title>(.*?)</title>", re.S),
+)
+_SCRIPT_BADGE_RE = re.compile(r'"badgeid"\s*:\s*(\d+).*?"name"\s*:\s*"([^"]+)"', re.S)
+
+_PAGELINK_RE = re.compile(r"<a\b[^>]*\bpagelink\b[^>]*>")
+_PAGE_PARAM_RE = re.compile(r"[?&]p=(\d+)")
+
+_CARD_SET_TITLE_RE = re.compile(r'<div class="badge_card_set_title[^>]*>(.*?)</div>', re.S)
+
+_MY_ROW_RE = re.compile(r'<div[^>]*\bid="(mybuyorder|mylisting)_(\d+)"')
+_LISTING_LINK_RE = re.compile(r'href="https://steamcommunity\.com/market/listings/753/([^"?#]+)"')
+_ITEM_NAME_RE = re.compile(r'class="market_listing_item_name(?:_link)?"[^>]*>([^<]+)<')
+_PRICE_SPAN_RE = re.compile(r'<span class="market_listing_price\b[^"]*"[^>]*>')
+_PRICE_VALUE_RE = re.compile(r"\d+(?:[.,]\d+)?")
+_BUYORDER_QTY_RE = re.compile(r'market_listing_(?:inline_)?buyorder_qty[^>]*>\s*(\d+)')
+_REMOVE_LISTING_RE = re.compile(r"RemoveMarketListing\(\s*'mylisting',\s*'(\d+)',\s*753,\s*'6',\s*'(\d+)'")
+_HOVER_ASSET_RE = re.compile(r"'mylisting_(\d+)_name',\s*753,\s*'6',\s*'(\d+)'")
+
+
+def strip_html(text):
+    text = _TAG_RE.sub("", text)
+    text = unescape(text)
+    return " ".join(text.split()).strip()
+
+
+def _class_matches(class_value, wanted):
+    """
+    Classes de `wanted` présentes dans la valeur d'un attribut class=, avec la même
+    notion de mot que \\b dans une regex (les tirets séparent, les underscores non).
+    """
+    return wanted.intersection(_CLASS_TOKEN_RE.findall(class_value))
+
+
+def _class_attr_re(class_names):
+    pattern = _CLASS_ATTR_RES.get(class_names)
+    if pattern is None:
+        alternatives = "|".join(re.escape(c) for c in class_names)
+        pattern = re.compile(rf'class=["\']([^"\']*\b(?:{alternatives})\b[^"\']*)["\']')
+        _CLASS_ATTR_RES[class_names] = pattern
+    return pattern
+
+
+def _first_text_by_class(html, class_names):
+    """
+    Pour chaque classe, texte du premier élément qui la porte (comme un re.search par classe),
+    en un seul parcours. Retourne le premier texte non vide dans l'ordre de class_names.
+    """
+    wanted = set(class_names)
+    found = {}
+    top = class_names[0]
+    for m in _class_attr_re(class_names).finditer(html):
+        matches = _class_matches(m.group(1), wanted) - found.keys()
+        if not matches:
+            continue
+        content = _ELEMENT_TEXT_RE.match(html, m.end())
+        if not content:
+            continue
+        text = strip_html(content.group(1)) or None
+        for class_name in matches:
+            found[class_name] = text
+        if top in found and found[top]:
+            break
+        if len(found) == len(wanted):
+            break
+
+    for class_name in class_names:
+        if found.get(class_name):
+            return found[class_name]
+    return None
+
+
+def extract_text_by_class(html, class_name):
+    return _first_text_by_class(html, (class_name,))
+
+
+def parse_badge_names_from_badges_page(html):
+    badge_names = {}
+    rows = _BADGE_ROW_RE.split(html)
+    for block in rows[1:]:
+        badge_id = None
+        for pattern in _BADGE_ROW_ID_RES:
+            m = pattern.search(block)
+            if m:
+                badge_id = int(m.group(1))
+                break
+        if badge_id is None:
+            continue
+
+        title = _first_text_by_class(block, _BADGE_ROW_TITLE_CLASSES)
+        if title:
+            badge_names[badge_id] = title
+
+    return badge_names
+
+
+def parse_badge_names_from_badges_xml(xml_text):
+    badge_names = {}
+    for block in _XML_BADGE_RE.findall(xml_text):
+        id_match = None
+        for pattern in _XML_BADGE_ID_RES:
+            id_match = pattern.search(block)
+            if id_match:
+                break
+        if not id_match:
+            continue
+        badge_id = int(id_match.group(1))
+
+        name_match = None
+        for pattern in _XML_BADGE_NAME_RES:
+            name_match = pattern.search(block)
+            if name_match:
+                break
+        if not name_match:
+            continue
+        title = strip_html(name_match.group(1))
+        if title:
+            badge_names[badge_id] = title
+    return badge_names
+
+
+def parse_badge_names_from_script(html):
+    badge_names = {}
+    for match in _SCRIPT_BADGE_RE.finditer(html):
+        title = strip_html(match.group(2))
+        if title:
+            badge_names[int(match.group(1))] = title
+    return badge_names
+
+
+def parse_badge_title(html):
+    return _first_text_by_class(html, _BADGE_PAGE_TITLE_CLASSES)
+
+
+def parse_badge_title_from_xml(xml_text):
+    for pattern in _XML_TITLE_RES:
+        match = pattern.search(xml_text)
+        if match:
+            title = strip_html(match.group(1))
+            if title:
+                return title
+    return None
+
+
+def parse_badge_page_count(html):
+    """
+    Nombre total de pages d'après les liens de pagination (?p=N), ou None s'il n'y en a pas.
+    """
+    pages = []
+    for tag in _PAGELINK_RE.findall(html):
+        m = _PAGE_PARAM_RE.search(tag)
+        if m:
+            pages.append(int(m.group(1)))
+    return max(pages) if pages else None
+
+
+def parse_card_names_from_gamecards(html):
+    names = set()
+    for block in _CARD_SET_TITLE_RE.findall(html):
+        text = _TAG_RE.sub("", block)
+        text = unescape(text).strip()
+        if not text:
+            continue
+        first_line = next((line.strip() for line in text.splitlines() if line.strip()), "")
+        if first_line:
+            names.add(first_line)
+    return names
+
+
+# -------------------------------------------------------------------
+# Page My Listings (ordres d'achat, annonces)
+# -------------------------------------------------------------------
+#
+# Une seule passe sur le HTML: chaque ligne est délimitée par l'ouverture de
+# la suivante, et les champs sont cherchés dans ce seul segment.
+
+def _iter_my_rows(html, kind):
+    rows = list(_MY_ROW_RE.finditer(html))
+    for i, m in enumerate(rows):
+        if m.group(1) != kind:
+            continue
+        end = rows[i + 1].start() if i + 1 < len(rows) else len(html)
+        yield m.group(2), html[m.end():end]
+
+
+def _row_item_name(row):
+    m = _LISTING_LINK_RE.search(row)
+    if m:
+        return unquote(m.group(1))
+    m = _ITEM_NAME_RE.search(row)
+    return strip_html(m.group(1)) if m else None
+
+
+def _row_price(row):
+    """
+    Premier prix du span market_listing_price ("2 @ 0,05€" pour un ordre d'achat,
+    "0,05€ (0,03€)" pour une annonce: prix acheteur).
+    """
+    m = _PRICE_SPAN_RE.search(row)
+    if not m:
+        return None
+    end = row.find("</div>", m.end())
+    text = strip_html(row[m.end():end if end != -1 else len(row)]).split("@")[-1]
+    value = _PRICE_VALUE_RE.search(text)
+    return float(value.group(0).replace(",", ".")) if value else None
+
+
+def parse_my_buy_orders(html):
+    """
+    Ordres d'achat actifs: liste de (order_id, market_hash_name, price_eur, quantity).
+    """
+    orders = []
+    for order_id, row in _iter_my_rows(html, "mybuyorder"):
+        name = _row_item_name(row)
+        price = _row_price(row)
+        qty = _BUYORDER_QTY_RE.search(row)
+        if name is None or price is None or not qty:
+            continue
+        orders.append((order_id, name, price, int(qty.group(1))))
+    return orders
+
+
+def parse_my_listings(html, hovers=""):
+    """
+    Annonces actives: liste de (listing_id, market_hash_name, price_eur, assetid).
+    `hovers` (champ du JSON mylistings/render) complète l'assetid manquant.
+    """
+    hover_assets = dict(_HOVER_ASSET_RE.findall(hovers or ""))
+    listings = []
+    for listing_id, row in _iter_my_rows(html, "mylisting"):
+        name = _row_item_name(row)
+        price = _row_price(row)
+        if name is None or price is None:
+            continue
+        remove = _REMOVE_LISTING_RE.search(row)
+        assetid = remove.group(2) if remove else hover_assets.get(listing_id)
+        listings.append((listing_id, name, price, assetid))
+    return listings
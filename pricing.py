@@ -0,0 +1,220 @@
+import logging
+import time
+from concurrent.futures import as_completed
+
+import store
+from config import (
+    BADGE_MAX_LEVEL,
+    BULK_QUOTE_MARGIN_EUR,
+    BULK_QUOTE_TTL_SECONDS,
+    MAX_CARD_PRICE,
+    MIN_PRICE_EUR,
+)
+from market import (
+    LOOKUP_FIRST,
+    LOOKUP_FRESH,
+    LOOKUP_STALE,
+    LOOKUPS,
+    compute_sale_price_from_histogram,
+    get_lowest_seller_and_qty,
+    parse_search_result,
+    peek_order_book,
+    search_trading_cards,
+)
+from logic import compute_missing_cards, compute_surplus_cards
+
+# -------------------------------------------------------------------
+# Pricing concurrent d'un lot de cartes
+# -------------------------------------------------------------------
+#
+# Chaque carte passe par deux endpoints (page listing pour l'item_nameid,
+# puis itemordershistogram). Ils ont chacun leur bucket dans ratelimit:
+# avec plusieurs workers, la résolution d'item_nameid des cartes suivantes
+# se fait pendant que l'histogramme des précédentes est récupéré, et seul
+# le débit du rate limiter borne la durée totale.
+#
+# Les lookups passent tous par la file de priorité market.LOOKUPS: les cartes
+# déjà fraîches en cache (gratuites) d'abord, puis les premières cotations,
+# puis les cotations périmées, servies tout de suite et dont le
+# rafraîchissement est replanifié dans la même file (STALE_REFRESH_PRIORITY);
+# à l'intérieur de chaque niveau, par valeur décroissante (voir lookup_scores).
+
+
+def _cache_tier(name):
+    peeked = peek_order_book(name)
+    if peeked is None:
+        return LOOKUP_FIRST
+    return LOOKUP_FRESH if peeked[1] else LOOKUP_STALE
+
+
+def price_cards(session, names, journal=None, scores=None):
+    """
+    Retourne un dict market_hash_name -> (lowest_seller_price_eur, qty_at_lowest).
+    Les cartes en échec (erreur réseau, item_nameid introuvable, prix inconnu) valent None.
+    Avec un journal.RunJournal, les prix déjà obtenus dans le run sont rejoués sans requête.
+    scores: market_hash_name -> valeur attendue (voir lookup_scores), les plus hautes d'abord.
+    """
+    unique_names = list(dict.fromkeys(names))
+    prices = {}
+    if not unique_names:
+        return prices
+
+    scores = scores or {}
+    priorities = {name: (_cache_tier(name), -scores.get(name, 0.0)) for name in unique_names}
+    # Soumis dans l'ordre: un worker qui démarre pendant la soumission prend déjà le meilleur
+    futures = {
+        LOOKUPS.submit(priorities[name], _price_card, session, name, journal): name
+        for name in sorted(unique_names, key=priorities.get)
+    }
+    for future in as_completed(futures):
+        name = futures[future]
+        try:
+            prices[name] = future.result()
+        except Exception as e:
+            logging.warning(f"Failed to price {name}: {e}")
+            prices[name] = None
+
+    logging.debug(f"Priced {len(prices)} cards with {LOOKUPS.workers} workers")
+    return prices
+
+
+def _price_card(session, name, journal):
+    if journal is None:
+        return get_lowest_seller_and_qty(session, name)
+    return journal.fetch("price", name, lambda: get_lowest_seller_and_qty(session, name), decode=tuple)
+
+
+# -------------------------------------------------------------------
+# Cotation en masse depuis market/search
+# -------------------------------------------------------------------
+#
+# Une requête search/render filtrée sur un jeu renvoie sell_price et
+# sell_listings pour tout son set de cartes. sell_listings est le nombre
+# total d'offres, pas la quantité au prix mini: c'est une approximation
+# de qty_at_lowest, exacte quand il y a au plus 2 offres. Les cartes dont
+# le prix est proche d'un seuil de décision repassent par l'histogramme.
+
+
+def _appid_of(market_hash_name):
+    prefix = market_hash_name.split("-", 1)[0]
+    return int(prefix) if prefix.isdigit() else None
+
+
+def _near_threshold(price):
+    return any(
+        abs(price - threshold) <= BULK_QUOTE_MARGIN_EUR + 1e-9
+        for threshold in (MAX_CARD_PRICE, MIN_PRICE_EUR)
+    )
+
+
+def _fetch_app_quotes(session, appid):
+    data = search_trading_cards(session, filters={"category_753_Game[]": f"tag_app_{appid}"})
+    if data is None:
+        return []
+    quotes = [parsed for parsed in map(parse_search_result, data.get("results") or []) if parsed]
+    store.put_search_quotes(quotes, time.time())
+    return quotes
+
+
+def quote_cards(session, names, scores=None):
+    """
+    Comme price_cards, mais à partir des résultats de recherche (une requête par jeu
+    au lieu de deux par carte). Retourne market_hash_name -> (lowest_price_eur, qty_approx)
+    ou None. Seules les cartes sans cotation ou proches de MAX_CARD_PRICE / MIN_PRICE_EUR
+    sont re-cotées via l'histogramme. Les jeux, puis les cartes, passent par ordre de scores.
+    """
+    unique_names = list(dict.fromkeys(names))
+    cached = store.get_search_quotes(unique_names)
+    now = time.time()
+
+    quotes = {
+        name: (price, listings)
+        for name, (price, listings, fetched_at) in cached.items()
+        if now - fetched_at < BULK_QUOTE_TTL_SECONDS
+    }
+
+    scores = scores or {}
+    app_scores = {}
+    for name in unique_names:
+        if name not in quotes:
+            appid = _appid_of(name)
+            if appid is not None:
+                app_scores[appid] = max(app_scores.get(appid, 0.0), scores.get(name, 0.0))
+    stale_apps = sorted(app_scores, key=lambda appid: (-app_scores[appid], appid))
+    for appid in stale_apps:
+        for _, name, price, listings in _fetch_app_quotes(session, appid):
+            quotes[name] = (price, listings)
+
+    prices = {}
+    fallback = []
+    for name in unique_names:
+        price, listings = quotes.get(name, (None, 0))
+        if price is None or _near_threshold(price):
+            fallback.append(name)
+            continue
+        prices[name] = (max(price, MIN_PRICE_EUR), listings)
+
+    logging.debug(
+        f"Bulk quotes: {len(prices)} cards from search ({len(stale_apps)} requests), "
+        f"{len(fallback)} via histogram"
+    )
+    prices.update(price_cards(session, fallback, scores=scores))
+    return prices
+
+
+def quote_sale_prices(session, names):
+    """
+    market_hash_name -> prix de vente selon compute_sale_price_from_histogram, ou None si inconnu.
+    """
+    return {
+        name: compute_sale_price_from_histogram(*quote) if quote else None
+        for name, quote in quote_cards(session, names).items()
+    }
+
+
+# -------------------------------------------------------------------
+# Valeur attendue d'un lookup (ordre de la file de priorité)
+# -------------------------------------------------------------------
+
+def _prior_price(name, search_quotes):
+    """
+    Dernier prix connu, même périmé, sans requête: cotation search ou carnet en cache.
+    """
+    quote = search_quotes.get(name)
+    if quote is not None and quote[0] is not None:
+        return quote[0]
+    peeked = peek_order_book(name)
+    return peeked[0].lowest_seller_and_qty()[0] if peeked else None
+
+
+def lookup_scores(badges, cards_by_app, badge_max_level=BADGE_MAX_LEVEL):
+    """
+    market_hash_name -> valeur attendue de la cotation (plus haut = plus utile), somme de:
+    - badge proche de la complétion: 1 / (1 + exemplaires manquants du badge), pour une carte manquante,
+    - surplus: 1 - 1 / (1 + exemplaires en surplus de la carte),
+    - prix connu proche de MAX_CARD_PRICE / MIN_PRICE_EUR: 1 / (1 + écart en centimes).
+    badges: appid -> level, cards_by_app: voir inventory.get_trading_cards.
+    """
+    names = [name for app in cards_by_app.values() for name in app["cards"]]
+    search_quotes = store.get_search_quotes(names)
+
+    scores = {}
+    for appid, app in cards_by_app.items():
+        level = badges.get(appid, 0)
+        surplus = compute_surplus_cards(level, badge_max_level, app["cards"])
+        missing = compute_missing_cards(level, badge_max_level, app["cards"])
+        app_missing = sum(card["needed"] for card in missing.values())
+
+        for name in app["cards"]:
+            score = 0.0
+            if name in missing:
+                score += 1.0 / (1 + app_missing)
+            units = len(surplus.get(name, ()))
+            if units:
+                score += 1.0 - 1.0 / (1 + units)
+            price = _prior_price(name, search_quotes)
+            if price is not None:
+                distance = min(abs(price - threshold) for threshold in (MAX_CARD_PRICE, MIN_PRICE_EUR))
+                score += 1.0 / (1 + round(distance * 100))
+            scores[name] = score
+    return scores
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import threading
+import time
+
+from config import RATE_LIMITS
+
+# -------------------------------------------------------------------
+# Rate limiting par famille d'endpoints (token bucket)
+# -------------------------------------------------------------------
+#
+# Chaque famille (priceoverview, histogram, listing, ...) a son propre
+# bucket: "interval" secondes par requête en régime permanent, "burst"
+# requêtes consécutives autorisées après une période d'inactivité.
+# Les buckets sont indépendants: deux endpoints différents peuvent donc
+# être interrogés en parallèle, chacun restant à sa propre limite.
+#
+# Un jeton est *réservé* sous lock puis l'attente se fait hors lock, ce qui
+# rend acquire() sûr entre threads et acquire_async() sûr sous asyncio.
+
+_clock = time.monotonic
+
+
+class RateLimited(RuntimeError):
+    """
+    Requête refusée par un 429. retry_after: pénalité (secondes) appliquée au bucket.
+    """
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    def __init__(self, name, interval, burst=1):
+        self.name = name
+        self.interval = float(interval)
+        self.burst = max(int(burst), 1)
+        # Instant théorique du prochain jeton (GCRA): la réserve de burst
+        # correspond à l'écart entre cet instant et maintenant.
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """
+        Réserve un jeton et retourne le délai (secondes) à attendre avant de l'utiliser.
+        """
+        with self._lock:
+            now = _clock()
+            slot = max(self._next_slot, now)
+            allowed_at = slot - (self.burst - 1) * self.interval
+            self._next_slot = slot + self.interval
+            return max(allowed_at - now, 0.0)
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def penalize(self, seconds):
+        """
+        Bloque le bucket pendant `seconds` (429 / Retry-After) et vide la réserve de burst.
+        """
+        with self._lock:
+            blocked_until = _clock() + seconds + (self.burst - 1) * self.interval
+            self._next_slot = max(self._next_slot, blocked_until)
+
+
+_BUCKETS = {}
+_BUCKETS_LOCK = threading.Lock()
+
+
+def get_bucket(name):
+    with _BUCKETS_LOCK:
+        bucket = _BUCKETS.get(name)
+        if bucket is None:
+            interval, burst = RATE_LIMITS.get(name, RATE_LIMITS["default"])
+            bucket = TokenBucket(name, interval, burst)
+            _BUCKETS[name] = bucket
+        return bucket
+
+
+def acquire(name):
+    get_bucket(name).acquire()
+
+
+async def acquire_async(name):
+    await get_bucket(name).acquire_async()
+
+
+def _retry_after_seconds(response):
+    if response is None:
+        return None
+    retry_after = response.headers.get("Retry-After")
+    if retry_after and retry_after.strip().isdigit():
+        return int(retry_after)
+    return None
+
+
+def backoff(name, response=None, default=None, wait=True):
+    """
+    À appeler après un 429 sur l'endpoint `name`.
+    Respecte Retry-After si présent, sinon `default` (par défaut 2x l'intervalle du bucket).
+    Si wait=True, bloque jusqu'à ce que le prochain jeton soit disponible.
+    Retourne le délai de pénalité appliqué.
+    """
+    bucket = get_bucket(name)
+    delay = _retry_after_seconds(response)
+    if delay is None:
+        delay = default if default is not None else bucket.interval * 2
+    logging.debug(f"Rate limited on {name}, backing off {delay} seconds")
+    bucket.penalize(delay)
+    if wait:
+        bucket.acquire()
+    return delay
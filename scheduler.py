@@ -0,0 +1,60 @@
+import heapq
+import itertools
+import logging
+import threading
+from concurrent.futures import Future
+
+# -------------------------------------------------------------------
+# File de priorité devant les requêtes market
+# -------------------------------------------------------------------
+#
+# Le débit market est fixé par ratelimit: ce qui compte est l'ordre dans
+# lequel les requêtes passent. Toutes les tâches soumises (par un ou
+# plusieurs appelants) partagent les mêmes workers, et un worker libre
+# prend toujours la tâche de plus petite priorité. À priorité égale,
+# l'ordre de soumission est conservé.
+
+
+class PriorityScheduler:
+    def __init__(self, workers, name="scheduler"):
+        self.workers = max(1, workers)
+        self.name = name
+        self._heap = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._threads = []
+
+    def submit(self, priority, fn, *args, **kwargs):
+        """
+        Planifie fn(*args, **kwargs); les plus petites priorités passent d'abord.
+        Retourne un concurrent.futures.Future.
+        """
+        future = Future()
+        with self._cond:
+            heapq.heappush(self._heap, (priority, next(self._counter), future, fn, args, kwargs))
+            if len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self._run, name=f"{self.name}-{len(self._threads)}", daemon=True
+                )
+                self._threads.append(thread)
+                thread.start()
+            self._cond.notify()
+        return future
+
+    def pending(self):
+        with self._cond:
+            return len(self._heap)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                _, _, future, fn, args, kwargs = heapq.heappop(self._heap)
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                logging.debug(f"{self.name}: task failed: {e}")
+                future.set_exception(e)
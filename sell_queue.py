@@ -0,0 +1,121 @@
+import logging
+import time
+
+import requests
+
+import http_client
+import ratelimit
+import store
+from config import SELL_MAX_ATTEMPTS
+from logic import CardHoldings
+from market import sell_item
+
+# -------------------------------------------------------------------
+# File de vente persistante autour de market.sell_item
+# -------------------------------------------------------------------
+#
+# Chaque pile du surplus a un statut en base: pending -> sending -> listed,
+# ou failed. Un run interrompu reprend sur ce qui reste pending, et un asset
+# listed n'est renvoyé que si une resync complète d'inventaire postérieure à
+# la mise en vente le montre encore (reste d'une pile vendue en partie). Un 429 n'interrompt pas la passe: l'asset est
+# remis en file après le Retry-After, les autres continuent.
+#
+# Un asset resté en sending (arrêt pendant l'envoi) a pu être mis en vente:
+# il passe en unknown et n'est jamais renvoyé automatiquement. Idem pour une
+# erreur après l'envoi (timeout de lecture, connexion coupée, 5xx): seuls un
+# 429 et une connexion impossible (requête jamais partie) sont retentés, un
+# 4xx passe directement en failed.
+
+
+def enqueue(surplus, prices, snapshot_at=None):
+    """
+    surplus: market_hash_name -> assetids (liste ou CardHoldings), sortie de compute_surplus_cards.
+    prices: market_hash_name -> prix de vente en EUR (None: carte ignorée).
+    snapshot_at: date de la resync complète d'inventaire dont vient surplus
+    (store.get_inventory_last_full_sync); sans elle, une pile déjà listée n'est pas remise en file.
+    Les exemplaires d'une même pile partent en un seul appel (amount > 1).
+    Retourne le nombre de piles mises en file.
+    """
+    items = []
+    for name, assets in surplus.items():
+        price = prices.get(name)
+        if price is None:
+            continue
+        runs = assets.runs() if isinstance(assets, CardHoldings) else ((assetid, 1) for assetid in assets)
+        stacks = {}
+        for assetid, amount in runs:
+            stacks[assetid] = stacks.get(assetid, 0) + amount
+        items.extend((assetid, name, amount, price) for assetid, amount in stacks.items())
+
+    skipped = store.queue_sell_items(items, snapshot_at=snapshot_at)
+    if skipped.get("listed"):
+        logging.warning(
+            f"{skipped['listed']} stacks already listed were not queued again: "
+            f"pass snapshot_at from a full inventory sync taken after the listing to sell what is left of them"
+        )
+    if skipped.get("unknown"):
+        logging.warning(f"{skipped['unknown']} stacks with an unknown sell outcome were not queued, check them on Steam")
+    queued = len(items) - sum(skipped.values())
+    logging.debug(f"Queued {queued} stacks for sale")
+    return queued
+
+
+def _sell_one(session, assetid, name, amount, price, attempts, max_attempts):
+    store.update_sell_item(assetid, "sending")
+    try:
+        sell_item(session, assetid, price, amount=amount)
+    except ratelimit.RateLimited as e:
+        logging.warning(f"Rate limited selling {name}, requeued in {e.retry_after} seconds")
+        store.update_sell_item(assetid, "pending", not_before=time.time() + e.retry_after)
+    except requests.exceptions.RequestException as e:
+        attempts += 1
+        if e.response is not None and 400 <= e.response.status_code < 500:
+            logging.error(f"Steam rejected the sale of {name} (asset {assetid}): {e}")
+            store.update_sell_item(assetid, "failed", attempts=attempts, error=str(e))
+        elif not http_client.request_not_sent(e):
+            logging.error(f"Outcome unknown selling {name} (asset {assetid}), not re-sent: {e}")
+            store.update_sell_item(assetid, "unknown", attempts=attempts, error=str(e))
+        elif attempts >= max_attempts:
+            logging.error(f"Giving up selling {name} (asset {assetid}) after {attempts} attempts: {e}")
+            store.update_sell_item(assetid, "failed", attempts=attempts, error=str(e))
+        else:
+            logging.warning(f"Error selling {name}: {e}, retrying in {2**attempts} seconds")
+            store.update_sell_item(assetid, "pending", attempts=attempts, not_before=time.time() + 2**attempts)
+    except RuntimeError as e:
+        # Refus explicite de Steam (success != 1): inutile de réessayer
+        logging.error(f"Steam refused to list {name} (asset {assetid}): {e}")
+        store.update_sell_item(assetid, "failed", attempts=attempts + 1, error=str(e))
+    else:
+        logging.info(f"Listed {amount}x {name} at {price:.2f}€ (asset {assetid})")
+        store.update_sell_item(assetid, "listed", attempts=attempts + 1)
+
+
+def run(session, max_attempts=SELL_MAX_ATTEMPTS):
+    """
+    Vide la file de vente (au rythme du bucket sellitem) et retourne les
+    compteurs par statut.
+    """
+    interrupted = store.flag_interrupted_sells()
+    if interrupted:
+        logging.warning(f"Resuming sell queue: {interrupted} assets were interrupted while sending, not re-sent")
+
+    while True:
+        now = time.time()
+        batch = store.next_sell_items(now)
+        if not batch:
+            next_time = store.next_sell_time()
+            if next_time is None:
+                break
+            time.sleep(max(next_time - now, 0))
+            continue
+        for assetid, name, amount, price, attempts in batch:
+            _sell_one(session, assetid, name, amount, price, attempts, max_attempts)
+
+    counts = store.sell_queue_counts()
+    logging.info(f"Sell queue done: {counts}")
+    return counts
+
+
+def sell_surplus(session, surplus, prices, max_attempts=SELL_MAX_ATTEMPTS, snapshot_at=None):
+    enqueue(surplus, prices, snapshot_at=snapshot_at)
+    return run(session, max_attempts=max_attempts)
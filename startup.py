@@ -0,0 +1,59 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from badges import get_badges_list, get_owned_games_map, get_profile_badge_names
+from steam_auth import login_with_cookies
+
+# -------------------------------------------------------------------
+# Démarrage: appels Steam indépendants lancés en parallèle
+# -------------------------------------------------------------------
+#
+# Les appels Web API (badges, jeux possédés) n'ont pas besoin de la session:
+# ils partent en même temps que le login. Les appels communautaires
+# (noms de badges du profil, inventaire, ordres d'achat) attendent la
+# session, l'inventaire attend aussi les niveaux de badges. Le temps de
+# démarrage est donc celui de la plus longue chaîne, pas la somme des appels.
+
+
+def start(steam_id, profile_names=True, inventory=False, buy_orders=False, cookie_file="steam_cookies.json"):
+    """
+    Retourne un dict avec "session", "badges" (liste GetBadges), "app_names"
+    et, selon les options, "profile_badge_names", "inventory" (get_trading_cards)
+    et "buy_orders" (get_buy_orders).
+    Une exception levée par un appel est propagée une fois tous les appels terminés.
+    """
+    started = time.time()
+    tasks = 3 + profile_names + inventory + buy_orders
+
+    with ThreadPoolExecutor(max_workers=tasks) as pool:
+        # Un worker par tâche: les tâches dépendantes peuvent attendre
+        # le résultat d'une autre sans risque d'interblocage.
+        futures = {
+            "session": pool.submit(login_with_cookies, cookie_file),
+            "badges": pool.submit(get_badges_list, steam_id),
+            "app_names": pool.submit(get_owned_games_map, steam_id),
+        }
+        session_future = futures["session"]
+        badges_future = futures["badges"]
+
+        if profile_names:
+            futures["profile_badge_names"] = pool.submit(
+                lambda: get_profile_badge_names(session=session_future.result(), steam_id=steam_id)
+            )
+        if inventory:
+            from inventory import get_trading_cards
+
+            def load_inventory():
+                levels = {b["appid"]: b["level"] for b in badges_future.result() if "appid" in b}
+                return get_trading_cards(session_future.result(), steam_id, levels)
+
+            futures["inventory"] = pool.submit(load_inventory)
+        if buy_orders:
+            from market import get_buy_orders
+
+            futures["buy_orders"] = pool.submit(lambda: get_buy_orders(session_future.result()))
+
+    results = {key: future.result() for key, future in futures.items()}
+    logging.info(f"Startup calls ({', '.join(results)}) done in {time.time() - started:.1f}s")
+    return results
@@ -1,9 +1,137 @@
+import atexit
 import json
 import logging
+import os
+import time
+
 import requests
 
+import http_client
+import ratelimit
+import store
+from config import SESSION_FRESH_SECONDS
+
+_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+# -------------------------------------------------------------------
+# Fraîcheur de la session
+# -------------------------------------------------------------------
+#
+# Le warmup de steamcommunity.com (et celui de la page inventaire) n'est
+# refait que si le dernier warmup réussi date de plus de SESSION_FRESH_SECONDS.
+# Les cookies rafraîchis par Steam pendant le run sont réécrits dans le
+# fichier de cookies à la sortie, pour que le run suivant reparte d'eux:
+# seulement si la session était valide et si Steam a vraiment changé un cookie.
+
+_SAVED_COOKIES = {}  # chemin absolu du fichier -> cookies tels que dans le fichier
+
+
+def is_fresh(name):
+    checked_at = store.get_session_checked_at(name)
+    return checked_at is not None and time.time() - checked_at < SESSION_FRESH_SECONDS
+
+
+def mark_fresh(name):
+    store.put_session_checked_at(name, time.time())
+
+
+def invalidate(name):
+    store.put_session_checked_at(name, None)
+
+
+def _session_key(cookie_file):
+    return f"cookies:{os.path.abspath(cookie_file)}"
+
+
+def probe_session(session):
+    """
+    Vérifie les cookies sans charger de page: /my/ redirige vers le profil
+    si la session est valide, vers /login sinon.
+    """
+    ratelimit.acquire("community")
+    r = session.get("https://steamcommunity.com/my/", headers=_HEADERS, allow_redirects=False)
+    location = r.headers.get("Location", "")
+    logging.debug(f"Session probe status: {r.status_code}, location: {location}")
+    return r.is_redirect and "/login" not in location
+
+
+def _cookie_key(name, domain, path):
+    return name, domain or "", path or "/"
+
+
+def _jar_snapshot(session):
+    return {_cookie_key(c.name, c.domain, c.path): c.value for c in session.cookies}
+
+
+def _read_cookie_file(cookie_file):
+    try:
+        with open(cookie_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def save_session(session, cookie_file="steam_cookies.json"):
+    """
+    Réécrit le cookie jar complet (sessionid / steamLoginSecure rafraîchis compris),
+    au même format que le fichier chargé par login_with_cookies. Les champs
+    du fichier que le jar ne connaît pas (expiry, secure, httpOnly...) sont conservés.
+    """
+    previous = {
+        _cookie_key(c.get("name"), c.get("domain"), c.get("path")): c for c in _read_cookie_file(cookie_file)
+    }
+    cookies = []
+    for c in session.cookies:
+        entry = dict(previous.get(_cookie_key(c.name, c.domain, c.path), {}))
+        if not entry:
+            entry["secure"] = c.secure
+            if c.expires is not None:
+                entry["expirationDate"] = c.expires
+        entry.update({"name": c.name, "value": c.value, "domain": c.domain, "path": c.path})
+        cookies.append(entry)
+
+    tmp_path = f"{cookie_file}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cookies, f, indent=2)
+    os.replace(tmp_path, cookie_file)
+    _SAVED_COOKIES[os.path.abspath(cookie_file)] = _jar_snapshot(session)
+    logging.debug(f"Saved {len(cookies)} cookies to {cookie_file}")
+
+
+def save_session_if_changed(session, cookie_file="steam_cookies.json"):
+    """
+    Comme save_session, mais seulement si la session a passé le probe récemment
+    (is_fresh) et si un cookie a changé depuis le chargement ou la dernière
+    écriture du fichier. Retourne True si le fichier a été réécrit.
+    """
+    if not is_fresh(_session_key(cookie_file)):
+        logging.debug(f"Session not validated, {cookie_file} not rewritten")
+        return False
+    if _jar_snapshot(session) == _SAVED_COOKIES.get(os.path.abspath(cookie_file)):
+        logging.debug(f"Cookies unchanged, {cookie_file} not rewritten")
+        return False
+    save_session(session, cookie_file)
+    return True
+
+
+def revalidate(session, cookie_file="steam_cookies.json"):
+    """
+    Probe de validité; si la session est valide, la marque fraîche et réécrit
+    les cookies s'ils ont changé.
+    """
+    if not probe_session(session):
+        logging.warning("Steam session looks expired (redirected to login), refresh steam_cookies.json")
+        invalidate(_session_key(cookie_file))
+        return False
+    mark_fresh(_session_key(cookie_file))
+    save_session_if_changed(session, cookie_file)
+    return True
+
+
 def login_with_cookies(cookie_file="steam_cookies.json"):
-    session = requests.Session()
+    session = http_client.configure_session(requests.Session())
 
     with open(cookie_file, "r", encoding="utf-8") as f:
         cookies = json.load(f)
@@ -19,12 +147,12 @@ def login_with_cookies(cookie_file="steam_cookies.json"):
             domain=cookie.get("domain"),
             path=cookie.get("path", "/")
         )
+    _SAVED_COOKIES[os.path.abspath(cookie_file)] = _jar_snapshot(session)
 
-    # Warm up the session by visiting the main page
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-    }
-    warmup_response = session.get("https://steamcommunity.com", headers=headers)
-    logging.debug(f"Warmup response status: {warmup_response.status_code}")
+    if is_fresh(_session_key(cookie_file)):
+        logging.debug("Stored session is fresh, skipping warmup")
+    else:
+        revalidate(session, cookie_file)
 
+    atexit.register(save_session_if_changed, session, cookie_file)
     return session
@@ -0,0 +1,708 @@
+import json
+import sqlite3
+import threading
+import time
+
+from config import CACHE_DB_PATH
+
+# -------------------------------------------------------------------
+# Base SQLite partagée par les caches persistants
+# -------------------------------------------------------------------
+
+_CONNECTION = None
+_LOCK = threading.RLock()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS item_nameids (
+    market_hash_name TEXT PRIMARY KEY,
+    item_nameid INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS cache_entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    ttl REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+
+CREATE TABLE IF NOT EXISTS inventory_assets (
+    steam_id TEXT NOT NULL,
+    assetid TEXT NOT NULL,
+    classid TEXT NOT NULL,
+    amount INTEGER NOT NULL,
+    seen_at REAL NOT NULL,
+    PRIMARY KEY (steam_id, assetid)
+);
+
+CREATE TABLE IF NOT EXISTS inventory_card_descriptions (
+    classid TEXT PRIMARY KEY,
+    market_hash_name TEXT NOT NULL,
+    market_fee_app INTEGER,
+    game_name TEXT
+);
+
+CREATE TABLE IF NOT EXISTS card_catalog (
+    appid INTEGER PRIMARY KEY,
+    names TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    version INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS crawl_state (
+    name TEXT PRIMARY KEY,
+    start INTEGER NOT NULL,
+    total INTEGER,
+    started_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    finished INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS crawl_catalog_staging (
+    crawl TEXT NOT NULL,
+    appid INTEGER NOT NULL,
+    market_hash_name TEXT NOT NULL,
+    PRIMARY KEY (crawl, appid, market_hash_name)
+);
+
+CREATE TABLE IF NOT EXISTS search_quotes (
+    market_hash_name TEXT PRIMARY KEY,
+    appid INTEGER,
+    sell_price_eur REAL,
+    sell_listings INTEGER NOT NULL,
+    fetched_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS names (
+    kind TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    name TEXT,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (kind, id)
+);
+
+CREATE TABLE IF NOT EXISTS badge_name_variants (
+    badge_id INTEGER PRIMARY KEY,
+    variant TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS inventory_sync (
+    steam_id TEXT PRIMARY KEY,
+    last_full_sync REAL NOT NULL,
+    last_sync REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS sell_queue (
+    assetid TEXT PRIMARY KEY,
+    market_hash_name TEXT NOT NULL,
+    amount INTEGER NOT NULL,
+    price_eur REAL NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    not_before REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    error TEXT
+);
+
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL
+);
+
+CREATE TABLE IF NOT EXISTS run_journal (
+    run_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    inputs TEXT,
+    status TEXT NOT NULL,
+    result TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (run_id, kind, key)
+);
+
+CREATE TABLE IF NOT EXISTS session_state (
+    name TEXT PRIMARY KEY,
+    checked_at REAL NOT NULL
+);
+"""
+
+
+def get_connection():
+    """
+    Ouvre (une seule fois) la base SQLite des caches persistants.
+    La connexion est partagée entre threads, protégée par lock().
+    """
+    global _CONNECTION
+
+    with _LOCK:
+        if _CONNECTION is None:
+            _CONNECTION = sqlite3.connect(CACHE_DB_PATH, check_same_thread=False)
+            _CONNECTION.executescript(_SCHEMA)
+        return _CONNECTION
+
+
+def lock():
+    return _LOCK
+
+
+# -------------------------------------------------------------------
+# Index item_nameid
+# -------------------------------------------------------------------
+
+def get_item_nameid(market_hash_name):
+    with _LOCK:
+        row = get_connection().execute(
+            "SELECT item_nameid FROM item_nameids WHERE market_hash_name = ?",
+            (market_hash_name,),
+        ).fetchone()
+    return row[0] if row else None
+
+
+def put_item_nameids(mapping):
+    """
+    Enregistre un dict market_hash_name -> item_nameid.
+    """
+    with _LOCK:
+        conn = get_connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO item_nameids (market_hash_name, item_nameid) VALUES (?, ?)",
+                ((name, int(nameid)) for name, nameid in mapping.items()),
+            )
+
+
+def all_item_nameids():
+    with _LOCK:
+        rows = get_connection().execute(
+            "SELECT market_hash_name, item_nameid FROM item_nameids ORDER BY market_hash_name"
+        ).fetchall()
+    return dict(rows)
+
+
+# -------------------------------------------------------------------
+# Entrées de cache à durée de vie (voir ttl_cache.py)
+# -------------------------------------------------------------------
+
+def get_cache_entry(namespace, key):
+    """
+    Retourne (value_json, fetched_at, ttl) ou None.
+    """
+    with _LOCK:
+        return get_connection().execute(
+            "SELECT value, fetched_at, ttl FROM cache_entries WHERE namespace = ? AND key = ?",
+            (namespace, key),
+        ).fetchone()
+
+
+def put_cache_entry(namespace, key, value_json, fetched_at, ttl):
+    with _LOCK:
+        conn = get_connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, fetched_at, ttl) VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, value_json, fetched_at, ttl),
+            )
+
+
+# -------------------------------------------------------------------
+# Snapshot d'inventaire (sync incrémentale, écrit page par page)
+# -------------------------------------------------------------------
+
+def get_inventory_last_full_sync(steam_id):
+    with _LOCK:
+        row = get_connection().execute(
+            "SELECT last_full_sync FROM inventory_sync WHERE steam_id = ?", (str(steam_id),)
+        ).fetchone()
+    return row[0] if row else None
+
+
+def load_card_descriptions():
+    """
+    classid -> {"classid", "market_hash_name", "market_fee_app", "game_name"}
+    """
+    with _LOCK:
+        rows = get_connection().execute(
+            "SELECT classid, market_hash_name, market_fee_app, game_name FROM inventory_card_descriptions"
+        ).fetchall()
+    return {
+        classid: {
+            "classid": classid,
+            "market_hash_name": name,
+            "market_fee_app": app,
+            "game_name": game,
+        }
+        for classid, name, app, game in rows
+    }
+
+
+def known_assetids(steam_id, assetids):
+    """
+    Sous-ensemble de `assetids` déjà présent dans le snapshot.
+    """
+    assetids = list(assetids)
+    if not assetids:
+        return set()
+    placeholders = ",".join("?" * len(assetids))
+    with _LOCK:
+        rows = get_connection().execute(
+            f"SELECT assetid FROM inventory_assets WHERE steam_id = ? AND assetid IN ({placeholders})",
+            [str(steam_id)] + assetids,
+        ).fetchall()
+    return {row[0] for row in rows}
+
+
+def save_inventory_page(steam_id, assets, card_descriptions, seen_at):
+    steam_id = str(steam_id)
+    with _LOCK:
+        conn = get_connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO inventory_assets (steam_id, assetid, classid, amount, seen_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                ((steam_id, a["assetid"], a["classid"], a["amount"], seen_at) for a in assets),
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO inventory_card_descriptions "
+                "(classid, market_hash_name, market_fee_app, game_name) VALUES (?, ?, ?, ?)",
+                (
+                    (d["classid"], d["market_hash_name"], d["market_fee_app"], d["game_name"])
+                    for d in card_descriptions.values()
+                ),
+            )
+
+
+def finish_inventory_sync(steam_id, full_sync, synced_at):
+    """
+    Clôt une sync: une resync complète supprime les assets qui n'ont pas été revus.
+    """
+    steam_id = str(steam_id)
+    with _LOCK:
+        conn = get_connection()
+        with conn:
+            if full_sync:
+                conn.execute(
+                    "DELETE FROM inventory_assets WHERE steam_id = ? AND seen_at < ?",
+                    (steam_id, synced_at),
+                )
+            previous = conn.execute(
+                "SELECT last_full_sync FROM inventory_sync WHERE steam_id = ?", (steam_id,)
+            ).fetchone()
+            last_full_sync = synced_at if full_sync or previous is None else previous[0]
+            conn.execute(
+                "INSERT OR REPLACE INTO inventory_sync (steam_id, last_full_sync, last_sync) VALUES (?, ?, ?)",
+                (steam_id, last_full_sync, synced_at),
+            )
+
+
+def iter_inventory_assets(steam_id, chunk_size=1000):
+    """
+    Parcourt le snapshot par blocs, sans le charger entièrement en mémoire.
+    """
+    last_rowid = 0
+    while True:
+        with _LOCK:
+            rows = get_connection().execute(
+                "SELECT rowid, assetid, classid, amount FROM inventory_assets "
+                "WHERE steam_id = ? AND rowid > ? ORDER BY rowid LIMIT ?",
+                (str(steam_id), last_rowid, chunk_size),
+            ).fetchall()
+        if not rows:
+            return
+        for rowid, assetid, classid, amount in rows:
+            yield {"assetid": assetid, "classid": classid, "amount": amount}
+        last_rowid = rows[-1][0]
+
+
+# -------------------------------------------------------------------
+# Catalogue appid -> cartes (voir catalog.py)
+# -------------------------------------------------------------------
+
+def get_catalog_entry(appid):
+    """
+    Retourne (names, fetched_at, version) ou None.
+    """
+    with _LOCK:
+        row = get_connection().execute(
+            "SELECT names, fetched_at, version FROM card_catalog WHERE appid = ?", (int(appid),)
+        ).fetchone()
+    if row is None:
+        return None
+    return json.loads(row[0]), row[1], row[2]
+
+
+def put_catalog_entries(entries, fetched_at, version):
+    """
+    entries: dict appid -> iterable de market_hash_names
+    """
+    with _LOCK:
+        conn = get_connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO card_catalog (appid, names, fetched_at, version) VALUES (?, ?, ?, ?)",
+                (
+                    (int(appid), json.dumps(sorted(names), ensure_ascii=False), fetched_at, version)
+                    for appid, names in entries.items()
+                ),
+            )
+
+
+def catalog_appids():
+    with _LOCK:
+        rows = get_connection().execute("SELECT appid FROM card_catalog ORDER BY appid").fetchall()
+    return [row[0] for row in rows]
+
+
+def stage_catalog_names(crawl, entries):
+    """
+    Ajoute les noms d'une page de crawl à la table de staging: le catalogue
+    n'est pas modifié tant que le crawl n'est pas terminé (voir publish_catalog_staging).
+    """
+    with _LOCK:
+        conn = get_connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO crawl_catalog_staging (crawl, appid, market_hash_name) VALUES (?, ?, ?)",
+                ((crawl, int(appid), name) for appid, names in entries.items() for name in names),
+            )
+
+
+def clear_catalog_staging(crawl):
+    with _LOCK:
+        conn = get_connection()
+        with conn:
+            conn.execute("DELETE FROM crawl_catalog_staging WHERE crawl = ?", (crawl,))
+
+
+def publish_catalog_staging(crawl, fetched_at, version):
+    """
+    Crawl terminé: remplace dans le catalogue les apps vues par le crawl, avec
+    leur set complet de cartes, puis vide le staging. Retourne le nombre d'apps publiées.
+    """
+    with _LOCK:
+        conn = get_connection()
+        entries = {}
+        for appid, name in conn.execute(
+            "SELECT appid, market_hash_name FROM crawl_catalog_staging WHERE crawl = ?", (crawl,)
+        ):
+            entries.setdefault(appid, []).append(name)
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO card_catalog (appid, names, fetched_at, version) VALUES (?, ?, ?, ?)",
+                (
+                    (appid, json.dumps(sorted(names), ensure_ascii=False), fetched_at, version)
+                    for appid, names in entries.items()
+                ),
+            )
+            conn.execute("DELETE FROM crawl_catalog_staging WHERE crawl = ?", (crawl,))
+    return len(entries)
+
+
+# -------------------------------------------------------------------
+# Checkpoints de crawl et cotations issues de market/search
+# -------------------------------------------------------------------
+
+def get_crawl_state(name):
+    """
+    Retourne {"start", "total", "started_at", "updated_at", "finished"} ou None.
+    """
+    with _LOCK:
+        row = get_connection().execute(
+            "SELECT start, total, started_at, updated_at, finished FROM crawl_state WHERE name = ?", (name,)
+        ).fetchone()
+    if row is None:
+        return None
+    start, total, started_at, updated_at, finished = row
+    return {
+        "start": start,
+        "total": total,
+        "started_at": started_at,
+        "updated_at": updated_at,
+        "finished": bool(finished),
+    }
+
+
+def put_crawl_state(name, start, total, started_at, finished):
+    with _LOCK:
+        conn = get_connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO crawl_state (name, start, total, started_at, updated_at, finished) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (name, start, total, started_at, time.time(), int(finished)),
+            )
+
+
+def put_search_quotes(quotes, fetched_at):
+    """
+    quotes: itérable de (appid, market_hash_name, sell_price_eur, sell_listings)
+    """
+    with _LOCK:
+        conn = get_connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO search_quotes "
+                "(market_hash_name, appid, sell_price_eur, sell_listings, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                ((name, appid, price, listings, fetched_at) for appid, name, price, listings in quotes),
+            )
+
+
+def get_search_quotes(names):
+    """
+    market_hash_name -> (sell_price_eur, sell_listings, fetched_at), pour les noms connus.
+    """
+    names = list(names)
+    quotes = {}
+    with _LOCK:
+        conn = get_connection()
+        for i in range(0, len(names), 500):
+            chunk = names[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                "SELECT market_hash_name, sell_price_eur, sell_listings, fetched_at FROM search_quotes "
+                f"WHERE market_hash_name IN ({placeholders})",
+                chunk,
+            ).fetchall()
+            for name, price, listings, fetched_at in rows:
+                quotes[name] = (price, listings, fetched_at)
+    return quotes
+
+
+# -------------------------------------------------------------------
+# Noms d'apps et de badges (name = NULL: aucun nom trouvé)
+# -------------------------------------------------------------------
+
+def get_name(kind, id_):
+    """
+    Retourne (name, fetched_at) ou None si l'id n'a jamais été résolu.
+    """
+    with _LOCK:
+        return get_connection().execute(
+            "SELECT name, fetched_at FROM names WHERE kind = ? AND id = ?", (kind, int(id_))
+        ).fetchone()
+
+
+def put_name(kind, id_, name):
+    with _LOCK:
+        conn = get_connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO names (kind, id, name, fetched_at) VALUES (?, ?, ?, ?)",
+                (kind, int(id_), name, time.time()),
+            )
+
+
+def get_badge_name_variant(badge_id):
+    with _LOCK:
+        row = get_connection().execute(
+            "SELECT variant FROM badge_name_variants WHERE badge_id = ?", (int(badge_id),)
+        ).fetchone()
+    return row[0] if row else None
+
+
+def put_badge_name_variant(badge_id, variant):
+    with _LOCK:
+        conn = get_connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO badge_name_variants (badge_id, variant) VALUES (?, ?)",
+                (int(badge_id), variant),
+            )
+
+
+def badge_name_variant_wins():
+    """
+    variant -> nombre de badges pour lesquels cette variante a donné le titre.
+    """
+    with _LOCK:
+        rows = get_connection().execute(
+            "SELECT variant, COUNT(*) FROM badge_name_variants GROUP BY variant"
+        ).fetchall()
+    return dict(rows)
+
+
+# -------------------------------------------------------------------
+# Fraîcheur de la session (dernier warmup / probe réussi)
+# -------------------------------------------------------------------
+
+def get_session_checked_at(name):
+    with _LOCK:
+        row = get_connection().execute(
+            "SELECT checked_at FROM session_state WHERE name = ?", (name,)
+        ).fetchone()
+    return row[0] if row else None
+
+
+def put_session_checked_at(name, checked_at):
+    with _LOCK:
+        conn = get_connection()
+        with conn:
+            if checked_at is None:
+                conn.execute("DELETE FROM session_state WHERE name = ?", (name,))
+            else:
+                conn.execute(
+                    "INSERT OR REPLACE INTO session_state (name, checked_at) VALUES (?, ?)",
+                    (name, checked_at),
+                )
+
+
+# -------------------------------------------------------------------
+# File de vente (statut par asset: pending, sending, listed, failed, unknown)
+# -------------------------------------------------------------------
+
+def queue_sell_items(items, snapshot_at=None):
+    """
+    items: itérable de (assetid, market_hash_name, amount, price_eur).
+    Un asset dont l'envoi a une issue inconnue (unknown) n'est jamais remis en file.
+    Un asset listed n'y est remis que si snapshot_at (date de la resync complète
+    d'inventaire dont vient items) est postérieur à la mise en vente: l'assetid
+    est alors toujours en inventaire, avec des exemplaires non listés.
+    Les autres repartent en pending avec le nouveau montant et le nouveau prix.
+    Retourne les assets non remis en file: dict statut -> nombre.
+    """
+    now = time.time()
+    skipped = {}
+    with _LOCK:
+        conn = get_connection()
+        with conn:
+            for assetid, name, amount, price in items:
+                assetid = str(assetid)
+                row = conn.execute(
+                    "SELECT status, updated_at FROM sell_queue WHERE assetid = ?", (assetid,)
+                ).fetchone()
+                if row is not None:
+                    status, updated_at = row
+                    relisted = status == "listed" and snapshot_at is not None and snapshot_at > updated_at
+                    if status == "unknown" or (status == "listed" and not relisted):
+                        skipped[status] = skipped.get(status, 0) + 1
+                        continue
+                conn.execute(
+                    "INSERT OR REPLACE INTO sell_queue "
+                    "(assetid, market_hash_name, amount, price_eur, status, attempts, not_before, updated_at, error) "
+                    "VALUES (?, ?, ?, ?, 'pending', 0, 0, ?, NULL)",
+                    (assetid, name, int(amount), float(price), now),
+                )
+    return skipped
+
+
+def next_sell_items(now):
+    """
+    Assets en attente et sans backoff en cours, groupés par carte et par prix:
+    liste de (assetid, market_hash_name, amount, price_eur, attempts).
+    """
+    with _LOCK:
+        return get_connection().execute(
+            "SELECT assetid, market_hash_name, amount, price_eur, attempts FROM sell_queue "
+            "WHERE status = 'pending' AND not_before <= ? "
+            "ORDER BY market_hash_name, price_eur, assetid",
+            (now,),
+        ).fetchall()
+
+
+def next_sell_time():
+    """
+    Prochain not_before parmi les assets en attente, ou None si la file est vide.
+    """
+    with _LOCK:
+        row = get_connection().execute(
+            "SELECT MIN(not_before) FROM sell_queue WHERE status = 'pending'"
+        ).fetchone()
+    return row[0]
+
+
+def update_sell_item(assetid, status, attempts=None, not_before=0, error=None):
+    with _LOCK:
+        conn = get_connection()
+        with conn:
+            conn.execute(
+                "UPDATE sell_queue SET status = ?, attempts = COALESCE(?, attempts), "
+                "not_before = ?, updated_at = ?, error = ? WHERE assetid = ?",
+                (status, attempts, not_before, time.time(), error, str(assetid)),
+            )
+
+
+def flag_interrupted_sells():
+    """
+    Passe en unknown les assets restés en sending (run interrompu pendant l'envoi):
+    la vente a pu aboutir, ils ne sont donc jamais renvoyés automatiquement.
+    """
+    with _LOCK:
+        conn = get_connection()
+        with conn:
+            return conn.execute(
+                "UPDATE sell_queue SET status = 'unknown', updated_at = ? WHERE status = 'sending'",
+                (time.time(),),
+            ).rowcount
+
+
+def sell_queue_counts():
+    with _LOCK:
+        rows = get_connection().execute(
+            "SELECT status, COUNT(*) FROM sell_queue GROUP BY status"
+        ).fetchall()
+    return dict(rows)
+
+
+# -------------------------------------------------------------------
+# Journal des runs (fetchs terminés, actions marché avec leurs entrées)
+# -------------------------------------------------------------------
+
+def get_unfinished_run(name):
+    with _LOCK:
+        row = get_connection().execute(
+            "SELECT run_id FROM runs WHERE name = ? AND finished_at IS NULL ORDER BY run_id DESC LIMIT 1",
+            (name,),
+        ).fetchone()
+    return row[0] if row else None
+
+
+def start_run(name):
+    with _LOCK:
+        conn = get_connection()
+        with conn:
+            return conn.execute(
+                "INSERT INTO runs (name, started_at) VALUES (?, ?)", (name, time.time())
+            ).lastrowid
+
+
+def finish_run(run_id):
+    with _LOCK:
+        conn = get_connection()
+        with conn:
+            conn.execute("UPDATE runs SET finished_at = ? WHERE run_id = ?", (time.time(), run_id))
+
+
+def get_journal_entry(run_id, kind, key):
+    """
+    Retourne (status, inputs_json, result_json, updated_at) ou None.
+    """
+    with _LOCK:
+        return get_connection().execute(
+            "SELECT status, inputs, result, updated_at FROM run_journal WHERE run_id = ? AND kind = ? AND key = ?",
+            (run_id, kind, key),
+        ).fetchone()
+
+
+def put_journal_entry(run_id, kind, key, status, inputs_json=None, result_json=None):
+    with _LOCK:
+        conn = get_connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO run_journal (run_id, kind, key, inputs, status, result, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (run_id, kind, key, inputs_json, status, result_json, time.time()),
+            )
+
+
+def journal_counts(run_id):
+    """
+    (kind, status) -> nombre d'entrées du run.
+    """
+    with _LOCK:
+        rows = get_connection().execute(
+            "SELECT kind, status, COUNT(*) FROM run_journal WHERE run_id = ? GROUP BY kind, status",
+            (run_id,),
+        ).fetchall()
+    return {(kind, status): count for kind, status, count in rows}
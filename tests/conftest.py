@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ratelimit  # noqa: E402
+import store  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def isolated_store(tmp_path, monkeypatch):
+    """
+    Base SQLite jetable par test, et pas d'attente de rate limit.
+    """
+    monkeypatch.setattr(store, "CACHE_DB_PATH", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(store, "_CONNECTION", None)
+    monkeypatch.setattr(ratelimit, "acquire", lambda name: None)
+    yield
+    if store._CONNECTION is not None:
+        store._CONNECTION.close()
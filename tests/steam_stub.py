@@ -0,0 +1,194 @@
+import json
+
+import requests
+from requests.adapters import BaseAdapter
+from urllib.parse import parse_qs, quote, urlsplit
+
+# -------------------------------------------------------------------
+# Endpoints Steam de substitution, servis localement via un adapter requests
+# -------------------------------------------------------------------
+
+
+def make_response(request, status=200, body=b"", headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body if isinstance(body, bytes) else body.encode("utf-8")
+    response.headers.update(headers or {})
+    response.url = request.url
+    response.request = request
+    response.reason = "OK" if status < 400 else "Error"
+    return response
+
+
+class StubInventory(BaseAdapter):
+    """
+    Inventaire communautaire /inventory/{steam_id}/753/6 servi depuis une liste
+    d'items (le plus récent d'abord), paginé par `count` avec start_assetid.
+    items: dicts {"assetid", "classid", "amount", "market_hash_name", "appid", "game"}.
+    """
+
+    def __init__(self, items):
+        super().__init__()
+        self.items = items
+        self.pages_served = 0
+
+    def _page(self, params):
+        count = int(params.get("count", ["200"])[0])
+        start = params.get("start_assetid", ["0"])[0]
+        index = 0
+        if start != "0":
+            index = next(i for i, item in enumerate(self.items) if item["assetid"] == start) + 1
+        page = self.items[index:index + count]
+        more = index + count < len(self.items)
+        descriptions = {}
+        for item in page:
+            descriptions[item["classid"]] = {
+                "classid": item["classid"],
+                "market_hash_name": item["market_hash_name"],
+                "market_fee_app": item["appid"],
+                "tags": [
+                    {"category": "item_class", "localized_tag_name": "Trading Card"},
+                    {"category": "Game", "localized_tag_name": item["game"]},
+                ],
+            }
+        data = {
+            "assets": [
+                {"assetid": i["assetid"], "classid": i["classid"], "amount": str(i["amount"])} for i in page
+            ],
+            "descriptions": list(descriptions.values()),
+            "more_items": 1 if more else 0,
+            "last_assetid": page[-1]["assetid"] if page and more else None,
+        }
+        return data
+
+    def send(self, request, **kwargs):
+        url = urlsplit(request.url)
+        if "/inventory/" in url.path and url.path.endswith("/753/6"):
+            self.pages_served += 1
+            return make_response(request, body=json.dumps(self._page(parse_qs(url.query))))
+        # Page inventaire HTML (warmup)
+        return make_response(request, body="<html></html>")
+
+    def close(self):
+        pass
+
+
+def make_items(count, start_assetid=1, apps=5, cards_per_app=6):
+    """
+    `count` items synthétiques, assetids décroissants (le plus récent d'abord).
+    """
+    items = []
+    for n in range(count):
+        assetid = start_assetid + count - 1 - n
+        appid = 100 + n % apps
+        card = (n // apps) % cards_per_app
+        items.append({
+            "assetid": str(assetid),
+            "classid": f"{appid}{card:02d}",
+            "amount": 1,
+            "market_hash_name": f"{appid}-Card {card}",
+            "appid": appid,
+            "game": f"Game {appid}",
+        })
+    return items
+
+
+def buy_order_row(order_id, name, price, quantity):
+    """Ligne d'ordre d'achat de la page My Listings ("2 @ 0,05€")."""
+    return f"""
+<div class="market_listing_row market_recent_listing_row" id="mybuyorder_{order_id}">
+  <div class="market_listing_right_cell market_listing_my_price market_listing_buyorder_qty">
+    <span class="market_listing_price">
+      <span class="market_listing_inline_buyorder_qty">{quantity} @</span>
+      {price}
+    </span>
+  </div>
+  <div class="market_listing_item_name_block">
+    <span class="market_listing_item_name" style="color: #;"><a class="market_listing_item_name_link"
+      href="https://steamcommunity.com/market/listings/753/{quote(name)}">{name}</a></span>
+  </div>
+</div>"""
+
+
+def listing_row(listing_id, name, price, received, assetid=None):
+    """Ligne d'annonce ("0,05€ (0,03€)"); sans assetid, pas de lien RemoveMarketListing."""
+    remove = ""
+    if assetid is not None:
+        remove = (
+            f"<a href=\"javascript:RemoveMarketListing('mylisting', '{listing_id}', 753, '6', '{assetid}')\""
+            ' class="item_market_action_button">Remove</a>'
+        )
+    return f"""
+<div class="market_listing_row market_recent_listing_row listing_{listing_id}" id="mylisting_{listing_id}">
+  <div class="market_listing_right_cell market_listing_edit_buttons placeholder">{remove}</div>
+  <div class="market_listing_right_cell market_listing_my_price">
+    <span class="market_table_value">
+      <span class="market_listing_price">
+        <span title="This is the price the buyer pays.">{price}</span>
+        <br><span title="This is how much you will receive.">({received})</span>
+      </span>
+    </span>
+  </div>
+  <div class="market_listing_item_name_block">
+    <span id="mylisting_{listing_id}_name" class="market_listing_item_name"><a class="market_listing_item_name_link"
+      href="https://steamcommunity.com/market/listings/753/{quote(name)}">{name}</a></span>
+  </div>
+</div>"""
+
+
+class StubMyListings(BaseAdapter):
+    """
+    Endpoint JSON /market/mylistings/render/ servi depuis une liste
+    d'annonces (la plus récente d'abord), paginé par start / count.
+    listings: dicts {"listing_id", "name", "price", "received", "assetid"}.
+    """
+
+    def __init__(self, listings):
+        super().__init__()
+        self.listings = listings
+        self.pages_served = 0
+
+    def send(self, request, **kwargs):
+        params = parse_qs(urlsplit(request.url).query)
+        start = int(params.get("start", ["0"])[0])
+        count = int(params.get("count", ["10"])[0])
+        page = self.listings[start:start + count]
+        self.pages_served += 1
+        data = {
+            "success": True,
+            "start": start,
+            "pagesize": count,
+            "total_count": len(self.listings),
+            # Assetids seulement dans les hovers, comme pour les annonces sans bouton Remove
+            "results_html": "".join(listing_row(l["listing_id"], l["name"], l["price"], l["received"]) for l in page),
+            "hovers": "".join(
+                f"CreateItemHoverFromContainer( g_rgAssets, 'mylisting_{l['listing_id']}_name', 753, '6', "
+                f"'{l['assetid']}', 0 );"
+                for l in page
+            ),
+        }
+        return make_response(request, body=json.dumps(data))
+
+    def close(self):
+        pass
+
+
+def make_listings(count, start_id=1):
+    """`count` annonces synthétiques, listing_ids décroissants (la plus récente d'abord)."""
+    listings = []
+    for n in range(count):
+        listing_id = start_id + count - 1 - n
+        listings.append({
+            "listing_id": str(listing_id),
+            "name": f"{100 + n % 5}-Card {n % 6}",
+            "price": "0,05€",
+            "received": "0,03€",
+            "assetid": str(900000 + listing_id),
+        })
+    return listings
+
+
+def stub_session(adapter):
+    session = requests.Session()
+    session.mount("https://steamcommunity.com/", adapter)
+    return session
@@ -0,0 +1,64 @@
+import requests
+
+import badges
+import store
+
+
+def _fetch_text_raising(url, headers, session=None):
+    raise requests.exceptions.ConnectionError("network down")
+
+
+def _fetch_text_untitled(url, headers, session=None):
+    return "<html><body>No badge here</body></html>"
+
+
+def _fetch_text_titled(url, headers, session=None):
+    return '<html><body><div class="badge_info_title">Pillar of Salt</div></body></html>'
+
+
+def test_network_failure_is_not_persisted(monkeypatch):
+    monkeypatch.setattr(badges, "_BADGE_NAME_CACHE", {})
+    monkeypatch.setattr(badges, "_fetch_text", _fetch_text_raising)
+    assert badges.get_badge_name(4242) is None
+    assert store.get_name("badge", 4242) is None
+
+
+def test_untitled_page_is_stored_as_negative(monkeypatch):
+    monkeypatch.setattr(badges, "_BADGE_NAME_CACHE", {})
+    monkeypatch.setattr(badges, "_fetch_text", _fetch_text_untitled)
+    assert badges.get_badge_name(4243) is None
+    assert store.get_name("badge", 4243)[0] is None
+
+
+def _age_name(kind, id_, seconds):
+    with store.get_connection() as conn:
+        conn.execute("UPDATE names SET fetched_at = fetched_at - ? WHERE kind = ? AND id = ?", (seconds, kind, id_))
+
+
+def test_negative_names_expire(monkeypatch):
+    monkeypatch.setattr(badges, "_APP_NAME_CACHE", {})
+    monkeypatch.setattr(badges, "_BADGE_NAME_CACHE", {})
+    app_lookups = []
+
+    def with_retries(fn, what, bucket=None):
+        app_lookups.append(what)
+        return "Game 10"
+
+    monkeypatch.setattr(badges.http_client, "with_retries", with_retries)
+    monkeypatch.setattr(badges, "_fetch_text", _fetch_text_untitled)
+    store.put_name("app", 10, None)
+    store.put_name("badge", 4244, None)
+
+    # Négatif récent: servi sans requête
+    assert badges.get_app_name(10) is None
+    assert app_lookups == []
+
+    # Négatif expiré: l'app et le badge sont redemandés
+    badges._APP_NAME_CACHE.clear()
+    badges._BADGE_NAME_CACHE.clear()
+    _age_name("app", 10, badges.NAME_NEGATIVE_TTL_SECONDS + 1)
+    _age_name("badge", 4244, badges.NAME_NEGATIVE_TTL_SECONDS + 1)
+    monkeypatch.setattr(badges, "_fetch_text", _fetch_text_titled)
+    assert badges.get_app_name(10) == "Game 10"
+    assert store.get_name("app", 10)[0] == "Game 10"
+    assert badges.get_badge_name(4244) == "Pillar of Salt"
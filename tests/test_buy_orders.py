@@ -0,0 +1,58 @@
+import requests
+
+import buy_orders
+import pricing
+from journal import RunJournal
+
+PRICES = {"10-A": (0.03, 1), "10-B": (0.03, 2), "10-C": (0.04, 5), "10-D": (0.10, 1)}
+MISSING = {"10-A": 1, "10-B": 2, "10-C": 1, "10-D": 1, "10-E": 0}
+
+
+class StubMarket:
+    """Cotations et create_buy_order de substitution; `errors`: carte -> exception levée une fois."""
+
+    def __init__(self, monkeypatch):
+        self.lookups = []
+        self.orders = []
+        self.errors = {}
+        monkeypatch.setattr(pricing, "get_lowest_seller_and_qty", self.get_lowest_seller_and_qty)
+        monkeypatch.setattr(buy_orders, "create_buy_order", self.create_buy_order)
+
+    def get_lowest_seller_and_qty(self, session, name):
+        self.lookups.append(name)
+        return PRICES[name]
+
+    def create_buy_order(self, session, name, price_eur, quantity=1):
+        self.orders.append((name, price_eur, quantity))
+        if name in self.errors:
+            raise self.errors.pop(name)
+        return {"success": 1}
+
+
+def test_interrupted_buy_orders_are_not_resent(monkeypatch):
+    market = StubMarket(monkeypatch)
+    market.errors = {
+        "10-B": requests.exceptions.ReadTimeout("read timed out"),
+        "10-C": requests.exceptions.ConnectTimeout("connect timed out"),
+    }
+
+    results = buy_orders.buy_missing_cards(None, MISSING)
+    assert results == {"10-A": "placed", "10-B": "unknown", "10-C": "failed", "10-D": "skipped"}
+    assert sorted(market.lookups) == ["10-A", "10-B", "10-C", "10-D"]
+
+    # Passe suivante: même run (un ordre a une issue inconnue), prix rejoués depuis le journal,
+    # seul l'ordre jamais parti est renvoyé
+    market.lookups.clear()
+    market.orders.clear()
+    results = buy_orders.buy_missing_cards(None, MISSING)
+    assert results == {"10-A": "placed", "10-B": "unknown", "10-C": "placed", "10-D": "skipped"}
+    assert market.lookups == []
+    assert market.orders == [("10-C", 0.04, 1)]
+
+
+def test_clean_pass_closes_the_run(monkeypatch):
+    market = StubMarket(monkeypatch)
+    results = buy_orders.buy_missing_cards(None, MISSING, existing_orders={"10-A": (0.03, 1)})
+    assert results == {"10-B": "placed", "10-C": "placed", "10-D": "skipped"}
+    assert market.orders == [("10-B", 0.03, 2), ("10-C", 0.04, 1)]
+    assert RunJournal("buy_orders").resumed is False
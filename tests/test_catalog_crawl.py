@@ -0,0 +1,46 @@
+import catalog
+import store
+from market import SEARCH_PAGE_SIZE
+
+
+def _search_pages(cards):
+    """Stand-in de search_trading_cards: résultats triés par nom, comme Steam."""
+    cards = sorted(cards, key=lambda card: card[1])
+
+    def search(session, start=0, **kwargs):
+        page = cards[start:start + SEARCH_PAGE_SIZE]
+        return {
+            "total_count": len(cards),
+            "results": [
+                {"hash_name": name, "sell_price": 10, "sell_listings": 1, "asset_description": {"market_fee_app": appid}}
+                for appid, name in page
+            ],
+        }
+
+    return search
+
+
+def test_partial_crawl_is_not_published(monkeypatch):
+    # 3 apps x 100 cartes, noms entrelacés: chaque page de 100 noms touche les 3 apps
+    cards = [(appid, f"Card {n:03d} ({appid})") for appid in (10, 20, 30) for n in range(100)]
+    monkeypatch.setattr(catalog, "search_trading_cards", _search_pages(cards))
+
+    assert catalog.crawl_trading_cards(None, max_pages=2) is False
+    assert store.catalog_appids() == []
+
+    # Reprise: le crawl se termine et publie les sets complets
+    assert catalog.crawl_trading_cards(None) is True
+    assert store.catalog_appids() == [10, 20, 30]
+    for appid in (10, 20, 30):
+        assert len(store.get_catalog_entry(appid)[0]) == 100
+
+
+def test_restart_discards_staged_pages(monkeypatch):
+    cards = [(10, f"10-Card {n:03d}") for n in range(250)]
+    monkeypatch.setattr(catalog, "search_trading_cards", _search_pages(cards))
+    assert catalog.crawl_trading_cards(None, max_pages=1) is False
+
+    cards = [(10, f"10-Card {n:03d}") for n in range(100, 150)]
+    monkeypatch.setattr(catalog, "search_trading_cards", _search_pages(cards))
+    assert catalog.crawl_trading_cards(None, restart=True) is True
+    assert len(store.get_catalog_entry(10)[0]) == 50
@@ -0,0 +1,53 @@
+import pytest
+import requests
+
+import daemon
+import http_client
+
+
+def _raise(exc):
+    def fn(*args, **kwargs):
+        raise exc
+
+    return fn
+
+
+@pytest.fixture
+def state():
+    state = daemon.WarmState("76561190000000000")
+    state.badges = [{"appid": 10, "level": 1}]
+    state.cards_by_app = {10: {"game_name": "Game 10", "cards": {"10-Card": {"quantity": 2}}}}
+    state.buy_orders = {"10-Card": (0.05, 3)}
+    return state
+
+
+def test_failed_refresh_keeps_previous_state(state, monkeypatch):
+    monkeypatch.setattr(daemon, "fetch_trading_cards", _raise(requests.exceptions.HTTPError("403")))
+    monkeypatch.setattr(daemon, "fetch_buy_orders", _raise(http_client.RetryError("down")))
+    monkeypatch.setattr(daemon, "fetch_badges_list", _raise(http_client.RetryError("down")))
+
+    for source in ("inventory", "buy_orders", "badges"):
+        with pytest.raises(Exception):
+            state.refresh(source)
+    assert state.cards_by_app[10]["game_name"] == "Game 10"
+    assert state.buy_orders == {"10-Card": (0.05, 3)}
+    assert state.badges == [{"appid": 10, "level": 1}]
+
+
+@pytest.mark.parametrize("filename", ["../badges.txt", "/tmp/badges.txt", "sub/badges.txt", ".bashrc", ""])
+def test_export_rejects_paths(state, filename):
+    with pytest.raises(ValueError):
+        state.export(filename)
+
+
+def test_export_writes_into_export_dir(state, tmp_path, monkeypatch):
+    monkeypatch.setattr(daemon, "DAEMON_EXPORT_DIR", str(tmp_path / "exports"))
+
+    def export_badges(*args, path, **kwargs):
+        with open(path, "w", encoding="utf-8"):
+            return 0
+
+    monkeypatch.setattr(daemon, "export_badges", export_badges)
+    result = state.export("mine.txt")
+    assert result["path"] == str(tmp_path / "exports" / "mine.txt")
+    assert (tmp_path / "exports" / "mine.txt").exists()
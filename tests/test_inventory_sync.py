@@ -0,0 +1,40 @@
+import inventory
+from steam_stub import StubInventory, make_items, stub_session
+
+STEAM_ID = "76561190000000000"
+
+
+def test_second_run_fetches_only_new_pages():
+    items = make_items(1000)
+    stub = StubInventory(items)
+    session = stub_session(stub)
+
+    index = inventory.sync_inventory(session, STEAM_ID)
+    assert stub.pages_served == 5
+    assert sum(index.quantity(name) for name in {i["market_hash_name"] for i in items}) == 1000
+
+    # Trois nouveaux items en tête d'inventaire: une seule page en sync delta
+    stub.items = make_items(3, start_assetid=5000) + items
+    stub.pages_served = 0
+    index = inventory.sync_inventory(session, STEAM_ID)
+    assert stub.pages_served == 1
+    names = {i["market_hash_name"] for i in stub.items}
+    assert sum(index.quantity(name) for name in names) == 1003
+    assert index.game_name(100) == "Game 100"
+    assert "100-Card 0" in index.cards_for_app(100)
+
+
+def test_full_resync_after_delay_drops_sold_assets(monkeypatch):
+    items = make_items(450)
+    stub = StubInventory(items)
+    session = stub_session(stub)
+    inventory.sync_inventory(session, STEAM_ID)
+
+    # Vente des 50 plus anciens items, puis resync complète forcée
+    stub.items = items[:400]
+    stub.pages_served = 0
+    monkeypatch.setattr(inventory, "INVENTORY_FULL_SYNC_SECONDS", 0)
+    index = inventory.sync_inventory(session, STEAM_ID)
+    assert stub.pages_served == 2
+    names = {i["market_hash_name"] for i in items}
+    assert sum(index.quantity(name) for name in names) == 400
@@ -0,0 +1,60 @@
+import time
+
+import pytest
+import requests
+
+import journal
+import store
+from journal import ActionOutcomeUnknown, RunJournal
+
+
+def _http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.exceptions.HTTPError(f"{status} error", response=response)
+
+
+def _raising(exc):
+    def fn():
+        raise exc
+
+    return fn
+
+
+@pytest.mark.parametrize(
+    "exc, status",
+    [
+        (requests.exceptions.ConnectionError("reset after send"), "unknown"),
+        (requests.exceptions.ReadTimeout("no answer"), "unknown"),
+        (_http_error(502), "unknown"),
+        (_http_error(400), "failed"),
+        (RuntimeError("success != 1"), "failed"),
+    ],
+)
+def test_action_failure_status(exc, status):
+    run = RunJournal("test")
+    with pytest.raises(type(exc)):
+        run.action("buy_order", "Card", _raising(exc))
+    assert store.get_journal_entry(run.run_id, "buy_order", "Card")[0] == status
+
+    # Une action à l'issue inconnue n'est jamais renvoyée, une action refusée peut l'être
+    calls = []
+    if status == "unknown":
+        with pytest.raises(ActionOutcomeUnknown):
+            run.action("buy_order", "Card", lambda: calls.append(1))
+        assert calls == []
+    else:
+        run.action("buy_order", "Card", lambda: calls.append(1))
+        assert calls == [1]
+
+
+def test_old_fetch_entries_are_not_replayed(monkeypatch):
+    run = RunJournal("test")
+    assert run.fetch("price", "Card", lambda: [0.1, 5]) == [0.1, 5]
+    assert run.fetch("price", "Card", lambda: [0.2, 5]) == [0.1, 5]
+
+    now = time.time()
+    monkeypatch.setattr(journal.time, "time", lambda: now + journal.JOURNAL_FETCH_MAX_AGE_SECONDS + 1)
+    resumed = RunJournal("test")
+    assert resumed.run_id == run.run_id
+    assert resumed.fetch("price", "Card", lambda: [0.2, 5]) == [0.2, 5]
@@ -0,0 +1,63 @@
+import market
+from parsers import parse_my_buy_orders, parse_my_listings
+from steam_stub import StubMyListings, buy_order_row, listing_row, make_listings, stub_session
+
+PAGE = (
+    '<div id="tabContentsMyActiveMarketListingsRows">'
+    + listing_row("4001", "440-Mann Co. Key", "2,49€", "2,17€", assetid="7001")
+    + listing_row("4002", "753-Pillar of Salt", "0,05€", "0,03€")
+    + "</div>"
+    + '<div class="my_listing_section market_content_block market_home_listing_table">'
+    + buy_order_row("5001", "753-Sticky's Card", "0,05€", 2)
+    + buy_order_row("5002", "753-Another Card", "0,12€", 1)
+    + "</div>"
+)
+HOVERS = "CreateItemHoverFromContainer( g_rgAssets, 'mylisting_4002_name', 753, '6', '7002', 0 );"
+
+
+def test_parse_my_buy_orders():
+    assert parse_my_buy_orders(PAGE) == [
+        ("5001", "753-Sticky's Card", 0.05, 2),
+        ("5002", "753-Another Card", 0.12, 1),
+    ]
+
+
+def test_parse_my_listings():
+    assert parse_my_listings(PAGE, HOVERS) == [
+        ("4001", "440-Mann Co. Key", 2.49, "7001"),
+        ("4002", "753-Pillar of Salt", 0.05, "7002"),
+    ]
+    # Sans hovers, l'assetid d'une annonce sans bouton Remove reste inconnu
+    assert parse_my_listings(PAGE)[1] == ("4002", "753-Pillar of Salt", 0.05, None)
+
+
+def test_incremental_listings(monkeypatch):
+    monkeypatch.setattr(market, "_MY_LISTINGS", {})
+    monkeypatch.setattr(market, "_MY_LISTINGS_TOTAL", None)
+    listings = make_listings(250, start_id=1000)
+    stub = StubMyListings(listings)
+    session = stub_session(stub)
+
+    assert len(market.get_my_listings(session)) == 250
+    assert stub.pages_served == 3
+
+    # Rien n'a changé: arrêt après la première page
+    stub.pages_served = 0
+    result = market.get_my_listings(session)
+    assert stub.pages_served == 1
+    assert set(result) == {l["listing_id"] for l in listings}
+    assert result["1000"] == market.Listing("1000", listings[-1]["name"], 0.05, "901000")
+
+    # Deux nouvelles annonces en tête: arrêt à la première page sans nouveauté
+    stub.listings = make_listings(2, start_id=5000) + listings
+    stub.pages_served = 0
+    assert len(market.get_my_listings(session)) == 252
+    assert stub.pages_served == 2
+
+    # Une vente (et une nouvelle annonce qui garde le même total): relecture complète
+    stub.listings = make_listings(1, start_id=6000) + stub.listings[:-1]
+    stub.pages_served = 0
+    result = market.get_my_listings(session)
+    assert stub.pages_served == 3
+    assert "1000" not in result and "6000" in result
+    assert len(result) == 252
@@ -0,0 +1,17 @@
+import pytest
+
+from bench.bench_parsers import PAIRS
+from bench.page_corpus import make_corpus
+
+CORPUS = make_corpus(seed=3, pages=60)
+
+
+@pytest.mark.parametrize("name, kind, old_fn, new_fn", PAIRS, ids=[pair[0] for pair in PAIRS])
+def test_parsers_match_legacy_functions(name, kind, old_fn, new_fn):
+    results = []
+    for page in CORPUS[kind]:
+        expected = old_fn(page)
+        assert new_fn(page) == expected
+        results.append(expected)
+    # Le corpus exerce vraiment le parser (pas seulement des pages vides)
+    assert any(results)
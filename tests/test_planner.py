@@ -0,0 +1,90 @@
+import math
+import random
+
+import pytest
+
+import logic
+from logic import build_account_columns, compute_missing_cards, compute_surplus_cards, plan_account
+
+BADGE_MAX_LEVEL = 5
+
+
+def _random_account(rng):
+    badges, cards_by_app, prices = {}, {}, {}
+    assetid = 1
+    for appid in rng.sample(range(10, 100000), rng.randint(1, 12)):
+        badges[appid] = rng.randint(0, BADGE_MAX_LEVEL + 1)
+        cards = {}
+        for n in range(rng.randint(1, 8)):
+            name = f"{appid}-Card {n}"
+            quantity = rng.randint(0, 9)
+            cards[name] = {
+                "market_hash_name": name,
+                "quantity": quantity,
+                "asset_ids": list(range(assetid, assetid + quantity)),
+            }
+            assetid += quantity
+            if rng.random() < 0.8:
+                prices[name] = round(rng.uniform(0.03, 2.0), 2)
+        cards_by_app[appid] = {"game_name": f"Game {appid}", "cards": cards}
+    return badges, cards_by_app, prices
+
+
+def _plan(badges, cards_by_app, prices):
+    columns = build_account_columns(badges, cards_by_app, prices)
+    return plan_account(
+        columns["app_ids"],
+        columns["badge_levels"],
+        columns["card_app_index"],
+        columns["card_quantities"],
+        columns["card_prices"],
+        BADGE_MAX_LEVEL,
+    )
+
+
+def _expected(badges, cards_by_app, prices, appid):
+    level = badges[appid]
+    cards = cards_by_app[appid]["cards"]
+    surplus = compute_surplus_cards(level, BADGE_MAX_LEVEL, cards)
+    missing = compute_missing_cards(level, BADGE_MAX_LEVEL, cards)
+    priced = [m for m in missing.values() if m["market_hash_name"] in prices]
+    return {
+        "surplus_units": sum(len(ids) for ids in surplus.values()),
+        "missing_units": sum(m["needed"] for m in missing.values()),
+        "cost": round(sum(m["needed"] * prices[m["market_hash_name"]] for m in priced), 2),
+        "unpriced_cards": len(missing) - len(priced),
+    }
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "numpy" and logic.np is None:
+        pytest.skip("numpy not installed")
+    if request.param == "python":
+        monkeypatch.setattr(logic, "np", None)
+    return request.param
+
+
+def test_plan_account_matches_per_badge_functions(backend):
+    rng = random.Random(1234)
+    for _ in range(500):
+        badges, cards_by_app, prices = _random_account(rng)
+        plan = _plan(badges, cards_by_app, prices)
+        assert sorted(entry["appid"] for entry in plan) == sorted(cards_by_app)
+        for entry in plan:
+            expected = _expected(badges, cards_by_app, prices, entry["appid"])
+            assert entry["level"] == badges[entry["appid"]]
+            assert {key: entry[key] for key in expected} == pytest.approx(expected)
+
+
+def test_unpriced_badges_sort_last(backend):
+    cards_by_app = {
+        1: {"game_name": "A", "cards": {"a": {"market_hash_name": "a", "quantity": 0, "asset_ids": []}}},
+        2: {"game_name": "B", "cards": {"b": {"market_hash_name": "b", "quantity": 0, "asset_ids": []}}},
+        3: {"game_name": "C", "cards": {"c": {"market_hash_name": "c", "quantity": 9, "asset_ids": list(range(9))}}},
+    }
+    plan = _plan({1: 0, 2: 0, 3: 0}, cards_by_app, {"b": 1.5})
+    assert [entry["appid"] for entry in plan] == [3, 2, 1]
+    assert plan[-1]["unpriced_cards"] == 1 and plan[-1]["cost"] == 0.0
+    # Une carte sans prix mais déjà en quantité suffisante ne compte pas
+    assert plan[0]["unpriced_cards"] == 0 and not math.isnan(plan[0]["cost"])
@@ -0,0 +1,73 @@
+import threading
+import time
+
+import market
+import pricing
+from scheduler import PriorityScheduler
+from ttl_cache import TTLCache
+
+STALE = [f"753-Stale {n}" for n in range(40)]
+NEW = [f"753-New {n}" for n in range(4)]
+
+
+def test_first_lookups_go_before_stale_refreshes(monkeypatch):
+    # Un seul worker: l'ordre des requêtes histogramme est l'ordre de la file
+    lookups = PriorityScheduler(1, name="test-lookups")
+    cache = TTLCache(
+        "histogram",
+        market.HISTOGRAM_TTL_SECONDS,
+        stale_ttl=market.HISTOGRAM_STALE_SECONDS,
+        persist=False,
+        refresh_scheduler=lookups,
+        refresh_priority=market.STALE_REFRESH_PRIORITY,
+    )
+    monkeypatch.setattr(market, "_HISTOGRAM_CACHE", cache)
+    monkeypatch.setattr(pricing, "LOOKUPS", lookups)
+
+    nameids = {name: 1000 + i for i, name in enumerate(STALE + NEW)}
+    monkeypatch.setattr(market, "_ITEM_NAMEID_CACHE", dict(nameids))
+    names_by_id = {nameid: name for name, nameid in nameids.items()}
+
+    fetched = []
+    lock = threading.Lock()
+
+    def fetch_order_book(session, item_nameid, country, language):
+        time.sleep(0.005)
+        with lock:
+            fetched.append(names_by_id[item_nameid])
+        return market.OrderBookSnapshot(item_nameid, [[0.2, 1, ""]], [], time.time())
+
+    monkeypatch.setattr(market, "_fetch_order_book", fetch_order_book)
+
+    stale_at = time.time() - market.HISTOGRAM_TTL_SECONDS - 1
+    for name in STALE:
+        key = str(nameids[name])
+        cache._entries[key] = (market.OrderBookSnapshot(nameids[name], [[0.1, 1, ""]], [], stale_at), stale_at, cache.ttl)
+
+    # Les cotations périmées sont servies tout de suite, leurs rafraîchissements restent en file
+    stale_prices = pricing.price_cards(None, STALE)
+    assert all(price == (0.1, 1) for price in stale_prices.values())
+
+    # Worker garé (devant les rafraîchissements en file) pendant la soumission des premières cotations
+    parked, gate = threading.Event(), threading.Event()
+    lookups.submit((-1,), lambda: parked.set() or gate.wait())
+    assert parked.wait(timeout=10)
+    with lock:
+        refreshed = list(fetched)
+        fetched.clear()
+    waiting = len(STALE) - len(refreshed)
+    assert lookups.pending() == waiting
+
+    new_prices = {}
+    caller = threading.Thread(target=lambda: new_prices.update(pricing.price_cards(None, NEW)))
+    caller.start()
+    while lookups.pending() < waiting + len(NEW):
+        time.sleep(0.001)
+    gate.set()
+    caller.join(timeout=10)
+    assert all(price == (0.2, 1) for price in new_prices.values())
+
+    lookups.submit((9,), lambda: None).result(timeout=10)
+    # Toutes les premières cotations passent avant tous les rafraîchissements restants
+    assert sorted(fetched[:len(NEW)]) == sorted(NEW)
+    assert sorted(refreshed + fetched[len(NEW):]) == sorted(STALE)
@@ -0,0 +1,105 @@
+import time
+
+import pytest
+import requests
+
+import ratelimit
+import sell_queue
+import store
+from logic import CardHoldings
+
+
+class FakeClock:
+    """Horloge de sell_queue: sleep() avance le temps au lieu d'attendre."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def _http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.exceptions.HTTPError(f"{status} error", response=response)
+
+
+class StubSellItem:
+    """market.sell_item de substitution: lève les `errors` dans l'ordre, puis réussit."""
+
+    def __init__(self):
+        self.calls = []
+        self.errors = []
+
+    def __call__(self, session, assetid, price, amount=1):
+        self.calls.append((assetid, amount))
+        if self.errors:
+            raise self.errors.pop(0)
+        return True
+
+
+@pytest.fixture
+def sell_item(monkeypatch):
+    stub = StubSellItem()
+    monkeypatch.setattr(sell_queue, "sell_item", stub)
+    monkeypatch.setattr(sell_queue, "time", FakeClock())
+    return stub
+
+
+def _sell_stack(amount=200):
+    return sell_queue.sell_surplus(None, {"10-Card": CardHoldings([("111", amount)])}, {"10-Card": 0.05})
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        requests.exceptions.ReadTimeout("read timed out"),
+        requests.exceptions.ConnectionError("connection reset after send"),
+        _http_error(502),
+    ],
+)
+def test_error_after_send_is_never_resent(sell_item, error):
+    sell_item.errors = [error]
+    counts = _sell_stack()
+    assert sell_item.calls == [("111", 200)]
+    assert counts.get("unknown") == 1
+
+    # Un nouveau passage ne renvoie pas non plus la pile
+    _sell_stack()
+    assert sell_item.calls == [("111", 200)]
+
+
+def test_connect_failure_is_retried(sell_item):
+    sell_item.errors = [requests.exceptions.ConnectTimeout("connect timed out"), ratelimit.RateLimited("429", 30)]
+    counts = _sell_stack()
+    assert sell_item.calls == [("111", 200)] * 3
+    assert counts.get("listed") == 1
+
+
+def test_client_error_fails_without_retries(sell_item):
+    sell_item.errors = [_http_error(400)]
+    counts = _sell_stack()
+    assert sell_item.calls == [("111", 200)]
+    assert counts.get("failed") == 1
+    assert store.next_sell_time() is None
+
+
+def test_rest_of_listed_stack_needs_a_newer_full_sync(sell_item):
+    _sell_stack(200)
+    listed_at = time.time()  # horloge réelle: celle de updated_at dans le store
+
+    # Même snapshot (ou delta sans la vente): la pile n'est pas renvoyée
+    assert sell_queue.enqueue({"10-Card": CardHoldings([("111", 200)])}, {"10-Card": 0.05}) == 0
+    assert sell_queue.enqueue(
+        {"10-Card": CardHoldings([("111", 200)])}, {"10-Card": 0.05}, snapshot_at=listed_at - 60
+    ) == 0
+
+    # Resync complète après la vente: le reste de la pile repart en vente
+    sell_queue.sell_surplus(
+        None, {"10-Card": CardHoldings([("111", 4)])}, {"10-Card": 0.05}, snapshot_at=listed_at + 60
+    )
+    assert sell_item.calls == [("111", 200), ("111", 4)]
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+import steam_auth
+
+COOKIES = [
+    {
+        "name": "steamLoginSecure",
+        "value": "old-token",
+        "domain": "steamcommunity.com",
+        "path": "/",
+        "secure": True,
+        "httpOnly": True,
+        "expirationDate": 1900000000,
+    },
+    {"name": "sessionid", "value": "abc", "domain": "steamcommunity.com", "path": "/"},
+]
+
+
+@pytest.fixture
+def cookie_file(tmp_path, monkeypatch):
+    path = tmp_path / "steam_cookies.json"
+    path.write_text(json.dumps(COOKIES), encoding="utf-8")
+    monkeypatch.setattr(steam_auth.atexit, "register", lambda *args: None)
+    monkeypatch.setattr(steam_auth, "_SAVED_COOKIES", {})
+    return path
+
+
+def test_unchanged_cookies_are_not_rewritten(cookie_file, monkeypatch):
+    monkeypatch.setattr(steam_auth, "probe_session", lambda session: True)
+    before = cookie_file.stat().st_mtime_ns
+    session = steam_auth.login_with_cookies(str(cookie_file))
+    assert steam_auth.save_session_if_changed(session, str(cookie_file)) is False
+    assert cookie_file.stat().st_mtime_ns == before
+
+
+def test_refreshed_cookie_keeps_unknown_fields(cookie_file, monkeypatch):
+    monkeypatch.setattr(steam_auth, "probe_session", lambda session: True)
+    session = steam_auth.login_with_cookies(str(cookie_file))
+    session.cookies.set("steamLoginSecure", "new-token", domain="steamcommunity.com", path="/")
+
+    assert steam_auth.save_session_if_changed(session, str(cookie_file)) is True
+    saved = {c["name"]: c for c in json.loads(cookie_file.read_text(encoding="utf-8"))}
+    assert saved["steamLoginSecure"] == dict(COOKIES[0], value="new-token")
+    assert saved["sessionid"] == COOKIES[1]
+
+
+def test_expired_session_is_never_written(cookie_file, monkeypatch):
+    monkeypatch.setattr(steam_auth, "probe_session", lambda session: False)
+    session = steam_auth.login_with_cookies(str(cookie_file))
+    session.cookies.set("sessionid", "anonymous", domain="steamcommunity.com", path="/")
+
+    assert steam_auth.save_session_if_changed(session, str(cookie_file)) is False
+    assert json.loads(cookie_file.read_text(encoding="utf-8")) == COOKIES
@@ -0,0 +1,138 @@
+import json
+
+import pytest
+
+import store
+import ttl_cache
+from config import UNKNOWN_TTL_SECONDS
+from ttl_cache import UNKNOWN, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+class Loader:
+    """Loader de substitution: retourne `values` dans l'ordre et compte les appels."""
+
+    def __init__(self, *values):
+        self.values = list(values)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.values.pop(0)
+
+
+class HeldScheduler:
+    """File de rafraîchissement qui garde les tâches jusqu'à run()."""
+
+    def __init__(self):
+        self.tasks = []
+
+    def submit(self, priority, fn, *args, **kwargs):
+        self.tasks.append((fn, args, kwargs))
+
+    def run(self):
+        tasks, self.tasks = self.tasks, []
+        for fn, args, kwargs in tasks:
+            fn(*args, **kwargs)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ttl_cache, "time", clock)
+    return clock
+
+
+def _stored(namespace, key):
+    row = store.get_cache_entry(namespace, key)
+    return None if row is None else json.loads(row[0])
+
+
+def test_unknown_is_never_persisted_and_blocks_retries_for_a_while(clock):
+    cache = TTLCache("test", 60)
+    loader = Loader(UNKNOWN, 0.05)
+
+    assert cache.get_or_load("k", loader) is UNKNOWN
+    assert store.get_cache_entry("test", "k") is None
+
+    # Pas de nouvel essai avant UNKNOWN_TTL_SECONDS
+    clock.now += UNKNOWN_TTL_SECONDS - 1
+    assert cache.get_or_load("k", loader) is UNKNOWN
+    assert loader.calls == 1
+
+    clock.now += 2
+    assert cache.get_or_load("k", loader) == 0.05
+    assert loader.calls == 2
+    assert _stored("test", "k") == 0.05
+
+
+def test_unknown_never_overwrites_a_value(clock):
+    cache = TTLCache("test", 60)
+    cache.set("k", 0.05)
+
+    # Entrée expirée, rechargement en échec: la valeur connue reste en cache et en base
+    clock.now += 61
+    assert cache.get_or_load("k", Loader(UNKNOWN)) is UNKNOWN
+    assert cache.peek("k") == (0.05, False)
+    assert _stored("test", "k") == 0.05
+
+    # Nouveau cache sur la même base: la valeur persistée est relue
+    assert TTLCache("test", 60).peek("k") == (0.05, False)
+
+
+def test_stale_entry_is_served_with_one_refresh_per_key(clock):
+    refreshes = HeldScheduler()
+    cache = TTLCache("test", 60, stale_ttl=600, refresh_scheduler=refreshes)
+    cache.set("a", 0.05)
+    cache.set("b", 0.10)
+    loader_a, loader_b = Loader(0.06, 0.07), Loader(0.11)
+
+    clock.now += 61
+    for _ in range(3):
+        assert cache.get_or_load("a", loader_a) == 0.05
+        assert cache.get_or_load("b", loader_b) == 0.10
+    assert len(refreshes.tasks) == 2
+    assert loader_a.calls == loader_b.calls == 0
+
+    refreshes.run()
+    assert (loader_a.calls, loader_b.calls) == (1, 1)
+    assert cache.get_or_load("a", loader_a) == 0.06
+    assert store.get_cache_entry("test", "a") == ("0.06", clock.now, 60)
+    assert _stored("test", "b") == 0.11
+
+    # Une fois le rafraîchissement terminé, la clé peut être rafraîchie de nouveau
+    clock.now += 61
+    assert cache.get_or_load("a", loader_a) == 0.06
+    assert len(refreshes.tasks) == 1
+    refreshes.run()
+    assert loader_a.calls == 2
+    assert _stored("test", "a") == 0.07
+
+
+def test_failed_refresh_keeps_the_stale_value_and_backs_off(clock):
+    refreshes = HeldScheduler()
+    cache = TTLCache("test", 60, stale_ttl=600, refresh_scheduler=refreshes)
+    cache.set("k", 0.05)
+    loader = Loader(UNKNOWN, 0.06)
+
+    clock.now += 61
+    assert cache.get_or_load("k", loader) == 0.05
+    refreshes.run()
+    assert _stored("test", "k") == 0.05
+
+    # Toujours servie périmée, sans nouveau rafraîchissement avant UNKNOWN_TTL_SECONDS
+    assert cache.get_or_load("k", loader) == 0.05
+    assert refreshes.tasks == []
+
+    clock.now += UNKNOWN_TTL_SECONDS
+    assert cache.get_or_load("k", loader) == 0.05
+    refreshes.run()
+    assert loader.calls == 2
+    assert _stored("test", "k") == 0.06
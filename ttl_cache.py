@@ -0,0 +1,145 @@
+import json
+import logging
+import threading
+import time
+
+import store
+from config import TTL_REFRESH_WORKERS, UNKNOWN_TTL_SECONDS
+from scheduler import PriorityScheduler
+
+# -------------------------------------------------------------------
+# Cache à durée de vie avec stale-while-revalidate
+# -------------------------------------------------------------------
+#
+# Une entrée est:
+# - fraîche pendant `ttl` secondes: servie telle quelle,
+# - périmée ("stale") pendant `stale_ttl` secondes de plus: servie, et
+#   rafraîchie en tâche de fond (un seul rafraîchissement par clé, sur un
+#   pool borné de TTL_REFRESH_WORKERS threads partagé par tous les caches,
+#   ou sur la file de priorité `refresh_scheduler` propre au cache),
+# - expirée ensuite: rechargée de façon synchrone.
+#
+# Un loader qui échoue (429...) retourne UNKNOWN. UNKNOWN n'écrase jamais une
+# valeur existante, n'est jamais persisté, et n'est retenu que
+# UNKNOWN_TTL_SECONDS pour ne pas marteler l'endpoint.
+
+
+class _Unknown:
+    __slots__ = ()
+
+    def __repr__(self):
+        return "UNKNOWN"
+
+    def __bool__(self):
+        return False
+
+
+UNKNOWN = _Unknown()
+
+# Threads daemon: les rafraîchissements encore en file ne retardent pas la sortie du programme
+_REFRESH_POOL = PriorityScheduler(TTL_REFRESH_WORKERS, name="ttl-refresh")
+
+
+class TTLCache:
+    def __init__(
+        self, namespace, ttl, stale_ttl=0, encode=None, decode=None, persist=True,
+        refresh_scheduler=None, refresh_priority=0,
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.encode = encode or (lambda value: value)
+        self.decode = decode or (lambda value: value)
+        self.persist = persist
+        self.refresh_scheduler = refresh_scheduler or _REFRESH_POOL
+        self.refresh_priority = refresh_priority
+        self._entries = {}          # key -> (value, fetched_at, ttl)
+        self._unknown_until = {}    # key -> timestamp avant lequel on ne retente pas
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def _entry(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None or not self.persist:
+            return entry
+
+        row = store.get_cache_entry(self.namespace, key)
+        if row is None:
+            return None
+        value_json, fetched_at, ttl = row
+        entry = (self.decode(json.loads(value_json)), fetched_at, ttl)
+        with self._lock:
+            self._entries.setdefault(key, entry)
+        return entry
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        if value is UNKNOWN:
+            with self._lock:
+                self._unknown_until[key] = now + UNKNOWN_TTL_SECONDS
+            return
+
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._entries[key] = (value, now, ttl)
+            self._unknown_until.pop(key, None)
+        if self.persist:
+            store.put_cache_entry(self.namespace, key, json.dumps(self.encode(value)), now, ttl)
+
+    def _refresh_in_background(self, key, loader):
+        with self._lock:
+            if key in self._refreshing or time.time() < self._unknown_until.get(key, 0):
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                self.set(key, loader())
+            except Exception as e:
+                logging.debug(f"Background refresh failed for {self.namespace}/{key}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self.refresh_scheduler.submit(self.refresh_priority, run)
+
+    def get_or_load(self, key, loader):
+        """
+        Retourne la valeur en cache si elle est utilisable, sinon appelle loader().
+        Peut retourner UNKNOWN: l'appelant ne doit jamais le traiter comme un prix.
+        """
+        now = time.time()
+        entry = self._entry(key)
+        if entry is not None:
+            value, fetched_at, ttl = entry
+            age = now - fetched_at
+            if age < ttl:
+                return value
+            if age < ttl + self.stale_ttl:
+                self._refresh_in_background(key, loader)
+                return value
+
+        with self._lock:
+            if now < self._unknown_until.get(key, 0):
+                return UNKNOWN
+
+        value = loader()
+        self.set(key, value)
+        return value
+
+    def peek(self, key):
+        """
+        (valeur, fraîche?) de l'entrée en cache, même périmée, sans jamais charger; None si absente.
+        """
+        entry = self._entry(key)
+        if entry is None:
+            return None
+        value, fetched_at, ttl = entry
+        return value, time.time() - fetched_at < ttl
+
+    def is_stale(self, key):
+        entry = self._entry(key)
+        if entry is None:
+            return True
+        return time.time() - entry[1] >= entry[2]